@@ -0,0 +1,332 @@
+"""[summary]
+メッシュ生成・書き出しの処理速度とメモリ使用量を計測するベンチマーク
+各ケースは別プロセスで実行し、メッシュ数/秒、最大常駐メモリ、キャッシュの件数を記録する
+--saveで結果をJSONに保存し、--compareで保存済みの結果と比較して性能が落ちていれば終了コード1で終了する
+基準の結果にないケースがある場合も、比較が不完全なため終了コード1で終了する
+
+benchmarks/baseline.jsonは参考の基準の結果で、計測した環境を"environment"に記録している
+処理速度は環境に依存するため、性能の比較は同じ環境で変更前に保存した結果と行う
+
+    python benchmarks/run.py --save benchmarks/baseline.json
+    python benchmarks/run.py --compare benchmarks/baseline.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from japanmesh.cache import clear_caches, get_cache_info  # noqa: E402
+from japanmesh.main import (  # noqa: E402
+    generate_meshes_in_range,
+    get_base_cellcount,
+    get_exact_meshsize,
+    get_index_range,
+    get_mesh,
+    get_mesh_count,
+    get_meshcode,
+    get_meshsize,
+    get_unit_grid,
+)
+from japanmesh.writer import write_geojsonl, write_geojsonl_in_range  # noqa: E402
+
+# 次数ごとの値を保持するキャッシュ、get_cache_info()の登録先とあわせて件数を記録する
+LRU_CACHES = (get_meshsize, get_exact_meshsize, get_unit_grid, get_mesh_count, get_base_cellcount)
+
+# 計測する領域
+EXTENTS = {
+    # 東京駅周辺
+    "small": [[139.7, 35.6], [139.8, 35.7]],
+    # 東京都程度
+    "prefecture": [[138.9, 35.5], [139.9, 35.9]],
+    # 全国
+    "nationwide": None,
+}
+MESHNUMS = range(1, 11)
+# 1ケースで処理するメッシュ数の上限の既定値、領域がこれより広い場合は南側から上限までの行を計測する
+DEFAULT_MAX_CELLS = 200000
+# メッシュ数が少ないケースは、計測時間がこの秒数以上になるまで繰り返す
+MIN_SECONDS = 0.2
+# 比較時に許容する性能低下の割合の既定値
+DEFAULT_TOLERANCE = 0.2
+
+
+def _generate(meshnum: int, index_range: tuple, path: str) -> int:
+    count = 0
+    for _ in generate_meshes_in_range(meshnum, *index_range):
+        count += 1
+    return count
+
+
+def _write_meshes(meshnum: int, index_range: tuple, path: str) -> int:
+    with open(path, mode="w") as f:
+        return write_geojsonl(generate_meshes_in_range(meshnum, *index_range), f)
+
+
+def _write_range(meshnum: int, index_range: tuple, path: str) -> int:
+    with open(path, mode="w") as f:
+        return write_geojsonl_in_range(meshnum, f, *index_range)
+
+
+def _call_get_mesh(meshnum: int, index_range: tuple, path: str) -> int:
+    indices = _get_random_indices(index_range)
+    for x, y in indices:
+        get_mesh(meshnum, x, y)
+    return len(indices)
+
+
+def _call_get_meshcode(meshnum: int, index_range: tuple, path: str) -> int:
+    indices = _get_random_indices(index_range)
+    for x, y in indices:
+        get_meshcode(meshnum, x, y)
+    return len(indices)
+
+
+# 計測する処理、(メッシュ次数, 番地の範囲, 一時ファイルのパス)を受け取り処理したメッシュ数を返す
+TARGETS = {
+    "generate": _generate,
+    "write_geojsonl": _write_meshes,
+    "write_geojsonl_in_range": _write_range,
+    "get_mesh": _call_get_mesh,
+    "get_meshcode": _call_get_meshcode,
+}
+
+
+def get_case_names(targets=None, meshnums=None, extents=None) -> list:
+    """[summary]
+    計測するケース名のリストを返す、ケース名は"<処理>/<メッシュ次数>/<領域>"
+
+    Args:
+        targets (list, optional): 処理名のリスト、省略時は全て
+        meshnums (list, optional): メッシュ次数のリスト、省略時は全て
+        extents (list, optional): 領域名のリスト、省略時は全て
+
+    Returns:
+        list: ケース名のリスト
+    """
+    return [
+        target + "/" + str(meshnum) + "/" + extent
+        for target, meshnum, extent in itertools.product(
+            targets or TARGETS, meshnums or MESHNUMS, extents or EXTENTS)
+    ]
+
+
+def run_case(name: str, max_cells: int = DEFAULT_MAX_CELLS) -> dict:
+    """[summary]
+    現在のプロセスで1つのケースを計測する
+
+    Args:
+        name (str): ケース名
+        max_cells (int, optional): 処理するメッシュ数の上限
+
+    Returns:
+        dict: {"cells":<メッシュ数>, "seconds":<秒>, "cells_per_sec":<メッシュ数/秒>,
+            "peak_rss":<最大常駐メモリ(byte)>, "caches":<キャッシュごとの件数>}
+    """
+    target, meshnum, extent = name.split("/")
+    meshnum = int(meshnum)
+    index_range = _limit_range(get_index_range(meshnum, EXTENTS[extent]), max_cells)
+
+    clear_caches()
+    for func in LRU_CACHES:
+        func.cache_clear()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "mesh.geojsonl")
+        cells = 0
+        seconds = 0.0
+        while seconds < MIN_SECONDS:
+            start = time.perf_counter()
+            cells += TARGETS[target](meshnum, index_range, path)
+            seconds += time.perf_counter() - start
+
+    caches = {name: info["size"] for name, info in get_cache_info().items()}
+    for func in LRU_CACHES:
+        caches[func.__name__] = func.cache_info().currsize
+    return {
+        "cells": cells,
+        "seconds": seconds,
+        "cells_per_sec": cells / seconds if seconds > 0 else 0.0,
+        "peak_rss": _get_peak_rss(),
+        "caches": caches,
+    }
+
+
+def run_cases(names: list, max_cells: int = DEFAULT_MAX_CELLS, log=None) -> dict:
+    """[summary]
+    各ケースを別プロセスで計測する。最大常駐メモリが他のケースの影響を受けないようにするため
+
+    Args:
+        names (list): ケース名のリスト
+        max_cells (int, optional): 処理するメッシュ数の上限
+        log (file-like, optional): 進捗の書き出し先
+
+    Returns:
+        dict: {"environment":<実行環境>, "max_cells":<上限>, "cases":{<ケース名>: run_case()の値...}}
+    """
+    cases = {}
+    for name in names:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run_case", name,
+             "--max_cells", str(max_cells)],
+            check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        cases[name] = json.loads(output)
+        if log is not None:
+            print("{:40} {:>12,.0f} cells/s {:>8.1f} MB".format(
+                name, cases[name]["cells_per_sec"], cases[name]["peak_rss"] / 1024 / 1024),
+                file=log)
+    return {
+        "environment": get_environment(),
+        "max_cells": max_cells,
+        "cases": cases,
+    }
+
+
+def get_environment() -> dict:
+    """[summary]
+    計測した環境を返す
+
+    Returns:
+        dict: {"python", "numpy", "platform", "processor", "cpu_count"}
+    """
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def get_missing_cases(baseline: dict, results: dict) -> list:
+    """[summary]
+    今回計測したケースのうち、保存済みの結果にないケースを返す
+
+    Args:
+        baseline (dict): 保存済みのrun_cases()の値
+        results (dict): 今回のrun_cases()の値
+
+    Returns:
+        list: ケース名のリスト
+    """
+    return [name for name in results["cases"] if name not in baseline["cases"]]
+
+
+def compare_results(baseline: dict, results: dict, tolerance: float = DEFAULT_TOLERANCE) -> list:
+    """[summary]
+    保存済みの結果と比較し、性能が落ちたケースを返す
+    メッシュ数/秒がtoleranceの割合より下がった、または最大常駐メモリがtoleranceの割合より増えたケースが対象
+    保存済みの結果にないケースはget_missing_cases()で確認する
+
+    Args:
+        baseline (dict): 保存済みのrun_cases()の値
+        results (dict): 今回のrun_cases()の値
+        tolerance (float, optional): 許容する変化の割合
+
+    Returns:
+        list: 性能が落ちたケースの説明文のリスト
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        base = baseline["cases"].get(name)
+        if base is None:
+            # 基準の結果にないケースはget_missing_cases()で報告する
+            continue
+        if result["cells_per_sec"] < base["cells_per_sec"] * (1 - tolerance):
+            regressions.append("{}: {:,.0f} -> {:,.0f} cells/s".format(
+                name, base["cells_per_sec"], result["cells_per_sec"]))
+        if result["peak_rss"] > base["peak_rss"] * (1 + tolerance):
+            regressions.append("{}: peak RSS {:,} -> {:,} bytes".format(
+                name, base["peak_rss"], result["peak_rss"]))
+        for cache, size in result["caches"].items():
+            base_size = base["caches"].get(cache)
+            if base_size is not None and size > base_size * (1 + tolerance):
+                regressions.append("{}: cache {} {:,} -> {:,}".format(
+                    name, cache, base_size, size))
+    return regressions
+
+
+def _limit_range(index_range: tuple, max_cells: int) -> tuple:
+    # メッシュ数がmax_cellsに収まるよう、南側から行を切り出す
+    x_start, x_end, y_start, y_end = index_range
+    width = max(x_end - x_start, 1)
+    rows = max(max_cells // width, 1)
+    x_end = min(x_end, x_start + max_cells)
+    return x_start, x_end, y_start, min(y_end, y_start + rows)
+
+
+def _get_random_indices(index_range: tuple) -> list:
+    # 範囲内の番地を毎回同じ順序で無作為に選ぶ
+    x_start, x_end, y_start, y_end = index_range
+    count = (x_end - x_start) * (y_end - y_start)
+    rng = random.Random(0)
+    return [(rng.randrange(x_start, x_end), rng.randrange(y_start, y_end)) for _ in range(count)]
+
+
+def _get_peak_rss() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOSはbyte、それ以外はKB単位
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="メッシュ生成・書き出しのベンチマーク")
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS),
+                        help="計測する処理（オプション）")
+    parser.add_argument("--meshnums", nargs="+", type=int,
+                        help="計測するメッシュ次数（オプション）")
+    parser.add_argument("--extents", nargs="+", choices=list(EXTENTS),
+                        help="計測する領域（オプション）")
+    parser.add_argument("--max_cells", type=int, default=DEFAULT_MAX_CELLS,
+                        help="1ケースで処理するメッシュ数の上限（オプション）")
+    parser.add_argument("--save", help="結果を保存するJSONファイル（オプション）")
+    parser.add_argument("--compare", help="比較する保存済みのJSONファイル（オプション）")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="比較時に許容する性能低下の割合（オプション）")
+    parser.add_argument("--run_case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.max_cells < 1:
+        raise ValueError("max_cellsは1以上で指定してください")
+
+    # 子プロセスとして1ケースを計測し、結果をJSONで標準出力に書き出す
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, args.max_cells)))
+        sys.exit()
+
+    names = get_case_names(args.targets, args.meshnums, args.extents)
+    results = run_cases(names, args.max_cells, log=sys.stderr)
+
+    if args.save:
+        with open(args.save, mode="w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("max_cells") != results["max_cells"]:
+            print("max_cellsが異なるため比較できません", file=sys.stderr)
+            sys.exit(1)
+        # 環境が異なる場合は処理速度を比較しても意味がないため、差分を表示する
+        for key, value in results["environment"].items():
+            base_value = baseline.get("environment", {}).get(key)
+            if base_value != value:
+                print("ENVIRONMENT {}: {} -> {}".format(key, base_value, value), file=sys.stderr)
+        missing = get_missing_cases(baseline, results)
+        for name in missing:
+            print("MISSING " + name + ": 基準の結果にないケースです", file=sys.stderr)
+        regressions = compare_results(baseline, results, args.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression, file=sys.stderr)
+        if missing or regressions:
+            sys.exit(1)
+        print("no regressions", file=sys.stderr)
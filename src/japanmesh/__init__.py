@@ -1 +1,40 @@
-from .main import generate_meshes
+from .main import generate_meshes, get_index_range
+from .writer import GeoJSONLSerializer, write_geojsonl, write_geojsonl_in_range
+from .arrays import (
+    decode_meshcodes,
+    encode_meshcodes,
+    generate_mesh_arrays,
+    get_mesh_arrays,
+)
+from .meshcode import (
+    decode_meshcode,
+    encode_meshcode,
+    generate_children_meshes,
+    get_ancestor_meshcodes,
+    get_mesh_by_meshcode,
+    get_neighbor_meshcodes,
+)
+from .parallel import write_geojsonl_parallel, write_geojsonl_shards
+from .export import export_partitions
+from .compress import CompressedWriter
+from .cache import clear_caches, configure_cache, get_cache_info
+from .polygon import generate_meshes_in_polygon
+from .intcode import (
+    from_intcode,
+    get_ancestor_intcode,
+    get_children_intcodes,
+    get_intcode_level,
+    get_neighbor_intcodes,
+    get_parent_intcode,
+    intcode_to_meshcode,
+    intcodes_to_meshcodes,
+    meshcode_to_intcode,
+    meshcodes_to_intcodes,
+    to_intcode,
+)
+from .columnar import MeshBinaryReader, write_mesh_binary
+from .aggregate import MeshAggregator, aggregate_points, write_aggregate_csv
+from .instrument import JobStats, print_progress, run_profiled
+from .mesh import Mesh, generate_mesh_objects, to_mesh_dicts
+from .tiles import get_tile_geojson, get_tile_meshnum, serve_tiles, start_tile_server
+from .multilevel import generate_multilevel_meshes, write_geojsonl_multilevel
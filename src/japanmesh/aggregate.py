@@ -0,0 +1,263 @@
+import csv
+import itertools
+import os
+
+import numpy as np
+
+try:
+    from arrays import encode_meshcodes
+except ModuleNotFoundError:
+    from .arrays import encode_meshcodes
+
+# 入力ファイルから一度に読み込む行数の既定値
+DEFAULT_CHUNK_ROWS = 1024 * 1024
+
+
+class MeshAggregator:
+    """[summary]
+    地点をメッシュごとに集計する
+    add()で地点を少しずつ追加でき、保持するのは地点を含むメッシュごとの件数・合計値のみのため、
+    メモリ使用量は地点数によらず、地点を含むメッシュの数に比例する
+    """
+
+    def __init__(self, meshnum: int, value_columns=()):
+        """[summary]
+        Args:
+            meshnum (int): メッシュ次数
+            value_columns (list, optional): 合計値を求める列名のリスト
+        """
+        self.meshnum = meshnum
+        self.value_columns = list(value_columns)
+        # 生成範囲外や非数で集計しなかった地点の数
+        self.skipped = 0
+        self._codes = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._sums = {column: np.zeros(0, dtype=np.float64) for column in self.value_columns}
+
+    def add(self, lon, lat, values: dict = None):
+        """[summary]
+        経緯度の配列と、各地点の値の配列を集計に追加する
+
+        Args:
+            lon (numpy.ndarray): 経度
+            lat (numpy.ndarray): 緯度
+            values (dict, optional): 列名をキーとする値の配列の辞書、value_columnsの全ての列が必要
+                非数の値は合計に含めない
+        """
+        values = values or {}
+        codes = encode_meshcodes(self.meshnum, lon, lat)
+        valid = codes != 0
+        self.skipped += int(np.count_nonzero(~valid))
+
+        # まずこの配列内でメッシュごとにまとめ、保持している集計結果と併合する
+        chunk_codes, inverse = np.unique(codes[valid], return_inverse=True)
+        chunk_counts = np.bincount(inverse, minlength=len(chunk_codes))
+        chunk_sums = {}
+        for column in self.value_columns:
+            column_values = np.asarray(values[column], dtype=np.float64)[valid]
+            chunk_sums[column] = np.bincount(
+                inverse, weights=np.nan_to_num(column_values, nan=0.0),
+                minlength=len(chunk_codes))
+        self._merge(chunk_codes, chunk_counts, chunk_sums)
+
+    def add_chunks(self, chunks, lon_column: str = "lon", lat_column: str = "lat"):
+        """[summary]
+        read_csv_chunks()などが返す列ごとの配列の辞書を、全て集計に追加する
+
+        Args:
+            chunks (iterable): 列名をキーとする配列の辞書のイテラブル
+            lon_column (str, optional): 経度の列名
+            lat_column (str, optional): 緯度の列名
+        """
+        for chunk in chunks:
+            self.add(chunk[lon_column], chunk[lat_column], chunk)
+
+    def get_result(self) -> dict:
+        """[summary]
+        集計結果を返す、地点を含むメッシュのみをメッシュコードの昇順で並べる
+
+        Returns:
+            dict: {
+                "code": メッシュコードを整数化した値(int64),
+                "count": 地点の数(int64),
+                <列名>: 値の合計(float64)...
+            }
+        """
+        result = {"code": self._codes, "count": self._counts}
+        result.update(self._sums)
+        return result
+
+    def _merge(self, codes, counts, sums: dict):
+        # 保持している集計結果、追加分ともにメッシュコードの昇順で重複がないため、
+        # 全体を並べ替えずに既存のメッシュへの加算と新しいメッシュの挿入のみ行う
+        positions = np.searchsorted(self._codes, codes)
+        found = positions < len(self._codes)
+        found[found] = self._codes[positions[found]] == codes[found]
+        self._counts[positions[found]] += counts[found]
+        for column in self.value_columns:
+            self._sums[column][positions[found]] += sums[column][found]
+
+        new = ~found
+        if not new.any():
+            return
+        insert_positions = positions[new]
+        self._codes = np.insert(self._codes, insert_positions, codes[new])
+        self._counts = np.insert(self._counts, insert_positions, counts[new])
+        for column in self.value_columns:
+            self._sums[column] = np.insert(
+                self._sums[column], insert_positions, sums[column][new])
+
+
+def aggregate_points(meshnum: int, path: str, lon_column: str = "lon", lat_column: str = "lat",
+                     value_columns=(), chunk_rows: int = DEFAULT_CHUNK_ROWS) -> dict:
+    """[summary]
+    地点のファイルをchunk_rows行ずつ読み込み、メッシュごとの地点の数と値の合計を求める
+    拡張子が.parquetのファイルはParquet（pyarrowが必要）、それ以外はCSVとして読み込む
+
+    Args:
+        meshnum (int): メッシュ次数
+        path (str): 入力ファイルのパス
+        lon_column (str, optional): 経度の列名
+        lat_column (str, optional): 緯度の列名
+        value_columns (list, optional): 合計値を求める列名のリスト
+        chunk_rows (int, optional): 一度に読み込む行数
+
+    Returns:
+        dict: MeshAggregator.get_result()を参照
+    """
+    columns = [lon_column, lat_column] + list(value_columns)
+    chunks = read_point_chunks(path, columns, chunk_rows)
+    aggregator = MeshAggregator(meshnum, value_columns)
+    aggregator.add_chunks(chunks, lon_column, lat_column)
+    return aggregator.get_result()
+
+
+def read_point_chunks(path: str, columns: list, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """[summary]
+    地点のファイルから、指定した列をchunk_rows行ずつ数値の配列として読み込む
+    拡張子が.parquetのファイルはread_parquet_chunks()、それ以外はread_csv_chunks()で読み込む
+
+    Args:
+        path (str): 入力ファイルのパス
+        columns (list): 読み込む列名のリスト
+        chunk_rows (int, optional): 一度に読み込む行数
+
+    yield:
+        dict: 列名をキーとするfloat64の配列の辞書
+    """
+    if os.path.splitext(path)[1].lower() == ".parquet":
+        return read_parquet_chunks(path, columns, chunk_rows)
+    return read_csv_chunks(path, columns, chunk_rows)
+
+
+def read_csv_chunks(path: str, columns: list, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """[summary]
+    ヘッダ付きのCSVファイルから、指定した列をchunk_rows行ずつ数値の配列として読み込む
+    chunk_rows行ごとにnumpy.loadtxt()でまとめて変換し、変換できない値を含む場合のみ1行ずつ読み込む
+    引用符を含むファイルは、値に改行を含む場合があるため引用符以降をcsvモジュールで1行ずつ読み込む
+
+    Args:
+        path (str): CSVファイルのパス
+        columns (list): 読み込む列名のリスト
+        chunk_rows (int, optional): 一度に読み込む行数
+
+    yield:
+        dict: 列名をキーとするfloat64の配列の辞書、数値として読めない値は非数、空行は読み飛ばす
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rowsは1以上で指定してください")
+
+    with open(path, newline="") as f:
+        header = next(csv.reader([f.readline()]), [])
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError("CSVファイルに列がありません：" + ", ".join(missing))
+        indices = [header.index(column) for column in columns]
+
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                return
+            if any('"' in line for line in lines):
+                rows = csv.reader(itertools.chain(lines, f))
+                yield from _read_csv_rows(rows, columns, indices, chunk_rows)
+                return
+            try:
+                values = np.loadtxt(lines, dtype=np.float64, delimiter=",", comments=None,
+                                    usecols=indices, ndmin=2)
+            except ValueError:
+                # 数値として読めない値や列の足りない行を含む場合は、この範囲のみ1行ずつ読み込む
+                yield from _read_csv_rows(csv.reader(lines), columns, indices, chunk_rows)
+                continue
+            if len(values):
+                yield {column: values[:, i] for i, column in enumerate(columns)}
+
+
+def read_parquet_chunks(path: str, columns: list, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """[summary]
+    Parquetファイルから、指定した列をchunk_rows行ずつ数値の配列として読み込む
+    pyarrowが必要です
+
+    Args:
+        path (str): Parquetファイルのパス
+        columns (list): 読み込む列名のリスト
+        chunk_rows (int, optional): 一度に読み込む行数
+
+    yield:
+        dict: 列名をキーとするfloat64の配列の辞書、欠損値は非数
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("Parquetファイルの読み込みにはpyarrowが必要です")
+    if chunk_rows < 1:
+        raise ValueError("chunk_rowsは1以上で指定してください")
+
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield {
+            column: batch.column(column).to_numpy(zero_copy_only=False).astype(np.float64)
+            for column in columns
+        }
+
+
+def write_aggregate_csv(result: dict, f):
+    """[summary]
+    集計結果をヘッダ付きのCSVとして書き出す
+    メッシュコードは文字列、以降の列はget_result()の並びのまま
+
+    Args:
+        result (dict): MeshAggregator.get_result()、aggregate_points()の戻り値
+        f (file-like): write()を持つテキストモードの書き込み先
+    """
+    columns = list(result.keys())
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(columns)
+    values = [result[column].tolist() for column in columns]
+    writer.writerows(zip(*values))
+
+
+def _read_csv_rows(rows, columns: list, indices: list, chunk_rows: int):
+    # csvモジュールで読み込んだ行を1行ずつ変換する
+    values = []
+    for row in rows:
+        if not row:
+            continue
+        values.append([_to_float(row, index) for index in indices])
+        if len(values) >= chunk_rows:
+            yield _to_arrays(columns, values)
+            values = []
+    if values:
+        yield _to_arrays(columns, values)
+
+
+def _to_float(row: list, index: int) -> float:
+    try:
+        return float(row[index])
+    except (IndexError, ValueError):
+        return float("nan")
+
+
+def _to_arrays(columns: list, rows: list) -> dict:
+    values = np.array(rows, dtype=np.float64)
+    return {column: values[:, i] for i, column in enumerate(columns)}
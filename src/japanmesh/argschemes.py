@@ -2,7 +2,96 @@ import argparse
 
 ARGSCHEME = argparse.ArgumentParser(
     description='地域メッシュを生成するスクリプト')
-ARGSCHEME.add_argument('meshnum', help='メッシュ次数')
+ARGSCHEME.add_argument('meshnum', help='メッシュ次数、カンマ区切りで複数指定できる')
 ARGSCHEME.add_argument('-e', '--extent', nargs=2,
                        help='メッシュを生成する領域のカンマ区切り経緯度（オプション）')
-ARGSCHEME.add_argument('-d', '--target_dir', help='データの保存先（オプション）')
+ARGSCHEME.add_argument('--polygon',
+                       help='メッシュを生成する領域をPolygon、MultiPolygonのGeoJSONファイルで指定（オプション）')
+ARGSCHEME.add_argument('-d', '--target_dir',
+                       help='データの保存先、"-"で標準出力（オプション）')
+ARGSCHEME.add_argument('-f', '--format', choices=['geojsonl', 'binary'], default='geojsonl',
+                       help='出力形式、binaryは列形式のバイナリファイル（オプション）')
+ARGSCHEME.add_argument('-c', '--chunk_size', type=int, default=1024 * 1024,
+                       help='ファイルへ一度に書き込む文字数（オプション）')
+ARGSCHEME.add_argument('--precision', type=int,
+                       help='経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記（オプション）')
+ARGSCHEME.add_argument('-j', '--processes', type=int,
+                       help='並列生成するプロセス数、指定時は上位メッシュ単位に分割して生成（オプション）')
+ARGSCHEME.add_argument('--shard_meshnum', type=int, default=1,
+                       help='並列生成の分割単位とするメッシュ次数（オプション）')
+ARGSCHEME.add_argument('--split', action='store_true',
+                       help='並列生成時に分割ごとのファイルに書き出す（オプション）')
+ARGSCHEME.add_argument('--resume', action='store_true',
+                       help='分割ごとのファイルに書き出し、中断後の再実行では続きから書き出す（オプション）')
+ARGSCHEME.add_argument('-z', '--compress', choices=['gzip', 'zstd'],
+                       help='圧縮して書き出す、zstdはzstandardが必要（オプション）')
+ARGSCHEME.add_argument('--compress_level', type=int,
+                       help='圧縮レベル、省略時はgzipは6、zstdは3（オプション）')
+ARGSCHEME.add_argument('--compress_threads', type=int,
+                       help='圧縮するスレッド数、省略時はCPU数（オプション）')
+ARGSCHEME.add_argument('--tagged', action='store_true',
+                       help='複数の次数を、次数をプロパティに付けて1つのファイルに書き出す（オプション）')
+ARGSCHEME.add_argument('--progress', action='store_true',
+                       help='進捗と残り時間の目安を表示する（オプション）')
+ARGSCHEME.add_argument('--stats',
+                       help='処理の内訳をJSONで保存するファイル、"-"で進捗表示と同じ出力先（オプション）')
+ARGSCHEME.add_argument('--profile', choices=['cprofile', 'tracemalloc'],
+                       help='cProfileまたはtracemallocで計測しながら実行する（オプション）')
+ARGSCHEME.add_argument('--profile_output',
+                       help='cProfileの計測結果をpstats形式で保存するファイル（オプション）')
+
+AGGREGATE_ARGSCHEME = argparse.ArgumentParser(
+    prog='main.py aggregate',
+    description='地点のCSV、Parquetファイルをメッシュごとに集計するスクリプト')
+AGGREGATE_ARGSCHEME.add_argument('meshnum', help='メッシュ次数')
+AGGREGATE_ARGSCHEME.add_argument('input', help='地点のCSVファイル、またはParquetファイル')
+AGGREGATE_ARGSCHEME.add_argument('--lon', default='lon', help='経度の列名（オプション）')
+AGGREGATE_ARGSCHEME.add_argument('--lat', default='lat', help='緯度の列名（オプション）')
+AGGREGATE_ARGSCHEME.add_argument('--sum', nargs='+', default=[],
+                                 help='合計値を求める列名（オプション）')
+AGGREGATE_ARGSCHEME.add_argument('-o', '--output', default='-',
+                                 help='集計結果のCSVの保存先、省略時は標準出力（オプション）')
+AGGREGATE_ARGSCHEME.add_argument('--chunk_rows', type=int, default=1024 * 1024,
+                                 help='入力ファイルから一度に読み込む行数（オプション）')
+
+SERVE_ARGSCHEME = argparse.ArgumentParser(
+    prog='main.py serve',
+    description='Webメルカトルのタイルごとにメッシュを返すHTTPサーバー')
+SERVE_ARGSCHEME.add_argument('--host', default='127.0.0.1', help='待ち受けるホスト（オプション）')
+SERVE_ARGSCHEME.add_argument('--port', type=int, default=8000, help='待ち受けるポート（オプション）')
+SERVE_ARGSCHEME.add_argument('--cache_size', type=int, default=1024,
+                             help='キャッシュするタイルの最大件数（オプション）')
+
+# メッシュ次数の別称
+MESHNUM_ALIASES = {
+    "500m": 4,
+    "250m": 5,
+    "125m": 6,
+    "100m": 7,
+    "50m": 8,
+    "10m": 9,
+    "5m": 10,
+}
+
+
+def parse_meshnum(text: str) -> int:
+    """[summary]
+    コマンドで指定されたメッシュ次数または別称を次数に変換する
+
+    Args:
+        text (str): メッシュ次数、または"500m"などの別称
+
+    Returns:
+        int: メッシュ次数
+    """
+    meshnum = MESHNUM_ALIASES.get(text)
+    if meshnum is None:
+        try:
+            meshnum = int(text)
+        except ValueError:
+            raise ValueError(
+                "メッシュ次数を正しく入力してください あなたの入力：" + str(text))
+
+    if meshnum < 1 or 10 < meshnum:
+        raise ValueError("メッシュ次数を正しく入力してください あなたの入力：" + str(text))
+    return meshnum
@@ -0,0 +1,272 @@
+import numpy as np
+
+try:
+    from constants import DIVIDED_MESHNUMS, MESH_INFOS
+    from main import (
+        get_base_cellcount,
+        get_index_range,
+        get_mesh_count,
+        get_unit_grid,
+    )
+    from meshcode import get_meshnum_chain
+except ModuleNotFoundError:
+    from .constants import DIVIDED_MESHNUMS, MESH_INFOS
+    from .main import (
+        get_base_cellcount,
+        get_index_range,
+        get_mesh_count,
+        get_unit_grid,
+    )
+    from .meshcode import get_meshnum_chain
+
+# generate_mesh_arrays()で一度に生成するメッシュ数の既定値
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+def get_mesh_arrays(meshnum: int, extent=None) -> dict:
+    """[summary]
+    メッシュ次数および領域から、その領域に重なる全てのメッシュの情報を列ごとの配列で返す
+    メモリ使用量などを考慮する場合generate_mesh_arrays()を使用してください
+
+    Args:
+        meshnum (int): メッシュ次数
+        extent (list, optional):  経緯度のペアのリストで領域指定
+
+    Returns:
+        dict: 列名をキーとするnumpy配列の辞書、列の内容はget_mesh_columns()を参照
+    """
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    count = max(x_end - x_start, 0) * max(y_end - y_start, 0)
+    return _get_block(meshnum, x_start, x_end, y_start, 0, count)
+
+
+def generate_mesh_arrays(meshnum: int, extent=None, block_size: int = DEFAULT_BLOCK_SIZE):
+    """[summary]
+    メッシュ次数および領域から、その領域に重なるメッシュの情報を
+    block_size個ずつ列ごとの配列で返す
+    メッシュの順序はgenerate_meshes()と同じ
+
+    Args:
+        meshnum (int): メッシュ次数
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        block_size (int, optional): 一度に返すメッシュの最大数
+
+    yield:
+        dict: 列名をキーとするnumpy配列の辞書、列の内容はget_mesh_columns()を参照
+    """
+    if block_size < 1:
+        raise ValueError("block_sizeは1以上で指定してください")
+
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    count = max(x_end - x_start, 0) * max(y_end - y_start, 0)
+    for start in range(0, count, block_size):
+        yield _get_block(meshnum, x_start, x_end, y_start,
+                         start, min(start + block_size, count))
+
+
+def get_mesh_columns(meshnum: int, x, y) -> dict:
+    """[summary]
+    メッシュ次数、メッシュ番地の配列から、メッシュの情報を列ごとの配列で返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        x (numpy.ndarray): 原点から右方向に数えたメッシュ番地
+        y (numpy.ndarray): 原点から上方向に数えたメッシュ番地
+
+    Returns:
+        dict: {
+            "x": x方向のメッシュ番地(int64),
+            "y": y方向のメッシュ番地(int64),
+            "left": 西端の経度(float64),
+            "bottom": 南端の緯度(float64),
+            "right": 東端の経度(float64),
+            "top": 北端の緯度(float64),
+            "code": メッシュコードを整数化した値(int64)
+        }
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    # 頂点座標はget_mesh_vertex()と同じく整数演算から求める
+    x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(meshnum)
+    left = (x_origin + x * x_step) / x_denom
+    bottom = (y_origin + y * y_step) / y_denom
+    right = (x_origin + (x + 1) * x_step) / x_denom
+    top = (y_origin + (y + 1) * y_step) / y_denom
+
+    return {
+        "x": x,
+        "y": y,
+        "left": left,
+        "bottom": bottom,
+        "right": right,
+        "top": top,
+        "code": get_meshcode_array(meshnum, x, y),
+    }
+
+
+def get_meshcode_array(meshnum: int, x, y):
+    """[summary]
+    メッシュ番地の配列から、メッシュコードを整数化した値の配列を返す
+    文字列が必要な場合は.astype(str)で変換できる
+
+    Args:
+        meshnum (int): メッシュ次数
+        x (numpy.ndarray): 原点から右方向に数えたメッシュ番地
+        y (numpy.ndarray): 原点から上方向に数えたメッシュ番地
+
+    Returns:
+        numpy.ndarray: メッシュコード(int64)
+    """
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+
+    # 1次コード：緯度を1.5倍した整数値 + 経度の整数部分の下2桁
+    base_x, base_y, unitcount = get_base_cellcount(meshnum)
+    code = ((y + base_y) // unitcount) * 100 + (x + base_x) // unitcount
+
+    # 2次メッシュコード以降、上位の次数から順にコードを付加
+    for divisor, ratio, is_divided in _get_code_digits(meshnum):
+        x_local = (x // divisor) % ratio
+        y_local = (y // divisor) % ratio
+        if is_divided:
+            code = code * 10 + y_local * 2 + x_local + 1
+        else:
+            code = code * 100 + y_local * 10 + x_local
+    return code
+
+
+def get_mesh_index_array(meshnum: int, lon, lat):
+    """[summary]
+    経緯度の配列に対し、各地点を含むメッシュの番地の配列を返す
+    境界の扱いはget_mesh_index()と同じで、メッシュの境界上の地点は右側・上側のメッシュに含まれる
+
+    Args:
+        meshnum (int): メッシュ次数
+        lon (numpy.ndarray): 経度
+        lat (numpy.ndarray): 緯度
+
+    Returns:
+        tuple: (x方向の番地(int64), y方向の番地(int64))
+            生成範囲外や非数の地点は-1
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(meshnum)
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+
+    x = _get_floor_index_array(lon, x_origin, x_step, x_denom, x_mesh_count)
+    y = _get_floor_index_array(lat, y_origin, y_step, y_denom, y_mesh_count)
+    invalid = (x < 0) | (y < 0)
+    x[invalid] = -1
+    y[invalid] = -1
+    return x, y
+
+
+def encode_meshcodes(meshnum: int, lon, lat):
+    """[summary]
+    経緯度の配列に対し、各地点を含むメッシュのメッシュコードを整数化した値の配列を返す
+    encode_meshcode()の配列版
+
+    Args:
+        meshnum (int): メッシュ次数
+        lon (numpy.ndarray): 経度
+        lat (numpy.ndarray): 緯度
+
+    Returns:
+        numpy.ndarray: メッシュコード(int64)、生成範囲外や非数の地点は0
+    """
+    x, y = get_mesh_index_array(meshnum, lon, lat)
+    invalid = x < 0
+    code = get_meshcode_array(meshnum, np.where(invalid, 0, x), np.where(invalid, 0, y))
+    code[invalid] = 0
+    return code
+
+
+def decode_meshcodes(meshnum: int, codes):
+    """[summary]
+    メッシュコードの配列から、メッシュ番地の配列を返す
+    decode_meshcode()の配列版で、全てのコードが同じメッシュ次数である必要がある
+    範囲などはget_mesh_columns()に番地を渡して求める
+
+    Args:
+        meshnum (int): メッシュ次数
+        codes (numpy.ndarray): メッシュコード（整数値または文字列）
+
+    Returns:
+        tuple: (x方向の番地(int64), y方向の番地(int64))
+            不正なメッシュコードは-1
+    """
+    codes = np.asarray(codes)
+    if codes.dtype.kind in "USO":
+        # 数字以外を含む文字列や、整数値に収まらない桁数の文字列は不正なコードとする
+        text = codes.astype(str)
+        digits = np.char.isdecimal(text) & (np.char.str_len(text) <= 18)
+        rest = np.where(digits, text, "0").astype(np.int64)
+    else:
+        rest = codes.astype(np.int64)
+        digits = np.ones(rest.shape, dtype=bool)
+
+    x = np.zeros(rest.shape, dtype=np.int64)
+    y = np.zeros(rest.shape, dtype=np.int64)
+    valid = digits.copy()
+
+    # 下位の次数のコードから順に取り出し、番地に反映する
+    for divisor, ratio, is_divided in _get_code_digits(meshnum)[::-1]:
+        if is_divided:
+            digit = rest % 10 - 1
+            rest = rest // 10
+            x_local, y_local = digit % ratio, digit // ratio
+            valid &= (0 <= digit) & (digit < ratio * ratio)
+        else:
+            x_local, y_local = rest % 10, (rest // 10) % 10
+            rest = rest // 100
+            valid &= (x_local < ratio) & (y_local < ratio)
+        x += x_local * divisor
+        y += y_local * divisor
+
+    # 1次コード、桁数が合わないコードはここで4桁にならない
+    valid &= (1000 <= rest) & (rest < 10000)
+    base_x, base_y, unitcount = get_base_cellcount(meshnum)
+    x += (rest % 100) * unitcount - base_x
+    y += (rest // 100) * unitcount - base_y
+
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+    valid &= (0 <= x) & (x < x_mesh_count) & (0 <= y) & (y < y_mesh_count)
+    x[~valid] = -1
+    y[~valid] = -1
+    return x, y
+
+
+def _get_floor_index_array(value, origin: int, step: int, denom: int, count: int):
+    # 頂点座標がvalue以下となる最大の番地を返す、範囲外や非数は-1
+    # 近似値から求め、get_mesh_vertex()と同じ頂点座標との比較で丸め誤差を補正する
+    finite = np.isfinite(value)
+    estimate = np.where(finite, (value * denom - origin) / step, -1.0)
+    index = np.floor(np.clip(estimate, -1, count)).astype(np.int64)
+    index += (origin + (index + 1) * step) / denom <= value
+    index -= (origin + index * step) / denom > value
+    index[~finite | (index < 0) | (index >= count)] = -1
+    return index
+
+
+def _get_code_digits(meshnum: int) -> list:
+    # 1次メッシュを除く祖先の次数を上位から並べ、各次数の番地を求めるための
+    # (meshnumの番地に対する除数, 分割数, 分割地域メッシュか)のリストを返す
+    digits = []
+    divisor = 1
+    for level in get_meshnum_chain(meshnum)[:0:-1]:
+        ratio = MESH_INFOS[level]["ratio"]
+        digits.append((divisor, ratio, level in DIVIDED_MESHNUMS))
+        divisor *= ratio
+    return digits[::-1]
+
+
+def _get_block(meshnum: int, x_start: int, x_end: int, y_start: int,
+               start: int, stop: int) -> dict:
+    # 範囲内の左下から数えたstart番目からstop番目までのメッシュの情報を返す
+    width = x_end - x_start
+    flat = np.arange(start, stop, dtype=np.int64)
+    if width <= 0:
+        flat = flat[:0]
+        width = 1
+    return get_mesh_columns(meshnum, x_start + flat % width, y_start + flat // width)
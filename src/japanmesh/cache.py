@@ -0,0 +1,98 @@
+from functools import lru_cache, update_wrapper
+
+# 上位メッシュのメッシュコードなどを保持するキャッシュの既定の最大件数
+DEFAULT_CACHE_SIZE = 1 << 16
+
+# 名前をキーとする登録済みのキャッシュ
+_CACHES = {}
+
+
+class BoundedCache:
+    """[summary]
+    最大件数を超えると最も古く参照された値から破棄するメモ化関数
+    functools.lru_cacheと異なり、最大件数を後から変更できる
+    """
+
+    def __init__(self, func, maxsize: int = DEFAULT_CACHE_SIZE):
+        self._func = func
+        self._cached = None
+        update_wrapper(self, func)
+        self.configure(maxsize)
+
+    def __call__(self, *args):
+        return self._cached(*args)
+
+    def configure(self, maxsize: int):
+        """[summary]
+        最大件数を変更する。保持している値は破棄される
+
+        Args:
+            maxsize (int): 最大件数、0でキャッシュしない、Noneで無制限
+        """
+        if maxsize is not None and maxsize < 0:
+            raise ValueError("maxsizeは0以上で指定してください")
+        self._cached = lru_cache(maxsize=maxsize)(self._func)
+
+    def cache_info(self) -> dict:
+        """[summary]
+        キャッシュの統計情報を返す
+
+        Returns:
+            dict: {"hits":<ヒット数>, "misses":<ミス数>, "size":<保持件数>, "maxsize":<最大件数>}
+        """
+        info = self._cached.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
+
+    def cache_clear(self):
+        self._cached.cache_clear()
+
+
+def bounded_cache(name: str, maxsize: int = DEFAULT_CACHE_SIZE):
+    """[summary]
+    関数をBoundedCacheでメモ化し、nameで登録するデコレータ
+
+    Args:
+        name (str): キャッシュの名前
+        maxsize (int, optional): 最大件数
+    """
+    def decorator(func):
+        cache = BoundedCache(func, maxsize)
+        _CACHES[name] = cache
+        return cache
+    return decorator
+
+
+def configure_cache(name: str, maxsize: int):
+    """[summary]
+    登録済みのキャッシュの最大件数を変更する
+
+    Args:
+        name (str): キャッシュの名前、get_cache_info()のキー
+        maxsize (int): 最大件数、0でキャッシュしない、Noneで無制限
+    """
+    if name not in _CACHES:
+        raise KeyError("キャッシュが登録されていません：" + name)
+    _CACHES[name].configure(maxsize)
+
+
+def get_cache_info() -> dict:
+    """[summary]
+    登録済みの全てのキャッシュの統計情報を返す
+
+    Returns:
+        dict: {<キャッシュの名前>: BoundedCache.cache_info()の値...}
+    """
+    return {name: cache.cache_info() for name, cache in _CACHES.items()}
+
+
+def clear_caches():
+    """[summary]
+    登録済みの全てのキャッシュの値と統計情報を破棄する
+    """
+    for cache in _CACHES.values():
+        cache.cache_clear()
@@ -0,0 +1,256 @@
+import numpy as np
+
+try:
+    from constants import MESH_INFOS
+    from main import get_full_meshcode, get_index_range, get_unit_grid
+    from arrays import DEFAULT_BLOCK_SIZE, decode_meshcodes, generate_mesh_arrays
+except ModuleNotFoundError:
+    from .constants import MESH_INFOS
+    from .main import get_full_meshcode, get_index_range, get_unit_grid
+    from .arrays import DEFAULT_BLOCK_SIZE, decode_meshcodes, generate_mesh_arrays
+
+# ファイル形式の識別子とバージョン
+MAGIC = b"JPMESHCL"
+VERSION = 1
+
+# ヘッダ：件数、メッシュ次数、矩形範囲の番地、全次数のget_unit_grid()の値
+_HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("meshnum", "<u4"),
+    ("count", "<u8"),
+    ("index_range", "<i8", (4,)),
+    ("grid", "<i8", (len(MESH_INFOS), 6)),
+])
+# 各列の開始位置の境界
+_ALIGNMENT = 64
+# 列名と型、この順に連続して格納する
+_COLUMNS = (
+    ("code", np.dtype("<i8")),
+    ("x", np.dtype("<i4")),
+    ("y", np.dtype("<i4")),
+    ("level", np.dtype("u1")),
+)
+
+
+def write_mesh_binary(meshnum: int, path: str, extent=None,
+                      block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """[summary]
+    メッシュ次数および領域から、その領域に重なる全てのメッシュを列形式のバイナリファイルに書き出す
+    メッシュコード(int64)、x・y方向の番地(int32)、メッシュ次数(uint8)を列ごとに連続して格納し、
+    ジオメトリはヘッダに格納した格子の定義から必要に応じて復元する（MeshBinaryReaderを参照）
+    メッシュの順序はgenerate_meshes()と同じ
+
+    Args:
+        meshnum (int): メッシュ次数
+        path (str): 書き込み先のパス
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        block_size (int, optional): 一度に計算するメッシュの最大数
+
+    Returns:
+        int: 書き出したメッシュの数
+    """
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    count = max(x_end - x_start, 0) * max(y_end - y_start, 0)
+
+    header = np.zeros((), dtype=_HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["meshnum"] = meshnum
+    header["count"] = count
+    header["index_range"] = (x_start, x_end, y_start, y_end)
+    for level in range(1, len(MESH_INFOS)):
+        header["grid"][level] = get_unit_grid(level)
+
+    offsets, size = _get_layout(count)
+    buffer = np.memmap(path, dtype=np.uint8, mode="w+", shape=(size,))
+    try:
+        buffer[:_HEADER_DTYPE.itemsize] = np.frombuffer(header.tobytes(), dtype=np.uint8)
+        columns = _get_columns(buffer, offsets, count)
+        columns["level"][:] = meshnum
+
+        # ブロックごとに計算し、ファイル上の列に直接書き込む
+        start = 0
+        for block in generate_mesh_arrays(meshnum, extent, block_size):
+            stop = start + len(block["code"])
+            for name in ("code", "x", "y"):
+                columns[name][start:stop] = block[name]
+            start = stop
+        buffer.flush()
+    finally:
+        del buffer
+    return count
+
+
+class MeshBinaryReader:
+    """[summary]
+    write_mesh_binary()で書き出したファイルをメモリマップで読み込む
+    各列はファイル上の領域を直接参照するnumpy配列で、必要な部分のみがディスクから読み込まれる
+    with文で使用するか、使用後にclose()を呼んでください
+    """
+
+    def __init__(self, path: str):
+        """[summary]
+        Args:
+            path (str): 読み込むファイルのパス
+        """
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(self._buffer) < _HEADER_DTYPE.itemsize:
+            raise ValueError("メッシュのバイナリファイルではありません：" + path)
+        header = self._buffer[:_HEADER_DTYPE.itemsize].view(_HEADER_DTYPE)[0]
+        if header["magic"] != MAGIC:
+            raise ValueError("メッシュのバイナリファイルではありません：" + path)
+        if header["version"] != VERSION:
+            raise ValueError("対応していないバージョンです：" + str(header["version"]))
+
+        self.meshnum = int(header["meshnum"])
+        self.count = int(header["count"])
+        self.index_range = tuple(int(value) for value in header["index_range"])
+        self._grid = np.array(header["grid"], dtype=np.int64)
+
+        offsets, size = _get_layout(self.count)
+        if len(self._buffer) < size:
+            raise ValueError("ファイルが途中で途切れています：" + path)
+        self._columns = _get_columns(self._buffer, offsets, self.count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """[summary]
+        メモリマップを解放する。以降、取得済みの列の配列も使用できない
+        """
+        self._columns = None
+        self._buffer = None
+
+    @property
+    def codes(self):
+        """numpy.ndarray: メッシュコード(int64)"""
+        return self._columns["code"]
+
+    @property
+    def x(self):
+        """numpy.ndarray: x方向のメッシュ番地(int32)"""
+        return self._columns["x"]
+
+    @property
+    def y(self):
+        """numpy.ndarray: y方向のメッシュ番地(int32)"""
+        return self._columns["y"]
+
+    @property
+    def levels(self):
+        """numpy.ndarray: メッシュ次数(uint8)"""
+        return self._columns["level"]
+
+    def read_rows(self, start: int, stop: int) -> dict:
+        """[summary]
+        start行目からstop行目（含まない）までの各列を返す、コピーは行わない
+
+        Args:
+            start (int): 開始行
+            stop (int): 終了行
+
+        Returns:
+            dict: {"code":<メッシュコード>, "x":<x方向の番地>, "y":<y方向の番地>, "level":<メッシュ次数>}
+        """
+        return {name: column[start:stop] for name, column in self._columns.items()}
+
+    def find_rows(self, codes):
+        """[summary]
+        メッシュコードの配列から、そのメッシュが格納されている行の配列を返す
+        ファイルは矩形範囲を行順に格納するため、番地から行を計算し、ファイル全体を走査しない
+
+        Args:
+            codes (numpy.ndarray): メッシュコード（整数値または文字列）
+
+        Returns:
+            numpy.ndarray: 行(int64)、ファイルに含まれないメッシュコードは-1
+        """
+        x_start, x_end, y_start, y_end = self.index_range
+        x, y = decode_meshcodes(self.meshnum, codes)
+        valid = (x_start <= x) & (x < x_end) & (y_start <= y) & (y < y_end)
+        return np.where(valid, (y - y_start) * (x_end - x_start) + (x - x_start), -1)
+
+    def find_row(self, code) -> int:
+        """[summary]
+        メッシュコードから、そのメッシュが格納されている行を返す
+
+        Args:
+            code (str or int): メッシュコード
+
+        Returns:
+            int: 行、ファイルに含まれないメッシュコードは-1
+        """
+        return int(self.find_rows(np.array([code]))[0])
+
+    def get_geometry(self, start: int, stop: int) -> dict:
+        """[summary]
+        start行目からstop行目（含まない）までのメッシュの範囲を、ヘッダの格子の定義から計算する
+
+        Returns:
+            dict: {"left":<西端の経度>, "bottom":<南端の緯度>, "right":<東端の経度>, "top":<北端の緯度>}
+                それぞれfloat64の配列
+        """
+        grid = self._grid[self.levels[start:stop]]
+        x = self.x[start:stop].astype(np.int64)
+        y = self.y[start:stop].astype(np.int64)
+        x_origin, x_step, x_denom, y_origin, y_step, y_denom = grid.T
+        return {
+            "left": (x_origin + x * x_step) / x_denom,
+            "bottom": (y_origin + y * y_step) / y_denom,
+            "right": (x_origin + (x + 1) * x_step) / x_denom,
+            "top": (y_origin + (y + 1) * y_step) / y_denom,
+        }
+
+    def get_mesh(self, row: int) -> dict:
+        """[summary]
+        行から、get_mesh()と同じ形式のメッシュ情報を返す
+
+        Args:
+            row (int): 行
+
+        Returns:
+            dict: {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+        """
+        if not 0 <= row < self.count:
+            raise IndexError("行が範囲外です：" + str(row))
+        bounds = self.get_geometry(row, row + 1)
+        left, bottom, right, top = (float(bounds[name][0])
+                                    for name in ("left", "bottom", "right", "top"))
+        level, x, y = int(self.levels[row]), int(self.x[row]), int(self.y[row])
+        return {
+            "geometry": [[
+                [left, bottom],
+                [left, top],
+                [right, top],
+                [right, bottom],
+                [left, bottom],
+            ]],
+            "code": get_full_meshcode(level, x, y),
+        }
+
+
+def _get_layout(count: int) -> (dict, int):
+    # 各列の開始位置とファイル全体の大きさを返す
+    offsets = {}
+    offset = _HEADER_DTYPE.itemsize
+    for name, dtype in _COLUMNS:
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        offsets[name] = offset
+        offset += count * dtype.itemsize
+    return offsets, offset
+
+
+def _get_columns(buffer, offsets: dict, count: int) -> dict:
+    # ファイル全体のバイト列から、各列を参照する配列を切り出す
+    return {
+        name: buffer[offsets[name]:offsets[name] + count * dtype.itemsize].view(dtype)
+        for name, dtype in _COLUMNS
+    }
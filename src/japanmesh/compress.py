@@ -0,0 +1,186 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import os
+import zlib
+
+# 圧縮形式ごとの拡張子
+EXTENSIONS = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+# 圧縮形式ごとの圧縮レベルの既定値
+DEFAULT_LEVELS = {
+    "gzip": 6,
+    "zstd": 3,
+}
+# 1ブロックのバイト数の既定値、ブロックごとに独立して圧縮する
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+
+class CompressedWriter:
+    """[summary]
+    書き込まれた文字列をブロックごとにスレッドプールで圧縮し、書き込み順に書き出す
+    各ブロックはgzipのメンバー、zstdのフレームとして独立して圧縮し連結するため、
+    出力はgzip、zstdなどの標準的なツールでそのまま展開できる
+    zlib、zstandardは圧縮中にGILを解放するため、呼び出し側でメッシュを生成している間も圧縮が進む
+    """
+
+    def __init__(self, f, method: str = "gzip", level: int = None, threads: int = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE, close_file: bool = True):
+        """[summary]
+        Args:
+            f (file-like): バイナリモードの書き込み先
+            method (str, optional): 圧縮形式、"gzip"または"zstd"（zstandardが必要）
+            level (int, optional): 圧縮レベル、省略時はDEFAULT_LEVELSの値
+            threads (int, optional): 圧縮するスレッド数、省略時はCPU数
+            block_size (int, optional): 1ブロックのバイト数の目安
+            close_file (bool, optional): close()でfも閉じるか
+        """
+        if threads is not None and threads < 1:
+            raise ValueError("圧縮のスレッド数は1以上で指定してください")
+        if block_size < 1:
+            raise ValueError("block_sizeは1以上で指定してください")
+        self.f = f
+        self.close_file = close_file
+        self.block_size = block_size
+        self.threads = threads or os.cpu_count() or 1
+        # 書き込んだバイト数と、圧縮後のバイト数
+        self.uncompressed_size = 0
+        self.compressed_size = 0
+        self._compress = get_compressor(method, level)
+        self._executor = ThreadPoolExecutor(max_workers=self.threads)
+        self._pending = deque()
+        self._buffer = []
+        self._buffered_size = 0
+        self._blocks = 0
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        """[summary]
+        文字列を書き込む。block_sizeに達した分から圧縮を始める
+
+        Args:
+            text (str): 書き込む文字列
+
+        Returns:
+            int: 書き込んだ文字数
+        """
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+        if self._buffered_size >= self.block_size:
+            self._submit()
+        return len(text)
+
+    def flush(self):
+        """[summary]
+        圧縮が終わったブロックを書き出す。圧縮率が下がらないよう、書き込み途中のブロックは書き出さない
+        """
+        while self._pending and self._pending[0].done():
+            self._write_block(self._pending.popleft().result())
+        if hasattr(self.f, "flush"):
+            self.f.flush()
+
+    def close(self):
+        """[summary]
+        残りを圧縮して全て書き出し、スレッドプールを終了する
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # 何も書き込まなかった場合も、展開できる空のデータを書き出す
+            if self._buffer or self._blocks == 0:
+                self._submit()
+            while self._pending:
+                self._write_block(self._pending.popleft().result())
+        finally:
+            self._executor.shutdown()
+            if self.close_file:
+                self.f.close()
+            elif hasattr(self.f, "flush"):
+                self.f.flush()
+
+    def abort(self):
+        """[summary]
+        残りを書き出さずにスレッドプールを終了する。書き込み途中で例外が発生した場合に使う
+        書き出し済みのブロックのみが残り、出力は途中までのデータとなる
+        """
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            # 開始前のブロックは取り消し、圧縮中のブロックは終了を待って破棄する
+            for future in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._buffer = []
+            self._buffered_size = 0
+        finally:
+            self._executor.shutdown()
+            if self.close_file:
+                self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _submit(self):
+        # バッファのブロックの圧縮をスレッドプールに投入し、
+        # 投入済みのブロックがスレッド数の2倍を超える間は先頭から書き出してメモリ使用量を抑える
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        self._buffered_size = 0
+        self._blocks += 1
+        self.uncompressed_size += len(data)
+        self._pending.append(self._executor.submit(self._compress, data))
+        while len(self._pending) > 2 * self.threads:
+            self._write_block(self._pending.popleft().result())
+
+    def _write_block(self, block: bytes):
+        self.f.write(block)
+        self.compressed_size += len(block)
+
+
+def get_compressor(method: str, level: int = None):
+    """[summary]
+    1ブロックを独立したgzipのメンバー、またはzstdのフレームに圧縮する関数を返す
+
+    Args:
+        method (str): 圧縮形式、"gzip"または"zstd"
+        level (int, optional): 圧縮レベル、省略時はDEFAULT_LEVELSの値
+
+    Returns:
+        callable: compress(data: bytes) -> bytes、複数のスレッドから同時に呼び出せる
+    """
+    if method not in EXTENSIONS:
+        raise ValueError("圧縮形式はgzip、zstdのいずれかを指定してください：" + str(method))
+    if level is None:
+        level = DEFAULT_LEVELS[method]
+
+    if method == "gzip":
+        if not 0 <= level <= 9:
+            raise ValueError("gzipの圧縮レベルは0から9の間で指定してください")
+
+        def compress(data: bytes) -> bytes:
+            # wbits=31でgzipのヘッダとフッタを付ける
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return compressor.compress(data) + compressor.flush()
+        return compress
+
+    try:
+        import zstandard
+    except ModuleNotFoundError:
+        raise ModuleNotFoundError("zstd形式の圧縮にはzstandardが必要です")
+    if not 1 <= level <= zstandard.MAX_COMPRESSION_LEVEL:
+        raise ValueError("zstdの圧縮レベルは1から" + str(zstandard.MAX_COMPRESSION_LEVEL)
+                         + "の間で指定してください")
+
+    def compress(data: bytes) -> bytes:
+        # ZstdCompressorはスレッド間で共有できないため、ブロックごとに作成する
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return compress
@@ -1,3 +1,5 @@
+from fractions import Fraction
+
 # メッシュコード生成範囲
 MINIMUM_LON = 122.00
 MAXIMUM_LON = 154.00
@@ -6,6 +8,8 @@ MAXIMUM_LAT = 46.00
 
 # メッシュ番号順で経緯度でのメッシュサイズを定義:(x, y)
 FIRST_MESH_SIZE = (1, 2 / 3)
+# 1次メッシュサイズの厳密値:(x, y)
+FIRST_MESH_SIZE_EXACT = (Fraction(1), Fraction(2, 3))
 
 # メッシュ定義
 # メッシュ次数と配列のインデックスは一致している
@@ -22,3 +26,6 @@ MESH_INFOS = [
     {"parent": 7, "ratio": 10},
     {"parent": 9, "ratio": 2},
 ]
+
+# 分割地域メッシュ：上位要素を4分割し1~4の1桁をメッシュコードに付加する次数
+DIVIDED_MESHNUMS = (4, 5, 6)
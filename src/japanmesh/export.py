@@ -0,0 +1,168 @@
+import json
+import os
+
+try:
+    from parallel import generate_shard_files, get_shards
+    from writer import DEFAULT_CHUNK_SIZE
+except ModuleNotFoundError:
+    from .parallel import generate_shard_files, get_shards
+    from .writer import DEFAULT_CHUNK_SIZE
+
+
+def get_manifest_path(target_dir: str, meshnum: int) -> str:
+    """[summary]
+    書き出しの途中経過を記録するチェックポイントのパスを返す
+    チェックポイントは1行目に書き出しの条件、以降は書き出しが終わった分割ごとに1行のJSONL形式
+
+    Args:
+        target_dir (str): 保存先のディレクトリ
+        meshnum (int): メッシュ次数
+
+    Returns:
+        str: ファイルパス
+    """
+    return os.path.join(target_dir, "mesh_" + str(meshnum) + "_manifest.jsonl")
+
+
+def get_index_path(target_dir: str, meshnum: int) -> str:
+    """[summary]
+    書き出した分割の一覧のパスを返す
+
+    Args:
+        target_dir (str): 保存先のディレクトリ
+        meshnum (int): メッシュ次数
+
+    Returns:
+        str: ファイルパス
+    """
+    return os.path.join(target_dir, "mesh_" + str(meshnum) + "_index.json")
+
+
+def export_partitions(meshnum: int, target_dir: str, extent=None, shard_meshnum: int = 1,
+                      processes: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      precision: int = None, stats=None) -> dict:
+    """[summary]
+    領域を上位メッシュ単位の分割ごとのgeojsonlファイルに書き出し、中断後の再実行では続きから書き出す
+    書き出しが終わった分割はチェックポイント（get_manifest_path()）に1つずつ記録し、
+    再実行時は記録済みでファイルのサイズが一致する分割を飛ばす
+    全ての分割を書き出すと、分割ごとのファイル名・メッシュ数・バイト数の一覧（get_index_path()）を保存する
+
+    Args:
+        meshnum (int): メッシュ次数
+        target_dir (str): 保存先のディレクトリ
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        shard_meshnum (int, optional): 分割の単位とするメッシュ次数
+        processes (int, optional): プロセス数、省略時はCPU数
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 分割ごとの進捗と、待機(wait)の時間の記録先
+            飛ばした分割は"skipped_shards"として数え、メッシュ数を進捗に加える
+
+    Returns:
+        dict: 一覧の内容、{"meshnum", "shard_meshnum", "extent", "precision", "cells", "bytes",
+            "partitions":[{"code", "path", "cells", "bytes"}...]}、分割順
+    """
+    shards = get_shards(meshnum, extent, shard_meshnum)
+    # 保存先が空文字列の場合はカレントディレクトリに書き出す
+    if target_dir:
+        os.makedirs(target_dir, exist_ok=True)
+
+    # 再実行時に条件の異なる書き出しと混ざらないよう、条件をチェックポイントの1行目に記録して照合する
+    settings = {
+        "meshnum": meshnum,
+        "shard_meshnum": shard_meshnum,
+        "extent": extent,
+        "precision": precision,
+    }
+    settings = json.loads(json.dumps(settings))
+    manifest_path = get_manifest_path(target_dir, meshnum)
+    recorded, done = _load_manifest(manifest_path)
+    if recorded is not None and recorded != settings:
+        raise ValueError("保存先に条件の異なる書き出しのチェックポイントがあります：" + manifest_path)
+
+    remaining = []
+    for code, index_range in shards:
+        partition = done.get(code)
+        if partition is not None and _is_complete(target_dir, partition):
+            if stats is not None:
+                stats.count("skipped_shards")
+                stats.advance(partition["cells"])
+            continue
+        remaining.append((code, index_range))
+
+    with open(manifest_path, mode="a") as manifest:
+        if recorded is None:
+            _append_line(manifest, settings)
+        results = generate_shard_files(meshnum, target_dir, remaining, processes,
+                                       chunk_size, precision)
+        if stats is not None:
+            results = stats.iterate(results, "wait")
+        for code, path, count in results:
+            done[code] = {
+                "code": code,
+                "path": os.path.basename(path),
+                "cells": count,
+                "bytes": os.path.getsize(path),
+            }
+            _append_line(manifest, done[code])
+            if stats is not None:
+                stats.count("shards")
+                stats.advance(count)
+
+    partitions = [done[code] for code, _ in shards]
+    index = dict(
+        settings,
+        cells=sum(partition["cells"] for partition in partitions),
+        bytes=sum(partition["bytes"] for partition in partitions),
+        partitions=partitions,
+    )
+    _dump_json(index, get_index_path(target_dir, meshnum))
+    return index
+
+
+def _load_manifest(path: str) -> (dict, dict):
+    # チェックポイントから(書き出しの条件, {メッシュコード: 分割の記録})を読み込む、無い場合は(None, {})
+    # 同じ分割の記録が複数ある場合は後の記録を使う
+    # 書きかけの最終行は、続けて追記する記録と混ざらないよう切り詰める
+    if not os.path.exists(path):
+        return None, {}
+    settings = None
+    done = {}
+    valid_size = 0
+    with open(path, mode="rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line.decode("utf-8"))
+            except ValueError:
+                break
+            if settings is None:
+                settings = record
+            else:
+                done[record["code"]] = record
+            valid_size += len(line)
+    if valid_size < os.path.getsize(path):
+        os.truncate(path, valid_size)
+    return settings, done
+
+
+def _is_complete(target_dir: str, partition: dict) -> bool:
+    # 記録済みの分割のファイルが、記録時のサイズのまま残っているか
+    path = os.path.join(target_dir, partition["path"])
+    return os.path.exists(path) and os.path.getsize(path) == partition["bytes"]
+
+
+def _append_line(f, record: dict):
+    # 1件ずつ追記して書き出し、中断してもそれまでの記録が残るようにする
+    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def _dump_json(obj: dict, path: str):
+    # 書きかけのファイルが残らないよう、一時ファイルに書き出してから置き換える
+    temp_path = path + ".tmp"
+    with open(temp_path, mode="w") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,254 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+
+# 進捗の通知間隔（秒）の既定値
+DEFAULT_PROGRESS_INTERVAL = 1.0
+# 経過時間を確認する間隔（件数）、件数ごとにtime.perf_counter()を呼ばないようにする
+_CHECK_EVERY = 4096
+# run_profiled()で表示する行数
+_PROFILE_LINES = 30
+
+
+class JobStats:
+    """[summary]
+    メッシュの生成・書き出し処理の段階ごとの所要時間、件数、進捗を記録する
+    write_geojsonl()などにstatsとして渡すと、生成(generate)・文字列化(serialize)・
+    書き込み(write)の各段階の時間と、書き出したメッシュ数(cells)を記録する
+    """
+
+    def __init__(self, total: int = None, callback=None,
+                 interval: float = DEFAULT_PROGRESS_INTERVAL):
+        """[summary]
+        Args:
+            total (int, optional): 処理するメッシュの総数、不明な場合はNone
+            callback (callable, optional): 進捗の通知先、callback(stats)の形で呼ばれる
+            interval (float, optional): 進捗の通知間隔（秒）
+        """
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self.done = 0
+        self.stages = {}
+        self.counters = {}
+        self._started = time.perf_counter()
+        self._current = None
+        self._switched = self._started
+        self._notified = self._started
+        self._next_check = _CHECK_EVERY
+
+    @property
+    def elapsed(self) -> float:
+        """float: 開始からの経過秒数"""
+        return time.perf_counter() - self._started
+
+    @property
+    def eta(self) -> float:
+        """float: 残りの推定秒数、総数が不明または未処理の場合はNone"""
+        if not self.total or not self.done:
+            return None
+        return self.elapsed * (self.total - self.done) / self.done
+
+    def enter(self, stage: str) -> str:
+        """[summary]
+        処理中の段階を切り替え、直前の段階に経過時間を加算する
+
+        Args:
+            stage (str): 段階の名前、Noneで段階外
+
+        Returns:
+            str: 直前の段階の名前
+        """
+        now = time.perf_counter()
+        previous = self._current
+        if previous is not None:
+            self.stages[previous] = self.stages.get(previous, 0.0) + now - self._switched
+        self._current = stage
+        self._switched = now
+        return previous
+
+    def stage(self, stage: str):
+        """[summary]
+        with文の間をstageの段階として計測する。入れ子にした場合、内側の時間は外側に含まない
+
+        Args:
+            stage (str): 段階の名前
+        """
+        return _Stage(self, stage)
+
+    def iterate(self, iterable, stage: str):
+        """[summary]
+        イテラブルの各要素を取り出す時間をstageの段階として計測する
+        ジェネレータを入れ子に渡した場合も、それぞれの段階の時間は重複しない
+
+        Args:
+            iterable (iterable): 計測するイテラブル
+            stage (str): 段階の名前
+
+        yield:
+            iterableの要素
+        """
+        iterator = iter(iterable)
+        while True:
+            previous = self.enter(stage)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.enter(previous)
+                return
+            self.enter(previous)
+            yield item
+
+    def count(self, name: str, n: int = 1):
+        """[summary]
+        件数を加算する
+
+        Args:
+            name (str): 件数の名前
+            n (int, optional): 加算する件数
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def advance(self, n: int = 1):
+        """[summary]
+        処理済みのメッシュ数を加算し、前回の通知からintervalを過ぎていれば進捗を通知する
+
+        Args:
+            n (int, optional): 加算するメッシュ数
+        """
+        self.done += n
+        if self.callback is None or self.done < self._next_check:
+            return
+        self._next_check = self.done + _CHECK_EVERY
+        now = time.perf_counter()
+        if now - self._notified >= self.interval:
+            self._notified = now
+            self.callback(self)
+
+    def finish(self):
+        """[summary]
+        処理中の段階を終了し、進捗を通知する
+        """
+        self.enter(None)
+        if self.callback is not None:
+            self.callback(self)
+
+    def to_dict(self) -> dict:
+        """[summary]
+        記録した内容を返す
+
+        Returns:
+            dict: {"elapsed":<経過秒数>, "total":<総数>, "done":<処理済みのメッシュ数>,
+                "cells_per_sec":<メッシュ数/秒>, "stages":<段階ごとの秒数>, "counters":<件数>}
+        """
+        elapsed = self.elapsed
+        return {
+            "elapsed": elapsed,
+            "total": self.total,
+            "done": self.done,
+            "cells_per_sec": self.done / elapsed if elapsed > 0 else 0.0,
+            "stages": dict(self.stages),
+            "counters": dict(self.counters),
+        }
+
+
+class _Stage:
+    def __init__(self, stats: JobStats, stage: str):
+        self._stats = stats
+        self._stage = stage
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = self._stats.enter(self._stage)
+        return self._stats
+
+    def __exit__(self, *args):
+        self._stats.enter(self._previous)
+
+
+def format_progress(stats: JobStats) -> str:
+    """[summary]
+    進捗を"12.3% (1,234/10,000) 1,234 cells/s ETA 0:01:23"の形式の文字列にする
+
+    Args:
+        stats (JobStats): 進捗
+
+    Returns:
+        str: 進捗の文字列
+    """
+    elapsed = stats.elapsed
+    speed = "{:,.0f} cells/s".format(stats.done / elapsed if elapsed > 0 else 0.0)
+    if not stats.total:
+        return "{:,} {}".format(stats.done, speed)
+    eta = stats.eta
+    return "{:.1f}% ({:,}/{:,}) {} ETA {}".format(
+        100 * stats.done / stats.total, stats.done, stats.total, speed,
+        "-" if eta is None else _format_seconds(eta))
+
+
+def print_progress(file=None):
+    """[summary]
+    format_progress()の文字列を1行ずつ書き出す、JobStatsのcallbackに渡す関数を返す
+
+    Args:
+        file (file-like, optional): 書き出し先、省略時は標準エラー出力
+
+    Returns:
+        callable: callback(stats)
+    """
+    def callback(stats: JobStats):
+        print(format_progress(stats), file=file or sys.stderr, flush=True)
+    return callback
+
+
+def run_profiled(func, mode: str, output: str = None, stats: JobStats = None, log=None):
+    """[summary]
+    関数をcProfileまたはtracemallocで計測しながら実行する
+
+    Args:
+        func (callable): 引数なしで呼び出す関数
+        mode (str): "cprofile"は関数ごとの所要時間、"tracemalloc"は確保したメモリを計測する
+        output (str, optional): cprofileの計測結果の保存先（pstats形式）、省略時は上位の関数をlogに表示する
+        stats (JobStats, optional): tracemallocのメモリ使用量の最大値を"tracemalloc_peak"として記録する
+        log (file-like, optional): 計測結果の表示先、省略時は標準エラー出力
+
+    Returns:
+        funcの戻り値
+    """
+    log = log or sys.stderr
+    if mode == "cprofile":
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(func)
+        finally:
+            if output:
+                profile.dump_stats(output)
+            else:
+                text = io.StringIO()
+                pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(
+                    _PROFILE_LINES)
+                log.write(text.getvalue())
+    elif mode == "tracemalloc":
+        tracemalloc.start()
+        try:
+            return func()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if stats is not None:
+                stats.counters["tracemalloc_peak"] = peak
+            print("tracemalloc peak: {:,} bytes".format(peak), file=log)
+            for statistic in snapshot.statistics("lineno")[:_PROFILE_LINES]:
+                print(statistic, file=log)
+    else:
+        raise ValueError("計測方法はcprofile、tracemallocのいずれかを指定してください：" + str(mode))
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02}:{:02}".format(hours, minutes, seconds)
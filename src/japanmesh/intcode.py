@@ -0,0 +1,286 @@
+import numpy as np
+
+try:
+    from constants import MESH_INFOS
+    from main import get_base_cellcount, get_full_meshcode, get_mesh_count
+    from meshcode import decode_meshcode, get_meshnum_chain
+    from arrays import decode_meshcodes, get_meshcode_array
+except ModuleNotFoundError:
+    from .constants import MESH_INFOS
+    from .main import get_base_cellcount, get_full_meshcode, get_mesh_count
+    from .meshcode import decode_meshcode, get_meshnum_chain
+    from .arrays import decode_meshcodes, get_meshcode_array
+
+# 整数コードのビット配置：上位からメッシュ次数(8bit)、y方向の番地(28bit)、x方向の番地(28bit)
+LEVEL_SHIFT = 56
+Y_SHIFT = 28
+INDEX_MASK = (1 << Y_SHIFT) - 1
+
+# 整数コードが存在しないことを表す値
+INVALID_INTCODE = 0
+
+_MESHNUMS = range(1, len(MESH_INFOS))
+# メッシュ次数をインデックスとする、親の次数・分割数・1次メッシュあたりのメッシュ数
+_PARENTS = np.array([0] + [MESH_INFOS[meshnum]["parent"] for meshnum in _MESHNUMS], dtype=np.int64)
+_RATIOS = np.array([1] + [MESH_INFOS[meshnum]["ratio"] for meshnum in _MESHNUMS], dtype=np.int64)
+_UNITCOUNTS = np.array([1] + [get_base_cellcount(meshnum)[2] for meshnum in _MESHNUMS], dtype=np.int64)
+# メッシュ次数をインデックスとする、生成範囲全体のx方向y方向それぞれのメッシュ数
+_X_MESH_COUNTS = np.array([0] + [get_mesh_count(meshnum)[0] for meshnum in _MESHNUMS], dtype=np.int64)
+_Y_MESH_COUNTS = np.array([0] + [get_mesh_count(meshnum)[1] for meshnum in _MESHNUMS], dtype=np.int64)
+# [次数, 祖先の次数]が祖先の関係にあるか
+_IS_ANCESTOR = np.zeros((len(MESH_INFOS), len(MESH_INFOS)), dtype=bool)
+for _meshnum in _MESHNUMS:
+    _IS_ANCESTOR[_meshnum, get_meshnum_chain(_meshnum)] = True
+
+
+def to_intcode(meshnum, x, y):
+    """[summary]
+    メッシュ次数、メッシュ番地から整数コードを返す
+    整数コードはメッシュ次数と番地を64bitに詰めた値で、大小関係は次数、y、xの順に比較した順序と一致する
+
+    Args:
+        meshnum (int or numpy.ndarray): メッシュ次数
+        x (int or numpy.ndarray): 原点から右方向に数えたメッシュ番地
+        y (int or numpy.ndarray): 原点から上方向に数えたメッシュ番地
+
+    Returns:
+        int or numpy.ndarray: 整数コード、配列の場合はuint64
+    """
+    if _is_array(meshnum, x, y):
+        meshnum = np.asarray(meshnum, dtype=np.int64)
+        x = np.asarray(x, dtype=np.int64)
+        y = np.asarray(y, dtype=np.int64)
+        return ((meshnum << LEVEL_SHIFT) | (y << Y_SHIFT) | x).astype(np.uint64)
+    return (meshnum << LEVEL_SHIFT) | (y << Y_SHIFT) | x
+
+
+def from_intcode(intcode) -> tuple:
+    """[summary]
+    整数コードから、メッシュ次数とメッシュ番地を返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード
+
+    Returns:
+        tuple: (メッシュ次数, x方向の番地, y方向の番地)、配列の場合はそれぞれint64の配列
+    """
+    if _is_array(intcode):
+        intcode = np.asarray(intcode, dtype=np.uint64)
+        return (
+            (intcode >> LEVEL_SHIFT).astype(np.int64),
+            (intcode & INDEX_MASK).astype(np.int64),
+            ((intcode >> Y_SHIFT) & INDEX_MASK).astype(np.int64),
+        )
+    return intcode >> LEVEL_SHIFT, intcode & INDEX_MASK, (intcode >> Y_SHIFT) & INDEX_MASK
+
+
+def get_intcode_level(intcode):
+    """[summary]
+    整数コードのメッシュ次数を返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード
+
+    Returns:
+        int or numpy.ndarray: メッシュ次数
+    """
+    return from_intcode(intcode)[0]
+
+
+def meshcode_to_intcode(code: str, meshnum: int = None) -> int:
+    """[summary]
+    メッシュコードを整数コードに変換する
+
+    Args:
+        code (str): メッシュコード
+        meshnum (int, optional): メッシュ次数、decode_meshcode()を参照
+
+    Returns:
+        int: 整数コード
+    """
+    return to_intcode(*decode_meshcode(code, meshnum))
+
+
+def intcode_to_meshcode(intcode: int) -> str:
+    """[summary]
+    整数コードをメッシュコードに変換する
+
+    Args:
+        intcode (int): 整数コード
+
+    Returns:
+        str: メッシュコード
+    """
+    meshnum, x, y = from_intcode(int(intcode))
+    _validate(meshnum, x, y)
+    return get_full_meshcode(meshnum, x, y)
+
+
+def meshcodes_to_intcodes(meshnum: int, codes):
+    """[summary]
+    メッシュコードの配列を整数コードの配列に変換する、全てのコードが同じ次数である必要がある
+
+    Args:
+        meshnum (int): メッシュ次数
+        codes (numpy.ndarray): メッシュコード（整数値または文字列）
+
+    Returns:
+        numpy.ndarray: 整数コード(uint64)、不正なメッシュコードはINVALID_INTCODE
+    """
+    x, y = decode_meshcodes(meshnum, codes)
+    intcodes = to_intcode(np.full(x.shape, meshnum), x, y)
+    intcodes[x < 0] = INVALID_INTCODE
+    return intcodes
+
+
+def intcodes_to_meshcodes(intcodes):
+    """[summary]
+    整数コードの配列をメッシュコードの配列に変換する、次数が混在していてもよい
+
+    Args:
+        intcodes (numpy.ndarray): 整数コード
+
+    Returns:
+        numpy.ndarray: メッシュコード（文字列）
+    """
+    meshnums, x, y = from_intcode(np.asarray(intcodes, dtype=np.uint64))
+    codes = np.zeros(meshnums.shape, dtype=np.int64)
+    for meshnum in np.unique(meshnums):
+        target = meshnums == meshnum
+        _validate(int(meshnum), int(np.max(x[target])), int(np.max(y[target])))
+        codes[target] = get_meshcode_array(int(meshnum), x[target], y[target])
+    return codes.astype(str)
+
+
+def get_parent_intcode(intcode):
+    """[summary]
+    整数コードから親メッシュの整数コードを返す、1次メッシュは自身を返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード、次数が混在していてもよい
+
+    Returns:
+        int or numpy.ndarray: 親メッシュの整数コード
+    """
+    meshnum, x, y = from_intcode(intcode)
+    ratio = _RATIOS[meshnum]
+    return _result(to_intcode(_PARENTS[meshnum], x // ratio, y // ratio), intcode)
+
+
+def get_ancestor_intcode(intcode, meshnum: int):
+    """[summary]
+    整数コードから、meshnum次の祖先メッシュの整数コードを返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード、次数が混在していてもよい
+        meshnum (int): 祖先のメッシュ次数、自身の次数も指定できる
+
+    Returns:
+        int or numpy.ndarray: 祖先メッシュの整数コード
+            配列の場合、meshnumが祖先の次数でない要素はINVALID_INTCODE
+    """
+    levels, x, y = from_intcode(intcode)
+    valid = _IS_ANCESTOR[levels, meshnum]
+    if not _is_array(intcode) and not valid:
+        raise ValueError("祖先のメッシュ次数を指定してください：" + str(meshnum))
+
+    # 祖先でない要素は除数が0とならないよう1とし、後で無効にする
+    factor = np.maximum(_UNITCOUNTS[levels] // _UNITCOUNTS[meshnum], 1)
+    ancestors = to_intcode(np.full(np.shape(levels), meshnum), x // factor, y // factor)
+    if _is_array(intcode):
+        ancestors[~valid] = INVALID_INTCODE
+    return _result(ancestors, intcode)
+
+
+def get_children_intcodes(intcode, meshnum: int):
+    """[summary]
+    整数コードから、その範囲に含まれるmeshnum次のメッシュの整数コードを返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード、配列の場合は全て同じ次数である必要がある
+        meshnum (int): 子孫のメッシュ次数
+
+    Returns:
+        list or numpy.ndarray: 子孫メッシュの整数コード、下の行から順に、各行では左から順に並ぶ
+            配列の場合は(要素数, 子孫メッシュ数)の配列
+    """
+    levels, x, y = from_intcode(intcode)
+    if _is_array(intcode):
+        unique_levels = np.unique(levels)
+        if len(unique_levels) > 1:
+            raise ValueError("整数コードの次数が混在しています")
+        level = int(unique_levels[0]) if len(unique_levels) else meshnum
+    else:
+        level = levels
+    if not _IS_ANCESTOR[meshnum, level]:
+        raise ValueError("子孫のメッシュ次数を指定してください：" + str(meshnum))
+
+    factor = int(_UNITCOUNTS[meshnum] // _UNITCOUNTS[level])
+    local_y, local_x = np.divmod(np.arange(factor * factor, dtype=np.int64), factor)
+    if _is_array(intcode):
+        children_x = np.asarray(x)[:, np.newaxis] * factor + local_x
+        children_y = np.asarray(y)[:, np.newaxis] * factor + local_y
+        return to_intcode(np.full(children_x.shape, meshnum), children_x, children_y)
+    return [int(child) for child in to_intcode(
+        np.full(local_x.shape, meshnum), x * factor + local_x, y * factor + local_y)]
+
+
+def shift_intcode(intcode, dx: int, dy: int):
+    """[summary]
+    整数コードから、x方向にdx、y方向にdyずらした同じ次数のメッシュの整数コードを返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード、次数が混在していてもよい
+        dx (int): x方向のずれ
+        dy (int): y方向のずれ
+
+    Returns:
+        int or numpy.ndarray: 整数コード、生成範囲外となる場合はINVALID_INTCODE
+    """
+    meshnum, x, y = from_intcode(intcode)
+    x = x + dx
+    y = y + dy
+    valid = (0 <= x) & (x < _X_MESH_COUNTS[meshnum]) & (0 <= y) & (y < _Y_MESH_COUNTS[meshnum])
+    if not _is_array(intcode):
+        return to_intcode(meshnum, x, y) if valid else INVALID_INTCODE
+    shifted = to_intcode(meshnum, x, y)
+    shifted[~valid] = INVALID_INTCODE
+    return shifted
+
+
+def get_neighbor_intcodes(intcode):
+    """[summary]
+    整数コードから、隣接する同じ次数のメッシュの整数コードを返す
+
+    Args:
+        intcode (int or numpy.ndarray): 整数コード、次数が混在していてもよい
+
+    Returns:
+        list or numpy.ndarray: 南西から順に北東までの8つの整数コード
+            生成範囲外となる隣接メッシュはINVALID_INTCODE、配列の場合は(要素数, 8)の配列
+    """
+    shifts = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if (dx, dy) != (0, 0)]
+    neighbors = [shift_intcode(intcode, dx, dy) for dx, dy in shifts]
+    if _is_array(intcode):
+        return np.stack(neighbors, axis=-1)
+    return neighbors
+
+
+def _is_array(*values) -> bool:
+    return any(isinstance(value, np.ndarray) for value in values)
+
+
+def _result(value, intcode):
+    # 入力が配列でなければPythonの整数で返す
+    if _is_array(intcode):
+        return value
+    return int(value)
+
+
+def _validate(meshnum: int, x: int, y: int):
+    if not 1 <= meshnum < len(MESH_INFOS):
+        raise ValueError("整数コードのメッシュ次数が不正です：" + str(meshnum))
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+    if not (x < x_mesh_count and y < y_mesh_count):
+        raise ValueError("整数コードの番地が生成範囲外です")
+
@@ -1,20 +1,23 @@
+from fractions import Fraction
 from functools import lru_cache
 import os
 import math
 
 try:
+    from cache import bounded_cache
     from constants import (
         MESH_INFOS,
-        FIRST_MESH_SIZE,
+        FIRST_MESH_SIZE_EXACT,
         MINIMUM_LAT,
         MINIMUM_LON,
         MAXIMUM_LAT,
         MAXIMUM_LON
     )
 except ModuleNotFoundError:
+    from .cache import bounded_cache
     from .constants import (
         MESH_INFOS,
-        FIRST_MESH_SIZE,
+        FIRST_MESH_SIZE_EXACT,
         MINIMUM_LAT,
         MINIMUM_LON,
         MAXIMUM_LAT,
@@ -23,45 +26,115 @@ except ModuleNotFoundError:
 
 
 @lru_cache(maxsize=None)
-def get_meshsize(meshnum: int) -> [float, float]:
+def get_meshsize(meshnum: int) -> (float, float):
+    x_size, y_size = get_exact_meshsize(meshnum)
+    return float(x_size), float(y_size)
+
+
+@lru_cache(maxsize=None)
+def get_exact_meshsize(meshnum: int) -> (Fraction, Fraction):
+    """[summary]
+    メッシュ次数に対し、経緯度でのメッシュサイズを分数で厳密に返す
+
+    Args:
+        meshnum (int): メッシュ次数
+
+    Returns:
+        tuple: (経度方向のサイズ, 緯度方向のサイズ)
+    """
     if meshnum == 1:
-        return FIRST_MESH_SIZE
+        return FIRST_MESH_SIZE_EXACT
 
     meshinfo = MESH_INFOS[meshnum]
-    parent_meshsize = get_meshsize((meshinfo["parent"]))
-    meshsize = [
-        parent_meshsize[0] / meshinfo["ratio"],
-        parent_meshsize[1] / meshinfo["ratio"],
-    ]
-    return meshsize
+    parent_x_size, parent_y_size = get_exact_meshsize(meshinfo["parent"])
+    return parent_x_size / meshinfo["ratio"], parent_y_size / meshinfo["ratio"]
 
 
-def get_start_offset(meshnum: int, lonlat: list) -> tuple:
+@lru_cache(maxsize=None)
+def get_unit_grid(meshnum: int) -> (int, int, int, int, int, int):
     """[summary]
-    メッシュ次数と経緯度に対し、原点（左下）から数えて何個のメッシュをスキップするか計算
+    メッシュ次数に対し、メッシュの頂点座標を整数で表すための係数を返す
+    番地x,yの頂点は、経度(x_origin + x * x_step) / x_denom、
+    緯度(y_origin + y * y_step) / y_denom で求まる
+    整数同士の除算は正しく丸められるため、同じ頂点はどの次数から求めても同じ値になる
+
+    Args:
+        meshnum (int): メッシュ次数
+
+    Returns:
+        tuple: (x_origin, x_step, x_denom, y_origin, y_step, y_denom)
+    """
+    x_size, y_size = get_exact_meshsize(meshnum)
+    grid = []
+    for origin, size in ((Fraction(MINIMUM_LON), x_size), (Fraction(MINIMUM_LAT), y_size)):
+        denom = origin.denominator * size.denominator // math.gcd(
+            origin.denominator, size.denominator)
+        grid.extend([
+            origin.numerator * (denom // origin.denominator),
+            size.numerator * (denom // size.denominator),
+            denom,
+        ])
+    return tuple(grid)
+
+
+@lru_cache(maxsize=None)
+def get_mesh_count(meshnum: int) -> (int, int):
+    """[summary]
+    メッシュ次数に対し、生成範囲全体のx方向y方向それぞれのメッシュ数を返す
+
+    Args:
+        meshnum (int): メッシュ次数
+
+    Returns:
+        tuple: (x方向のメッシュ数, y方向のメッシュ数)
+    """
+    x_size, y_size = get_exact_meshsize(meshnum)
+    x_mesh_count = math.ceil((Fraction(MAXIMUM_LON) - Fraction(MINIMUM_LON)) / x_size)
+    y_mesh_count = math.ceil((Fraction(MAXIMUM_LAT) - Fraction(MINIMUM_LAT)) / y_size)
+    return x_mesh_count, y_mesh_count
+
+
+def get_mesh_index(meshnum: int, lonlat: list) -> (int, int):
+    """[summary]
+    メッシュ次数と経緯度に対し、その地点を含むメッシュの番地を返す
+    メッシュの境界上の地点は右側・上側のメッシュに含まれる
+    生成範囲外の地点は範囲外の番地（負の値など）となる
+
     Args:
         meshnum (int): メッシュ次数
         lonlat ([float, float]): [経度, 緯度]
 
     Returns:
-        tuple: (x方向のオフセット、y方向のオフセット)
+        tuple: (x方向の番地, y方向の番地)
     """
-    x_mesh_dist, y_mesh_dist = get_meshsize(meshnum)
+    x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(meshnum)
+    return (_get_floor_index(lonlat[0], x_origin, x_step, x_denom),
+            _get_floor_index(lonlat[1], y_origin, y_step, y_denom))
 
-    x_offset = 0
-    while lonlat[0] >= MINIMUM_LON + x_mesh_dist * (x_offset + 1):
-        x_offset += 1
 
-    y_offset = 0
-    while lonlat[1] >= MINIMUM_LAT + y_mesh_dist * (y_offset + 1):
-        y_offset += 1
+def _get_floor_index(value: float, origin: int, step: int, denom: int) -> int:
+    # 頂点座標がvalue以下となる最大の番地を返す
+    # 近似値から求め、頂点座標との比較で丸め誤差を補正する
+    index = math.floor((value * denom - origin) / step)
+    while (origin + (index + 1) * step) / denom <= value:
+        index += 1
+    while (origin + index * step) / denom > value:
+        index -= 1
+    return index
 
-    return x_offset, y_offset
 
+def _get_ceil_index(value: float, origin: int, step: int, denom: int) -> int:
+    # 頂点座標がvalue以上となる最小の番地を返す
+    index = _get_floor_index(value, origin, step, denom)
+    if (origin + index * step) / denom < value:
+        index += 1
+    return index
 
-def get_end_offset(meshnum: int, lonlat: list) -> tuple:
+
+def get_start_offset(meshnum: int, lonlat: list) -> tuple:
     """[summary]
-    メッシュ次数と経緯度に対し、終点（右上）から数えて何個のメッシュをスキップするか計算
+    メッシュ次数と経緯度に対し、原点（左下）から数えて何個のメッシュをスキップするか計算
+    東端・北端の頂点座標がlonlat以下となるメッシュをスキップする
     Args:
         meshnum (int): メッシュ次数
         lonlat ([float, float]): [経度, 緯度]
@@ -69,17 +142,27 @@ def get_end_offset(meshnum: int, lonlat: list) -> tuple:
     Returns:
         tuple: (x方向のオフセット、y方向のオフセット)
     """
-    x_mesh_dist, y_mesh_dist = get_meshsize(meshnum)
+    x_index, y_index = get_mesh_index(meshnum, lonlat)
+    return max(x_index, 0), max(y_index, 0)
 
-    x_offset = 0
-    while lonlat[0] <= MAXIMUM_LON - x_mesh_dist * (x_offset + 1):
-        x_offset += 1
 
-    y_offset = 0
-    while lonlat[1] <= MAXIMUM_LAT - y_mesh_dist * (y_offset + 1):
-        y_offset += 1
+def get_end_offset(meshnum: int, lonlat: list) -> tuple:
+    """[summary]
+    メッシュ次数と経緯度に対し、終点（右上）から数えて何個のメッシュをスキップするか計算
+    西端・南端の頂点座標がlonlat以上となるメッシュをスキップする
+    Args:
+        meshnum (int): メッシュ次数
+        lonlat ([float, float]): [経度, 緯度]
 
-    return x_offset, y_offset
+    Returns:
+        tuple: (x方向のオフセット、y方向のオフセット)
+    """
+    x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(meshnum)
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+
+    x_offset = x_mesh_count - _get_ceil_index(lonlat[0], x_origin, x_step, x_denom)
+    y_offset = y_mesh_count - _get_ceil_index(lonlat[1], y_origin, y_step, y_denom)
+    return max(x_offset, 0), max(y_offset, 0)
 
 
 def get_meshes(meshnum: int, extent=None) -> list:
@@ -112,10 +195,44 @@ def generate_meshes(meshnum: int, extent=None):
         {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}...
     """
 
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    yield from generate_meshes_in_range(meshnum, x_start, x_end, y_start, y_end)
+
+
+def generate_meshes_in_range(meshnum: int, x_start: int, x_end: int, y_start: int, y_end: int):
+    """[summary]
+    メッシュ次数および番地の範囲から、範囲内の全てのメッシュの情報を返す
+    メッシュは下の行から順に、各行では左から順に返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        x_start (int): xの開始番地
+        x_end (int): xの終了番地（範囲に含まない）
+        y_start (int): yの開始番地
+        y_end (int): yの終了番地（範囲に含まない）
+
+    yield:
+        {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}...
+    """
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            yield get_mesh(meshnum, x, y)
+
+
+def get_index_range(meshnum: int, extent=None) -> (int, int, int, int):
+    """[summary]
+    メッシュ次数および領域から、その領域に重なるメッシュ番地の範囲を返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        extent (list, optional):  経緯度のペアのリストで領域指定
+
+    Returns:
+        tuple: (xの開始番地, xの終了番地, yの開始番地, yの終了番地)
+            終了番地は範囲に含まない
+    """
     # メッシュのx方向y方向それぞれの数
-    x_size, y_size = get_meshsize(meshnum)
-    x_mesh_count = math.ceil((MAXIMUM_LON - MINIMUM_LON) / x_size)
-    y_mesh_count = math.ceil((MAXIMUM_LAT - MINIMUM_LAT) / y_size)
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
 
     # スキップすべきメッシュの数＝オフセットを計算
     start_offset = [0, 0]
@@ -135,12 +252,10 @@ def generate_meshes(meshnum: int, extent=None):
         start_offset = get_start_offset(meshnum, cleaned_extent[0])
         end_offset = get_end_offset(meshnum, cleaned_extent[1])
 
-    for y in range(start_offset[1], y_mesh_count - end_offset[1]):
-        for x in range(start_offset[0], x_mesh_count - end_offset[0]):
-            yield get_mesh(meshnum, x, y)
+    return (start_offset[0], x_mesh_count - end_offset[0],
+            start_offset[1], y_mesh_count - end_offset[1])
 
 
-@lru_cache(maxsize=None)
 def get_meshcode(meshnum: int, x: int, y: int) -> str:
     # 2次メッシュコード以降、メッシュ次数に応じてコードを2桁ずつ付加
     # 1-3:標準地域メッシュ
@@ -152,14 +267,22 @@ def get_meshcode(meshnum: int, x: int, y: int) -> str:
         # 1次コード：緯度を1.5倍した整数値 + 経度の整数部分の下2桁
         return ""
     elif meshnum == 4 or meshnum == 5 or meshnum == 6:
-        return get_meshcode(parent, math.floor(x / ratio), math.floor(y / ratio)) + str((y % ratio) * 2 + (x % ratio) + 1)
+        return _get_parent_meshcode(parent, x // ratio, y // ratio) + str((y % ratio) * 2 + (x % ratio) + 1)
     else:
-        return get_meshcode(parent, math.floor(x / ratio), math.floor(y / ratio)) + str(y % ratio) + str(x % ratio)
+        return _get_parent_meshcode(parent, x // ratio, y // ratio) + str(y % ratio) + str(x % ratio)
 
 
-@ lru_cache(maxsize=None)
-def get_mesh_vertex(x: int, x_size: float, y: int, y_size: float) -> (float, float):
-    return MINIMUM_LON + x * x_size, MINIMUM_LAT + y * y_size
+@bounded_cache("parent_meshcode")
+def _get_parent_meshcode(meshnum: int, x: int, y: int) -> str:
+    # 上位メッシュのコードは隣接するメッシュで繰り返し使われるためキャッシュする
+    # 末端のメッシュのコードは再利用されないためキャッシュしない
+    return get_meshcode(meshnum, x, y)
+
+
+def get_mesh_vertex(meshnum: int, x: int, y: int) -> (float, float):
+    # 番地x,yのメッシュの左下の頂点座標を整数演算から求める
+    x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(meshnum)
+    return (x_origin + x * x_step) / x_denom, (y_origin + y * y_step) / y_denom
 
 
 @lru_cache(maxsize=None)
@@ -179,9 +302,9 @@ def get_base_cellcount(meshnum: int) -> (int, int, int):
     return x, y, unitcount
 
 
-def get_mesh(meshnum: int, x: int, y: int) -> dict:
+def get_full_meshcode(meshnum: int, x: int, y: int) -> str:
     """[summary]
-    メッシュ次数、メッシュ番地からメッシュのジオメトリとメッシュコードを返す
+    メッシュ次数、メッシュ番地から1次メッシュコードを含むメッシュコードを返す
 
     Args:
         meshnum (int): メッシュ次数
@@ -189,18 +312,32 @@ def get_mesh(meshnum: int, x: int, y: int) -> dict:
         y (int): 原点から上方向に数えたメッシュ番地
 
     Returns:
-        dict: {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+        str: メッシュコード
     """
-    x_size, y_size = get_meshsize(meshnum)
-    left_lon, bottom_lat = get_mesh_vertex(x, x_size, y, y_size)
-    right_lon, top_lat = get_mesh_vertex(x + 1, x_size, y + 1, y_size)
-
     base_x, base_y, unitcount = get_base_cellcount(meshnum)
 
     x_1st = (x + base_x) // unitcount
     y_1st = (y + base_y) // unitcount
 
-    code = str(y_1st) + str(x_1st) + get_meshcode(meshnum, x, y)
+    return str(y_1st) + str(x_1st) + get_meshcode(meshnum, x, y)
+
+
+def get_mesh(meshnum: int, x: int, y: int) -> dict:
+    """[summary]
+    メッシュ次数、メッシュ番地からメッシュのジオメトリとメッシュコードを返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        x (int): 原点から右方向に数えたメッシュ番地
+        y (int): 原点から上方向に数えたメッシュ番地
+
+    Returns:
+        dict: {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+    """
+    left_lon, bottom_lat = get_mesh_vertex(meshnum, x, y)
+    right_lon, top_lat = get_mesh_vertex(meshnum, x + 1, y + 1)
+
+    code = get_full_meshcode(meshnum, x, y)
 
     return {
         "geometry": [[
@@ -215,38 +352,64 @@ def get_mesh(meshnum: int, x: int, y: int) -> dict:
 
 
 if __name__ == "__main__":
+    import json
+    import sys
     import argschemes
+    from writer import open_output, write_geojsonl, write_geojsonl_in_range
+    from parallel import write_geojsonl_parallel, write_geojsonl_shards
+    from polygon import generate_meshes_in_polygon
+    from columnar import write_mesh_binary
+    from aggregate import MeshAggregator, read_point_chunks, write_aggregate_csv
+    from instrument import JobStats, print_progress, run_profiled
+    from cache import configure_cache
+    from tiles import serve_tiles
+    from multilevel import write_geojsonl_multilevel
+    from export import export_partitions
+    from compress import EXTENSIONS, get_compressor
+    from contextlib import ExitStack
+
+    # 集計のサブコマンド
+    if sys.argv[1:2] == ["aggregate"]:
+        args = argschemes.AGGREGATE_ARGSCHEME.parse_args(sys.argv[2:])
+        meshnum = argschemes.parse_meshnum(args.meshnum)
+        status_file = sys.stderr if args.output == "-" else sys.stdout
+        if args.chunk_rows < 1:
+            raise ValueError("読み込み行数は1以上で指定してください")
+
+        print("aggregating points...", file=status_file)
+        aggregator = MeshAggregator(meshnum, args.sum)
+        aggregator.add_chunks(
+            read_point_chunks(args.input, [args.lon, args.lat] + list(args.sum), args.chunk_rows),
+            args.lon, args.lat)
+        with open_output(args.output) as f:
+            write_aggregate_csv(aggregator.get_result(), f)
+        if aggregator.skipped:
+            # 生成範囲外や経緯度が数値でない地点は集計に含めない
+            print("skipped {} points (out of range or invalid coordinates)".format(
+                aggregator.skipped), file=status_file)
+        print("done", file=status_file)
+        sys.exit()
+
+    # タイルサーバーのサブコマンド
+    if sys.argv[1:2] == ["serve"]:
+        args = argschemes.SERVE_ARGSCHEME.parse_args(sys.argv[2:])
+        configure_cache("tile", args.cache_size)
+        serve_tiles(args.host, args.port, log=sys.stdout)
+        sys.exit()
 
-    print("initializing...")
     # コマンド初期化
     args = argschemes.ARGSCHEME.parse_args()
 
-    # メッシュ番号
-    meshnum = args.meshnum
-    # 別称での指定を次数に置き換え
-    if meshnum == "500m":
-        meshnum = 4
-    elif meshnum == "250m":
-        meshnum = 5
-    elif meshnum == "125m":
-        meshnum = 6
-    elif meshnum == "100m":
-        meshnum = 7
-    elif meshnum == "50m":
-        meshnum = 8
-    elif meshnum == "10m":
-        meshnum = 9
-    elif meshnum == "5m":
-        meshnum = 10
-    else:
-        try:
-            meshnum = int(meshnum)
-        except ValueError:
-            raise ValueError(
-                "メッシュ次数を正しく入力してください あなたの入力：" + str(args.meshnum))
+    # 標準出力へ書き出す場合は進捗表示を標準エラー出力に回す
+    status_file = sys.stderr if args.target_dir == "-" else sys.stdout
+    print("initializing...", file=status_file)
 
-    if meshnum < 1 or 10 < meshnum:
-        raise ValueError("メッシュ次数を正しく入力してください あなたの入力：" + str(args.meshnum))
+    # メッシュ番号、別称での指定は次数に置き換え
+    # カンマ区切りで複数の次数を指定した場合は、一度の走査で全ての次数を生成する
+    meshnums = list(dict.fromkeys(
+        argschemes.parse_meshnum(text) for text in args.meshnum.split(",")))
+    meshnum = meshnums[0]
+    multilevel = len(meshnums) > 1 or args.tagged
 
     extent_texts = args.extent
     target_dir = args.target_dir
@@ -271,24 +434,160 @@ if __name__ == "__main__":
                 if not -180 < degree < 180:
                     raise ValueError("経緯度は-180から180の間で指定してください")
 
-    print("making meshes...")
-    meshsize = get_meshsize(meshnum)
-    # メッシュ生成
-    meshes = []
-    for mesh in generate_meshes(meshnum, extent):
-        meshes.append(mesh)
-
-    # geojsonl文字列を生成
-    geojsonl_txt = ""
-    for i in range(len(meshes)):
-        geojsonl_txt += '{"type":"Feature","geometry":' + \
-            '{"type":"Polygon","coordinates":' + \
-            str(meshes[i]["geometry"]) + \
-            '},"properties":{"code":' + meshes[i]["code"] + '}}\n'
-
-    print("writing file...")
-    # geojsonl書き出し
-    with open(os.path.join(target_dir, "mesh_" + str(meshnum) + ".geojsonl"), mode="w") as f:
-        f.write(geojsonl_txt)
+    # ポリゴンが指定されているなら読み込む
+    polygon = None
+    if args.polygon:
+        if extent_texts:
+            raise ValueError("領域指定(-e)とポリゴン(--polygon)は同時に指定できません")
+        if args.processes is not None:
+            raise ValueError("ポリゴン(--polygon)指定時は並列生成(-j)を使用できません")
+        with open(args.polygon) as f:
+            polygon = json.load(f)
+
+    if args.chunk_size < 1:
+        raise ValueError("書き込み単位は1以上で指定してください")
+    if args.precision is not None and args.precision < 0:
+        raise ValueError("経緯度の桁数は0以上で指定してください")
+
+    if args.processes is not None and args.processes < 1:
+        raise ValueError("プロセス数は1以上で指定してください")
+    if args.split and args.processes is None:
+        raise ValueError("分割ごとのファイル出力(--split)はプロセス数(-j)と合わせて指定してください")
+    if args.split and target_dir == "-":
+        raise ValueError("分割ごとのファイル出力(--split)は標準出力に書き出せません")
+
+    if args.resume:
+        if target_dir == "-":
+            raise ValueError("再開可能な書き出し(--resume)は標準出力に書き出せません")
+        if polygon is not None or args.format == "binary" or multilevel:
+            raise ValueError(
+                "再開可能な書き出し(--resume)はポリゴン(--polygon)、バイナリ形式(-f binary)、複数の次数の指定と同時に指定できません")
 
-    print("done")
+    if args.compress is not None:
+        if args.split or args.resume or args.format == "binary":
+            raise ValueError(
+                "圧縮(-z)は分割ごとのファイル出力(--split、--resume)、バイナリ形式(-f binary)と同時に指定できません")
+        if args.compress_threads is not None and args.compress_threads < 1:
+            raise ValueError("圧縮のスレッド数は1以上で指定してください")
+        # 圧縮形式・圧縮レベルを書き出し前に確認する
+        get_compressor(args.compress, args.compress_level)
+
+    if args.format == "binary":
+        if target_dir == "-":
+            raise ValueError("バイナリ形式(-f binary)は標準出力に書き出せません")
+        if polygon is not None or args.processes is not None:
+            raise ValueError("バイナリ形式(-f binary)はポリゴン(--polygon)、並列生成(-j)と同時に指定できません")
+
+    if multilevel:
+        if polygon is not None or args.processes is not None or args.format == "binary":
+            raise ValueError(
+                "複数の次数の指定はポリゴン(--polygon)、並列生成(-j)、バイナリ形式(-f binary)と同時に指定できません")
+        if target_dir == "-" and not args.tagged:
+            raise ValueError("複数の次数を標準出力に書き出す場合は--taggedを指定してください")
+
+    # 圧縮する場合は拡張子に.gz、.zstを付ける
+    extension = ".geojsonl"
+    if args.format == "binary":
+        extension = ".jpmesh"
+    elif args.compress is not None:
+        extension += EXTENSIONS[args.compress]
+
+    if target_dir == "-":
+        output_path = "-"
+    elif multilevel and args.tagged:
+        output_path = os.path.join(
+            target_dir, "mesh_" + "_".join(map(str, meshnums)) + extension)
+    else:
+        output_path = os.path.join(
+            target_dir, "mesh_" + str(meshnum) + extension)
+
+    # 書き出した圧縮先、圧縮後のバイト数の記録に使う
+    compressed_outputs = []
+
+    def open_target(path):
+        output = open_output(path, args.compress, args.compress_level, args.compress_threads)
+        if args.compress is not None:
+            compressed_outputs.append(output)
+        return output
+
+    # 進捗・所要時間の記録、領域指定の場合は総数が分かる
+    total = None
+    if polygon is None:
+        total = 0
+        for level in meshnums:
+            x_start, x_end, y_start, y_end = get_index_range(level, extent)
+            total += max(x_end - x_start, 0) * max(y_end - y_start, 0)
+    stats = None
+    if args.progress or args.stats or args.profile:
+        callback = print_progress(status_file) if args.progress else None
+        stats = JobStats(total, callback)
+
+    def run():
+        if multilevel and args.tagged:
+            # 全ての次数を、次数をプロパティに付けて1つのファイルに書き出す
+            with open_target(output_path) as f:
+                write_geojsonl_multilevel(meshnums, f, extent,
+                                          args.chunk_size, args.precision, stats)
+        elif multilevel:
+            # 次数ごとのファイルに書き出す
+            with ExitStack() as stack:
+                outputs = {
+                    level: stack.enter_context(open_target(
+                        os.path.join(target_dir, "mesh_" + str(level) + extension)))
+                    for level in meshnums
+                }
+                write_geojsonl_multilevel(meshnums, outputs, extent,
+                                          args.chunk_size, args.precision, stats)
+        elif args.format == "binary":
+            # 列形式のバイナリファイルに書き出す
+            count = write_mesh_binary(meshnum, output_path, extent)
+            if stats is not None:
+                stats.advance(count)
+        elif args.resume:
+            # 上位メッシュ単位の分割ごとのファイルに書き出し、書き出し済みの分割は飛ばす
+            export_partitions(meshnum, target_dir, extent, args.shard_meshnum, args.processes,
+                              args.chunk_size, args.precision, stats)
+        elif args.split:
+            # 上位メッシュ単位に並列生成し、分割ごとのファイルに書き出す
+            write_geojsonl_shards(meshnum, target_dir, extent, args.processes,
+                                  args.shard_meshnum, args.chunk_size, args.precision, stats)
+        elif args.processes is not None:
+            # 上位メッシュ単位に並列生成し、1つのファイルに連結して書き出す
+            # 一時ファイルは出力先と同じディレクトリに置く（標準出力の場合はシステムの一時ディレクトリ）
+            tmp_dir = None if output_path == "-" else (os.path.dirname(output_path) or ".")
+            with open_target(output_path) as f:
+                write_geojsonl_parallel(meshnum, f, extent, args.processes,
+                                        args.shard_meshnum, args.chunk_size, args.precision,
+                                        stats, tmp_dir)
+        else:
+            # メッシュを生成しながら逐次geojsonlとして書き出す
+            with open_target(output_path) as f:
+                if polygon is not None:
+                    write_geojsonl(generate_meshes_in_polygon(meshnum, polygon),
+                                   f, args.chunk_size, args.precision, stats)
+                else:
+                    write_geojsonl_in_range(meshnum, f, *get_index_range(meshnum, extent),
+                                            args.chunk_size, args.precision, stats)
+
+    print("making meshes and writing file...", file=status_file)
+    if args.profile:
+        run_profiled(run, args.profile, args.profile_output, stats, status_file)
+    else:
+        run()
+
+    if stats is not None:
+        for output in compressed_outputs:
+            stats.count("uncompressed_bytes", output.uncompressed_size)
+            stats.count("compressed_bytes", output.compressed_size)
+        stats.finish()
+    if args.stats:
+        # 処理の内訳をJSONで書き出す
+        summary = dict(stats.to_dict(), meshnum=meshnums if multilevel else meshnum,
+                       format=args.format)
+        if args.stats == "-":
+            print(json.dumps(summary, indent=2), file=status_file)
+        else:
+            with open(args.stats, mode="w") as f:
+                json.dump(summary, f, indent=2)
+
+    print("done", file=status_file)
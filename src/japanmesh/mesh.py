@@ -0,0 +1,166 @@
+try:
+    from main import (
+        get_full_meshcode,
+        get_index_range,
+        get_mesh_vertex,
+    )
+    from meshcode import decode_meshcode
+except ModuleNotFoundError:
+    from .main import (
+        get_full_meshcode,
+        get_index_range,
+        get_mesh_vertex,
+    )
+    from .meshcode import decode_meshcode
+
+
+class Mesh:
+    """[summary]
+    メッシュ次数と番地のみを保持するメッシュ
+    メッシュコード・範囲・中心・ジオメトリは参照した時点で計算する
+    mesh["code"]、mesh["geometry"]のようにget_mesh()の辞書と同じキーでも参照できる
+    """
+
+    __slots__ = ("meshnum", "x", "y")
+
+    def __init__(self, meshnum: int, x: int, y: int):
+        """[summary]
+        Args:
+            meshnum (int): メッシュ次数
+            x (int): 原点から右方向に数えたメッシュ番地
+            y (int): 原点から上方向に数えたメッシュ番地
+        """
+        self.meshnum = meshnum
+        self.x = x
+        self.y = y
+
+    @classmethod
+    def from_meshcode(cls, code: str, meshnum: int = None):
+        """[summary]
+        メッシュコードからメッシュを作成する
+
+        Args:
+            code (str): メッシュコード
+            meshnum (int, optional): メッシュ次数、decode_meshcode()を参照
+
+        Returns:
+            Mesh: メッシュ
+        """
+        return cls(*decode_meshcode(code, meshnum))
+
+    @property
+    def code(self) -> str:
+        """str: メッシュコード"""
+        return get_full_meshcode(self.meshnum, self.x, self.y)
+
+    @property
+    def bounds(self) -> tuple:
+        """tuple: (西端の経度, 南端の緯度, 東端の経度, 北端の緯度)"""
+        left, bottom = get_mesh_vertex(self.meshnum, self.x, self.y)
+        right, top = get_mesh_vertex(self.meshnum, self.x + 1, self.y + 1)
+        return left, bottom, right, top
+
+    @property
+    def centroid(self) -> tuple:
+        """tuple: 中心の(経度, 緯度)"""
+        left, bottom, right, top = self.bounds
+        return (left + right) / 2, (bottom + top) / 2
+
+    @property
+    def ring(self) -> list:
+        """list: 左下から時計回りに左下に戻る5点の[経度, 緯度]のリスト"""
+        left, bottom, right, top = self.bounds
+        return [
+            [left, bottom],
+            [left, top],
+            [right, top],
+            [right, bottom],
+            [left, bottom],
+        ]
+
+    @property
+    def geometry(self) -> list:
+        """list: get_mesh()の"geometry"と同じ形式のポリゴンの座標"""
+        return [self.ring]
+
+    def to_dict(self) -> dict:
+        """[summary]
+        get_mesh()と同じ形式の辞書に変換する
+
+        Returns:
+            dict: {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+        """
+        return {
+            "geometry": self.geometry,
+            "code": self.code,
+        }
+
+    def __getitem__(self, key: str):
+        if key == "geometry":
+            return self.geometry
+        if key == "code":
+            return self.code
+        raise KeyError(key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Mesh):
+            return NotImplemented
+        return (self.meshnum, self.x, self.y) == (other.meshnum, other.x, other.y)
+
+    def __hash__(self) -> int:
+        return hash((self.meshnum, self.x, self.y))
+
+    def __repr__(self) -> str:
+        return "Mesh(meshnum={}, x={}, y={})".format(self.meshnum, self.x, self.y)
+
+
+def generate_mesh_objects(meshnum: int, extent=None):
+    """[summary]
+    メッシュ次数および領域から、その領域に重なる全てのメッシュをMeshとして返す
+    メッシュの順序はgenerate_meshes()と同じ
+    メッシュコードのみが必要な場合などはジオメトリを計算しないため、generate_meshes()より軽量
+
+    Args:
+        meshnum (int): メッシュ次数
+        extent (list, optional):  経緯度のペアのリストで領域指定
+
+    yield:
+        Mesh: メッシュ
+    """
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    yield from generate_mesh_objects_in_range(meshnum, x_start, x_end, y_start, y_end)
+
+
+def generate_mesh_objects_in_range(meshnum: int, x_start: int, x_end: int,
+                                   y_start: int, y_end: int):
+    """[summary]
+    メッシュ次数および番地の範囲から、範囲内の全てのメッシュをMeshとして返す
+    メッシュは下の行から順に、各行では左から順に返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        x_start (int): xの開始番地
+        x_end (int): xの終了番地（範囲に含まない）
+        y_start (int): yの開始番地
+        y_end (int): yの終了番地（範囲に含まない）
+
+    yield:
+        Mesh: メッシュ
+    """
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            yield Mesh(meshnum, x, y)
+
+
+def to_mesh_dicts(meshes):
+    """[summary]
+    Meshのイテラブルを、get_mesh()と同じ形式の辞書に逐次変換する
+
+    Args:
+        meshes (iterable): Meshのイテラブル
+
+    yield:
+        {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}...
+    """
+    for mesh in meshes:
+        yield mesh.to_dict()
@@ -0,0 +1,244 @@
+try:
+    from constants import DIVIDED_MESHNUMS, MESH_INFOS
+    from main import (
+        generate_meshes_in_range,
+        get_base_cellcount,
+        get_full_meshcode,
+        get_mesh,
+        get_mesh_count,
+        get_mesh_index,
+    )
+except ModuleNotFoundError:
+    from .constants import DIVIDED_MESHNUMS, MESH_INFOS
+    from .main import (
+        generate_meshes_in_range,
+        get_base_cellcount,
+        get_full_meshcode,
+        get_mesh,
+        get_mesh_count,
+        get_mesh_index,
+    )
+
+# メッシュコードの桁数と、その桁数となるメッシュ次数
+MESHNUMS_BY_LENGTH = {
+    4: (1,),
+    6: (2,),
+    8: (3,),
+    9: (4,),
+    10: (5, 7),
+    11: (6,),
+    12: (8, 9),
+    14: (10,),
+}
+
+
+def encode_meshcode(meshnum: int, lonlat: list) -> str:
+    """[summary]
+    メッシュ次数と経緯度に対し、その地点を含むメッシュのメッシュコードを返す
+    メッシュの境界上の地点は右側・上側のメッシュに含まれる
+
+    Args:
+        meshnum (int): メッシュ次数
+        lonlat ([float, float]): [経度, 緯度]
+
+    Returns:
+        str: メッシュコード
+    """
+    x, y = get_mesh_index(meshnum, lonlat)
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+    if not (0 <= x < x_mesh_count and 0 <= y < y_mesh_count):
+        raise ValueError("メッシュの生成範囲外の経緯度です：" + str(lonlat))
+    return get_full_meshcode(meshnum, x, y)
+
+
+def decode_meshcode(code: str, meshnum: int = None) -> (int, int, int):
+    """[summary]
+    メッシュコードから、メッシュ次数とメッシュ番地を返す
+    5次と7次、8次と9次は桁数が同じため、コードから判別できない場合はmeshnumの指定が必要
+
+    Args:
+        code (str): メッシュコード
+        meshnum (int, optional): メッシュ次数
+
+    Returns:
+        tuple: (メッシュ次数, x方向の番地, y方向の番地)
+    """
+    code = str(code)
+    if not code.isdigit() or len(code) not in MESHNUMS_BY_LENGTH:
+        raise ValueError("メッシュコードが不正です：" + code)
+
+    if meshnum is None:
+        candidates = []
+        for candidate in MESHNUMS_BY_LENGTH[len(code)]:
+            try:
+                candidates.append((candidate, _decode(code, candidate)))
+            except ValueError:
+                pass
+        if len(candidates) == 0:
+            raise ValueError("メッシュコードが不正です：" + code)
+        if len(candidates) > 1:
+            raise ValueError(
+                "メッシュ次数を判別できません、meshnumを指定してください：" + code)
+        meshnum, (x, y) = candidates[0]
+    else:
+        if meshnum not in MESHNUMS_BY_LENGTH[len(code)]:
+            raise ValueError(
+                "メッシュコードの桁数がメッシュ次数と一致しません：" + code)
+        x, y = _decode(code, meshnum)
+
+    return meshnum, x, y
+
+
+def get_mesh_by_meshcode(code: str, meshnum: int = None) -> dict:
+    """[summary]
+    メッシュコードから、メッシュのジオメトリとメッシュコードを返す
+
+    Args:
+        code (str): メッシュコード
+        meshnum (int, optional): メッシュ次数、decode_meshcode()を参照
+
+    Returns:
+        dict: {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+    """
+    return get_mesh(*decode_meshcode(code, meshnum))
+
+
+def generate_children_meshes(codes, meshnum: int):
+    """[summary]
+    上位メッシュのメッシュコードから、その範囲に含まれるmeshnum次のメッシュの情報を返す
+    経緯度を介さず番地の範囲から求めるため、隣接する上位メッシュの境界で重複しない
+    同じメッシュコードや、他の上位メッシュに含まれる上位メッシュは一度だけ扱う
+
+    Args:
+        codes (str or list): 上位メッシュのメッシュコード、またはそのリスト
+        meshnum (int): 生成するメッシュ次数
+
+    yield:
+        {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}...
+            上位メッシュごとに、下の行から順に、各行では左から順に返す
+    """
+    if isinstance(codes, str):
+        codes = [codes]
+
+    chain = get_meshnum_chain(meshnum)
+    parents = []
+    for code in codes:
+        parent_meshnum, x, y = _decode_in_chain(code, chain)
+        parents.append((parent_meshnum, x, y))
+
+    # 同じ上位メッシュ、または他の上位メッシュの子孫である上位メッシュを除く
+    parent_set = set(parents)
+    _, _, unitcount = get_base_cellcount(meshnum)
+    done = set()
+    for parent in parents:
+        if parent in done or any(ancestor in parent_set for ancestor in _get_ancestors(*parent)):
+            continue
+        done.add(parent)
+
+        parent_meshnum, x, y = parent
+        _, _, parent_unitcount = get_base_cellcount(parent_meshnum)
+        factor = unitcount // parent_unitcount
+        yield from generate_meshes_in_range(
+            meshnum, x * factor, (x + 1) * factor, y * factor, (y + 1) * factor)
+
+
+def get_ancestor_meshcodes(code: str, meshnum: int = None) -> list:
+    """[summary]
+    メッシュコードから、そのメッシュを含む上位メッシュのメッシュコードを返す
+
+    Args:
+        code (str): メッシュコード
+        meshnum (int, optional): メッシュ次数、decode_meshcode()を参照
+
+    Returns:
+        list: 1次メッシュから親メッシュまでのメッシュコード
+    """
+    return [get_full_meshcode(*ancestor)
+            for ancestor in _get_ancestors(*decode_meshcode(code, meshnum))]
+
+
+def get_neighbor_meshcodes(code: str, meshnum: int = None) -> list:
+    """[summary]
+    メッシュコードから、そのメッシュに隣接する同じ次数のメッシュのメッシュコードを返す
+    生成範囲外となる隣接メッシュは含まない
+
+    Args:
+        code (str): メッシュコード
+        meshnum (int, optional): メッシュ次数、decode_meshcode()を参照
+
+    Returns:
+        list: 隣接する最大8つのメッシュコード、南西から順に北東まで
+    """
+    meshnum, x, y = decode_meshcode(code, meshnum)
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+    codes = []
+    for neighbor_y in range(max(y - 1, 0), min(y + 2, y_mesh_count)):
+        for neighbor_x in range(max(x - 1, 0), min(x + 2, x_mesh_count)):
+            if (neighbor_x, neighbor_y) != (x, y):
+                codes.append(get_full_meshcode(meshnum, neighbor_x, neighbor_y))
+    return codes
+
+
+def _get_ancestors(meshnum: int, x: int, y: int) -> list:
+    # 1次メッシュから親メッシュまでの(メッシュ次数, x方向の番地, y方向の番地)
+    ancestors = []
+    while meshnum != 1:
+        ratio = MESH_INFOS[meshnum]["ratio"]
+        meshnum, x, y = MESH_INFOS[meshnum]["parent"], x // ratio, y // ratio
+        ancestors.append((meshnum, x, y))
+    return ancestors[::-1]
+
+
+def _decode_in_chain(code: str, chain: list) -> (int, int, int):
+    # 祖先の次数のうち、桁数が一致する次数としてメッシュコードを解釈する
+    candidates = [meshnum for meshnum in MESHNUMS_BY_LENGTH.get(len(str(code)), ())
+                  if meshnum in chain]
+    if not candidates:
+        raise ValueError(
+            "生成するメッシュ次数の上位メッシュのメッシュコードを指定してください：" + str(code))
+    return decode_meshcode(code, candidates[0])
+
+
+def get_meshnum_chain(meshnum: int) -> list:
+    """[summary]
+    メッシュ次数に対し、1次メッシュから自身までの祖先の次数を上位から順に返す
+
+    Args:
+        meshnum (int): メッシュ次数
+
+    Returns:
+        list: [1, ..., meshnum]
+    """
+    chain = [meshnum]
+    while chain[-1] != 1:
+        chain.append(MESH_INFOS[chain[-1]]["parent"])
+    return chain[::-1]
+
+
+def _decode(code: str, meshnum: int) -> (int, int):
+    # 1次メッシュコードから番地を求め、下位の次数のコードを順に反映する
+    base_x, base_y, _ = get_base_cellcount(1)
+    x = int(code[2:4]) - base_x
+    y = int(code[0:2]) - base_y
+
+    position = 4
+    for level in get_meshnum_chain(meshnum)[1:]:
+        ratio = MESH_INFOS[level]["ratio"]
+        if level in DIVIDED_MESHNUMS:
+            digit = int(code[position]) - 1
+            position += 1
+            if not 0 <= digit < ratio * ratio:
+                raise ValueError("メッシュコードが不正です：" + code)
+            x_local, y_local = digit % ratio, digit // ratio
+        else:
+            y_local, x_local = int(code[position]), int(code[position + 1])
+            position += 2
+            if not (x_local < ratio and y_local < ratio):
+                raise ValueError("メッシュコードが不正です：" + code)
+        x = x * ratio + x_local
+        y = y * ratio + y_local
+
+    x_mesh_count, y_mesh_count = get_mesh_count(meshnum)
+    if not (0 <= x < x_mesh_count and 0 <= y < y_mesh_count):
+        raise ValueError("メッシュの生成範囲外のメッシュコードです：" + code)
+    return x, y
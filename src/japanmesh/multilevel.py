@@ -0,0 +1,278 @@
+try:
+    from main import (
+        get_base_cellcount,
+        get_full_meshcode,
+        get_index_range,
+        get_mesh_vertex,
+    )
+    from meshcode import get_meshnum_chain
+    from writer import DEFAULT_CHUNK_SIZE, GeoJSONLSerializer, flush_features
+except ModuleNotFoundError:
+    from .main import (
+        get_base_cellcount,
+        get_full_meshcode,
+        get_index_range,
+        get_mesh_vertex,
+    )
+    from .meshcode import get_meshnum_chain
+    from .writer import DEFAULT_CHUNK_SIZE, GeoJSONLSerializer, flush_features
+
+
+# 次数ごとのメッシュコードの末尾の表の最大件数
+_MAX_SUFFIXES = 1 << 14
+# 書き込み先にまとめて渡すメッシュ数の目安
+_ROW_BATCH = 4096
+
+
+def get_common_meshnum(meshnums: list) -> int:
+    """[summary]
+    複数のメッシュ次数に共通する祖先のうち、最も下位の次数を返す
+
+    Args:
+        meshnums (list): メッシュ次数のリスト
+
+    Returns:
+        int: メッシュ次数、いずれかのメッシュ次数自身の場合もある
+    """
+    if not meshnums:
+        raise ValueError("メッシュ次数を1つ以上指定してください")
+    chains = [get_meshnum_chain(meshnum) for meshnum in meshnums]
+    common = 1
+    for levels in zip(*chains):
+        if any(level != levels[0] for level in levels):
+            break
+        common = levels[0]
+    return common
+
+
+def generate_multilevel_meshes(meshnums: list, extent=None):
+    """[summary]
+    複数のメッシュ次数について、領域に重なる全てのメッシュの情報を一度の走査で返す
+    共通の祖先のメッシュ（get_common_meshnum()）ごとに、各次数の子孫をmeshnumsの順に返す
+    メッシュコードは上位のメッシュのコードと、上位のメッシュ内の位置ごとのコードの末尾を連結して求め、
+    上位のメッシュのコードは上位のメッシュごとに一度だけ計算する
+    各次数のメッシュの集合はgenerate_meshes()と同じだが、順序は祖先のメッシュごとにまとまる
+
+    Args:
+        meshnums (list): メッシュ次数のリスト
+        extent (list, optional):  経緯度のペアのリストで領域指定
+
+    yield:
+        (メッシュ次数, {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>})...
+    """
+    for level, x_range, y_range in _walk(meshnums, extent):
+        meshnum = level.meshnum
+        lons = [get_mesh_vertex(meshnum, x, 0)[0] for x in range(x_range[0], x_range[1] + 1)]
+        for y in range(*y_range):
+            bottom = get_mesh_vertex(meshnum, 0, y)[1]
+            top = get_mesh_vertex(meshnum, 0, y + 1)[1]
+            for i, code in enumerate(level.get_codes(y, *x_range)):
+                left, right = lons[i], lons[i + 1]
+                yield meshnum, {
+                    "geometry": [[
+                        [left, bottom],
+                        [left, top],
+                        [right, top],
+                        [right, bottom],
+                        [left, bottom],
+                    ]],
+                    "code": code,
+                }
+
+
+def write_geojsonl_multilevel(meshnums: list, outputs, extent=None,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, precision: int = None,
+                              stats=None) -> dict:
+    """[summary]
+    複数のメッシュ次数について、領域に重なる全てのメッシュを一度の走査でgeojsonl形式で書き出す
+    メッシュの順序はgenerate_multilevel_meshes()と同じ
+
+    Args:
+        meshnums (list): メッシュ次数のリスト
+        outputs (dict or file-like): {メッシュ次数: 書き込み先}の辞書の場合は次数ごとに書き出す
+            書き込み先を1つ渡した場合は、各メッシュのプロパティに"level"（メッシュ次数）を付けてまとめて書き出す
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 時間と進捗の記録先、生成と文字列化は一体のためserializeとして記録する
+
+    Returns:
+        dict: {メッシュ次数: 書き出したメッシュの数}
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_sizeは1以上で指定してください")
+    tagged = not isinstance(outputs, dict)
+    if not tagged and set(outputs) != set(meshnums):
+        raise ValueError("全てのメッシュ次数の書き込み先を指定してください")
+
+    if tagged:
+        writer = _BufferedWriter(outputs, chunk_size, stats)
+        writers = {meshnum: writer for meshnum in meshnums}
+    else:
+        writers = {meshnum: _BufferedWriter(outputs[meshnum], chunk_size, stats)
+                   for meshnum in meshnums}
+    counts = {meshnum: 0 for meshnum in meshnums}
+
+    serializer = GeoJSONLSerializer(precision)
+    serialize_bounds = serializer.serialize_bounds
+    if stats is not None:
+        previous = stats.enter("serialize")
+    # 次数ごとの各列の経度・各行の緯度の文字列、領域の幅と高さの分だけ一度だけ生成する
+    lon_texts = {}
+    lat_texts = {}
+    for level, x_range, y_range in _walk(meshnums, extent):
+        meshnum = level.meshnum
+        writer = writers[meshnum]
+        properties = ',"level":' + str(meshnum) if tagged else ""
+        x_offset, _, y_offset, _ = level.index_range
+        if meshnum not in lon_texts:
+            lon_texts[meshnum], lat_texts[meshnum] = _format_vertices(level, serializer)
+        lons, lats = lon_texts[meshnum], lat_texts[meshnum]
+
+        # 祖先のメッシュが粗い場合も、_ROW_BATCH件程度ずつ書き込み先に渡してメモリ使用量を抑える
+        lefts = lons[x_range[0] - x_offset:x_range[1] - x_offset]
+        rights = lons[x_range[0] - x_offset + 1:x_range[1] - x_offset + 1]
+        features = []
+        for y in range(*y_range):
+            bottom, top = lats[y - y_offset], lats[y - y_offset + 1]
+            features.extend([
+                serialize_bounds(left, bottom, right, top, code, properties)
+                for left, right, code in zip(lefts, rights, level.get_codes(y, *x_range))
+            ])
+            if len(features) >= _ROW_BATCH:
+                counts[meshnum] += len(features)
+                writer.write(features)
+                features = []
+        if features:
+            counts[meshnum] += len(features)
+            writer.write(features)
+
+    for writer in set(writers.values()):
+        writer.flush()
+    if stats is not None:
+        stats.enter(previous)
+    return counts
+
+
+class _Level:
+    # 共通の祖先のメッシュに対する、1つのメッシュ次数の情報
+    def __init__(self, meshnum: int, root: int, extent):
+        self.meshnum = meshnum
+        _, _, unitcount = get_base_cellcount(meshnum)
+        _, _, root_unitcount = get_base_cellcount(root)
+        # 祖先のメッシュ1つあたりのx方向y方向それぞれのメッシュ数
+        self.factor = unitcount // root_unitcount
+        self.index_range = get_index_range(meshnum, extent)
+
+        # メッシュコードの末尾の表の基準とする上位の次数(anchor)
+        # 表の件数が_MAX_SUFFIXESに収まる最も粗い祖先とし、祖先が粗くても表を小さく保つ
+        self.anchor = None
+        self.ratio = 1
+        for ancestor in get_meshnum_chain(meshnum)[:-1]:
+            _, _, ancestor_unitcount = get_base_cellcount(ancestor)
+            if (unitcount // ancestor_unitcount) ** 2 <= _MAX_SUFFIXES:
+                self.anchor = ancestor
+                self.ratio = unitcount // ancestor_unitcount
+                break
+
+        # anchor内の位置(下から順に各行左から)ごとのメッシュコードの末尾
+        # 末尾はanchor内の位置のみで決まるため、範囲内の任意のanchorのメッシュから求める
+        self.suffixes = None
+        x_start, x_end, y_start, y_end = self.index_range
+        if self.anchor is not None and x_start < x_end and y_start < y_end:
+            ratio = self.ratio
+            anchor_x, anchor_y = x_start // ratio, y_start // ratio
+            prefix_length = len(get_full_meshcode(self.anchor, anchor_x, anchor_y))
+            self.suffixes = [
+                get_full_meshcode(meshnum, anchor_x * ratio + x, anchor_y * ratio + y)[prefix_length:]
+                for y in range(ratio)
+                for x in range(ratio)
+            ]
+        # 直前に求めたanchorのメッシュコード、同じanchorの行は続けて走査されるため使い回す
+        self._prefix_key = None
+        self._prefixes = None
+
+    def get_codes(self, y: int, x_start: int, x_end: int) -> list:
+        # 行yの、xの範囲のメッシュコードのリスト
+        if self.suffixes is None:
+            return [get_full_meshcode(self.meshnum, x, y) for x in range(x_start, x_end)]
+        ratio, suffixes = self.ratio, self.suffixes
+        anchor_start = x_start // ratio
+        key = (y // ratio, anchor_start, (x_end - 1) // ratio + 1)
+        if key != self._prefix_key:
+            self._prefix_key = key
+            self._prefixes = [get_full_meshcode(self.anchor, anchor_x, key[0])
+                              for anchor_x in range(anchor_start, key[2])]
+
+        # 行をanchorごとに区切り、anchorのメッシュコードと末尾の表の連続する部分を連結する
+        row = (y % ratio) * ratio
+        if len(self._prefixes) == 1:
+            prefix = self._prefixes[0]
+            offset = row - anchor_start * ratio
+            return [prefix + suffix for suffix in suffixes[offset + x_start:offset + x_end]]
+        codes = []
+        for i, prefix in enumerate(self._prefixes):
+            anchor_x = (anchor_start + i) * ratio
+            start = max(x_start, anchor_x) - anchor_x
+            end = min(x_end, anchor_x + ratio) - anchor_x
+            codes.extend([prefix + suffix for suffix in suffixes[row + start:row + end]])
+        return codes
+
+
+def _format_vertices(level: _Level, serializer: GeoJSONLSerializer) -> (list, list):
+    # 次数の範囲の各列の西端の経度と、各行の南端の緯度の文字列（東端・北端を含む）
+    meshnum = level.meshnum
+    x_start, x_end, y_start, y_end = level.index_range
+    lons = [serializer.format(get_mesh_vertex(meshnum, x, 0)[0])
+            for x in range(x_start, max(x_start, x_end) + 1)]
+    lats = [serializer.format(get_mesh_vertex(meshnum, 0, y)[1])
+            for y in range(y_start, max(y_start, y_end) + 1)]
+    return lons, lats
+
+
+def _walk(meshnums: list, extent):
+    # 共通の祖先のメッシュを下の行から順に走査し、
+    # 祖先のメッシュごとに(次数の情報, xの範囲, yの範囲)を返す
+    meshnums = list(dict.fromkeys(meshnums))
+    root = get_common_meshnum(meshnums)
+    levels = [_Level(meshnum, root, extent) for meshnum in meshnums]
+
+    # 全ての次数の範囲を含む祖先のメッシュの範囲
+    root_x_start = min(level.index_range[0] // level.factor for level in levels)
+    root_x_end = max(-(-level.index_range[1] // level.factor) for level in levels)
+    root_y_start = min(level.index_range[2] // level.factor for level in levels)
+    root_y_end = max(-(-level.index_range[3] // level.factor) for level in levels)
+    if root_x_start >= root_x_end or root_y_start >= root_y_end:
+        return
+
+    for root_y in range(root_y_start, root_y_end):
+        for root_x in range(root_x_start, root_x_end):
+            for level in levels:
+                x_start, x_end, y_start, y_end = level.index_range
+                factor = level.factor
+                x_range = (max(x_start, root_x * factor), min(x_end, (root_x + 1) * factor))
+                y_range = (max(y_start, root_y * factor), min(y_end, (root_y + 1) * factor))
+                if x_range[0] < x_range[1] and y_range[0] < y_range[1]:
+                    yield level, x_range, y_range
+
+
+class _BufferedWriter:
+    # Feature文字列をchunk_sizeの目安ごとにまとめ、writer.flush_features()で書き出す
+    def __init__(self, f, chunk_size: int, stats=None):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.stats = stats
+        self.buffer = []
+        self.buffered_size = 0
+
+    def write(self, features: list):
+        self.buffer.extend(features)
+        self.buffered_size += sum(map(len, features))
+        if self.buffered_size >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            flush_features(self.f, self.buffer, self.stats)
+        self.buffer = []
+        self.buffered_size = 0
@@ -0,0 +1,215 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import os
+import shutil
+import tempfile
+
+try:
+    from main import (
+        get_base_cellcount,
+        get_full_meshcode,
+        get_index_range,
+    )
+    from meshcode import get_meshnum_chain
+    from writer import DEFAULT_CHUNK_SIZE, write_geojsonl_in_range
+except ModuleNotFoundError:
+    from .main import (
+        get_base_cellcount,
+        get_full_meshcode,
+        get_index_range,
+    )
+    from .meshcode import get_meshnum_chain
+    from .writer import DEFAULT_CHUNK_SIZE, write_geojsonl_in_range
+
+
+def get_shards(meshnum: int, extent=None, shard_meshnum: int = 1) -> list:
+    """[summary]
+    領域をshard_meshnum次のメッシュ単位に分割し、各分割に含まれるメッシュ番地の範囲を返す
+    分割は上位メッシュの下の行から順に、各行では左から順に並ぶ
+
+    Args:
+        meshnum (int): メッシュ次数
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        shard_meshnum (int, optional): 分割の単位とするメッシュ次数、meshnumの祖先である必要がある
+
+    Returns:
+        list: [(上位メッシュのメッシュコード, (x_start, x_end, y_start, y_end))...]
+    """
+    if shard_meshnum not in get_meshnum_chain(meshnum):
+        raise ValueError(
+            "分割の単位はメッシュ次数の上位の次数を指定してください：" + str(shard_meshnum))
+
+    # 上位メッシュ1つあたりのメッシュ数
+    _, _, unitcount = get_base_cellcount(meshnum)
+    _, _, shard_unitcount = get_base_cellcount(shard_meshnum)
+    factor = unitcount // shard_unitcount
+
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, extent)
+    shards = []
+    for shard_y in range(y_start // factor, (y_end + factor - 1) // factor):
+        for shard_x in range(x_start // factor, (x_end + factor - 1) // factor):
+            index_range = (
+                max(x_start, shard_x * factor),
+                min(x_end, (shard_x + 1) * factor),
+                max(y_start, shard_y * factor),
+                min(y_end, (shard_y + 1) * factor),
+            )
+            code = get_full_meshcode(shard_meshnum, shard_x, shard_y)
+            shards.append((code, index_range))
+    return shards
+
+
+def write_geojsonl_parallel(meshnum: int, f, extent=None, processes: int = None,
+                            shard_meshnum: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                            precision: int = None, stats=None, tmp_dir: str = None) -> int:
+    """[summary]
+    領域を上位メッシュ単位に分割し、複数プロセスで生成したgeojsonlを順に連結して書き出す
+    メッシュの順序はget_shards()の分割順で、各分割内はgenerate_meshes()と同じ順序となる
+    連結までの間、最大でプロセス数の2倍の分割が一時ファイルとしてtmp_dirに置かれる
+
+    Args:
+        meshnum (int): メッシュ次数
+        f (file-like): write()を持つテキストモードの書き込み先
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        processes (int, optional): プロセス数、省略時はCPU数
+        shard_meshnum (int, optional): 分割の単位とするメッシュ次数
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 分割ごとの進捗と、待機(wait)・連結(write)の時間の記録先
+        tmp_dir (str, optional): 一時ファイルを置くディレクトリ、省略時はシステムの一時ディレクトリ
+
+    Returns:
+        int: 書き出したメッシュの数
+    """
+    shards = get_shards(meshnum, extent, shard_meshnum)
+    count = 0
+    temp_dir = tempfile.mkdtemp(dir=tmp_dir)
+    try:
+        # 各プロセスは一時ファイルに書き出し、分割順に連結する
+        tasks = [
+            (meshnum, index_range, os.path.join(temp_dir, code + ".geojsonl"),
+             chunk_size, precision)
+            for code, index_range in shards
+        ]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            window = 2 * (processes or os.cpu_count() or 1)
+            results = _map_ordered(executor, _write_shard, tasks, window)
+            if stats is not None:
+                results = stats.iterate(results, "wait")
+            for path, shard_count in results:
+                with open(path) as shard_file:
+                    if stats is None:
+                        shutil.copyfileobj(shard_file, f, chunk_size)
+                    else:
+                        with stats.stage("write"):
+                            shutil.copyfileobj(shard_file, f, chunk_size)
+                        _advance(stats, shard_count)
+                os.remove(path)
+                count += shard_count
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    if hasattr(f, "flush"):
+        f.flush()
+    return count
+
+
+def write_geojsonl_shards(meshnum: int, target_dir: str, extent=None, processes: int = None,
+                          shard_meshnum: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                          precision: int = None, stats=None) -> list:
+    """[summary]
+    領域を上位メッシュ単位に分割し、複数プロセスで分割ごとのgeojsonlファイルに書き出す
+    ファイル名は"mesh_<メッシュ次数>_<上位メッシュのメッシュコード>.geojsonl"
+
+    Args:
+        meshnum (int): メッシュ次数
+        target_dir (str): 保存先のディレクトリ
+        extent (list, optional):  経緯度のペアのリストで領域指定
+        processes (int, optional): プロセス数、省略時はCPU数
+        shard_meshnum (int, optional): 分割の単位とするメッシュ次数
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 分割ごとの進捗と、待機(wait)の時間の記録先
+
+    Returns:
+        list: [(ファイルパス, メッシュの数)...]、分割順
+    """
+    shards = get_shards(meshnum, extent, shard_meshnum)
+    results = generate_shard_files(meshnum, target_dir, shards, processes, chunk_size, precision)
+    if stats is None:
+        return [(path, count) for _, path, count in results]
+    paths = []
+    for _, path, shard_count in stats.iterate(results, "wait"):
+        _advance(stats, shard_count)
+        paths.append((path, shard_count))
+    return paths
+
+
+def generate_shard_files(meshnum: int, target_dir: str, shards: list, processes: int = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE, precision: int = None):
+    """[summary]
+    get_shards()の分割を複数プロセスで分割ごとのgeojsonlファイルに書き出し、書き出した分割から順に返す
+    各ファイルは一時ファイルに書き出してから置き換えるため、中断しても書きかけのファイルは残らない
+
+    Args:
+        meshnum (int): メッシュ次数
+        target_dir (str): 保存先のディレクトリ
+        shards (list): get_shards()の値、またはその一部
+        processes (int, optional): プロセス数、省略時はCPU数
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+
+    yield:
+        (上位メッシュのメッシュコード, ファイルパス, メッシュの数)...、分割順
+    """
+    tasks = [
+        (meshnum, index_range, get_shard_path(target_dir, meshnum, code),
+         chunk_size, precision)
+        for code, index_range in shards
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        window = 2 * (processes or os.cpu_count() or 1)
+        results = _map_ordered(executor, _write_shard, tasks, window)
+        for (code, _), (path, count) in zip(shards, results):
+            yield code, path, count
+
+
+def get_shard_path(target_dir: str, meshnum: int, code: str) -> str:
+    """[summary]
+    分割ごとのgeojsonlファイルのパスを返す
+
+    Args:
+        target_dir (str): 保存先のディレクトリ
+        meshnum (int): メッシュ次数
+        code (str): 上位メッシュのメッシュコード
+
+    Returns:
+        str: ファイルパス
+    """
+    return os.path.join(target_dir, "mesh_" + str(meshnum) + "_" + code + ".geojsonl")
+
+
+def _write_shard(task: tuple) -> (str, int):
+    # ワーカープロセスで1つの分割を生成し、ファイルに書き出す
+    meshnum, index_range, path, chunk_size, precision = task
+    temp_path = path + ".tmp"
+    with open(temp_path, mode="w") as f:
+        count = write_geojsonl_in_range(meshnum, f, *index_range, chunk_size, precision)
+    os.replace(temp_path, path)
+    return path, count
+
+
+def _advance(stats, shard_count: int):
+    stats.count("shards")
+    stats.advance(shard_count)
+
+
+def _map_ordered(executor, func, tasks: list, window: int):
+    # 同時に投入するタスク数をwindowまでに抑えつつ、結果を投入順に返す
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(func, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
@@ -0,0 +1,224 @@
+from bisect import bisect_right
+import math
+
+try:
+    from constants import MESH_INFOS
+    from main import (
+        generate_meshes_in_range,
+        get_base_cellcount,
+        get_index_range,
+        get_mesh,
+        get_mesh_vertex,
+        get_unit_grid,
+    )
+    from meshcode import get_meshnum_chain
+except ModuleNotFoundError:
+    from .constants import MESH_INFOS
+    from .main import (
+        generate_meshes_in_range,
+        get_base_cellcount,
+        get_index_range,
+        get_mesh,
+        get_mesh_vertex,
+        get_unit_grid,
+    )
+    from .meshcode import get_meshnum_chain
+
+
+def get_polygon_rings(geojson: dict) -> list:
+    """[summary]
+    GeoJSONからポリゴンの全てのリング（外周・穴）を取り出す
+    Polygon、MultiPolygon、およびそれらを持つFeature、FeatureCollectionに対応
+
+    Args:
+        geojson (dict): GeoJSONのオブジェクト
+
+    Returns:
+        list: [[[lon, lat]...]...]、各リングは始点と終点が一致する
+    """
+    geojson_type = geojson.get("type")
+    if geojson_type == "FeatureCollection":
+        rings = []
+        for feature in geojson["features"]:
+            rings.extend(get_polygon_rings(feature))
+        return rings
+    if geojson_type == "Feature":
+        return get_polygon_rings(geojson["geometry"])
+    if geojson_type == "Polygon":
+        polygons = [geojson["coordinates"]]
+    elif geojson_type == "MultiPolygon":
+        polygons = geojson["coordinates"]
+    else:
+        raise ValueError("Polygon、MultiPolygonのGeoJSONを指定してください：" + str(geojson_type))
+
+    rings = []
+    for polygon in polygons:
+        for ring in polygon:
+            ring = [(float(lonlat[0]), float(lonlat[1])) for lonlat in ring]
+            if len(ring) < 3:
+                raise ValueError("ポリゴンのリングには3点以上が必要です")
+            if ring[0] != ring[-1]:
+                ring.append(ring[0])
+            rings.append(ring)
+    return rings
+
+
+def generate_meshes_in_polygon(meshnum: int, geojson: dict):
+    """[summary]
+    メッシュ次数およびポリゴンから、ポリゴンと重なる全てのメッシュの情報を返す
+    上位の次数から順に、ポリゴンの外側にあるメッシュは子孫ごと除外し、
+    内側にあるメッシュは子孫を判定せずに全て返す。境界と交差するメッシュのみ下位の次数で判定する
+    ポリゴンの辺に接するだけのメッシュは含まない
+    メッシュは上位メッシュごとにまとめて返す
+
+    Args:
+        meshnum (int): メッシュ次数
+        geojson (dict): Polygon、MultiPolygonのGeoJSON、get_polygon_rings()を参照
+
+    yield:
+        {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}...
+    """
+    rings = get_polygon_rings(geojson)
+    edges = []
+    for ring in rings:
+        for i in range(len(ring) - 1):
+            if ring[i] != ring[i + 1]:
+                edges.append((ring[i][0], ring[i][1], ring[i + 1][0], ring[i + 1][1]))
+
+    lons = [lonlat[0] for ring in rings for lonlat in ring]
+    lats = [lonlat[1] for ring in rings for lonlat in ring]
+    extent = [[min(lons), min(lats)], [max(lons), max(lats)]]
+
+    clipper = _PolygonClipper(meshnum, edges)
+    yield from clipper.generate(get_index_range(1, extent))
+
+
+class _PolygonClipper:
+    # ポリゴンの辺をもとに、上位の次数から順にメッシュを内側・外側・境界に分類する
+
+    def __init__(self, meshnum: int, edges: list):
+        self.meshnum = meshnum
+        self.chain = get_meshnum_chain(meshnum)
+        self.edges = edges
+        # 次数ごとに、メッシュの行と、その行の中心の緯度と交差する辺の経度のリスト
+        self.crossings = {level: {} for level in self.chain}
+        self.rows = {level: None for level in self.chain}
+
+    def generate(self, index_range: tuple):
+        # 1次メッシュは全ての辺を対象に分類する
+        x_start, x_end, y_start, y_end = index_range
+        yield from self._generate_children(
+            0, x_start, x_end, y_start, y_end, self.edges)
+
+    def _generate_children(self, position: int, x_start: int, x_end: int,
+                           y_start: int, y_end: int, edges: list):
+        # chain[position]次の番地の範囲内のメッシュを分類し、該当するメッシュを返す
+        level = self.chain[position]
+        children_edges = self._assign_edges(level, x_start, x_end, y_start, y_end, edges)
+
+        for y in range(y_start, y_end):
+            for x in range(x_start, x_end):
+                cell_edges = children_edges.get((x, y))
+                if cell_edges:
+                    # 境界と交差するメッシュ
+                    if level == self.meshnum:
+                        yield get_mesh(level, x, y)
+                    else:
+                        ratio = MESH_INFOS[self.chain[position + 1]]["ratio"]
+                        yield from self._generate_children(
+                            position + 1, x * ratio, (x + 1) * ratio,
+                            y * ratio, (y + 1) * ratio, cell_edges)
+                elif self._is_inside(level, x, y):
+                    # 内側のメッシュは子孫を全て返す
+                    yield from self._generate_descendants(level, x, y)
+
+    def _generate_descendants(self, level: int, x: int, y: int):
+        _, _, unitcount = get_base_cellcount(self.meshnum)
+        _, _, level_unitcount = get_base_cellcount(level)
+        factor = unitcount // level_unitcount
+        yield from generate_meshes_in_range(
+            self.meshnum, x * factor, (x + 1) * factor, y * factor, (y + 1) * factor)
+
+    def _assign_edges(self, level: int, x_start: int, x_end: int,
+                      y_start: int, y_end: int, edges: list) -> dict:
+        # 各辺を、その辺が内部を通過するメッシュに割り当てる
+        x_origin, x_step, x_denom, y_origin, y_step, y_denom = get_unit_grid(level)
+        children_edges = {}
+        for edge in edges:
+            x1, y1, x2, y2 = edge
+            # 辺の外接矩形に重なるメッシュのみ判定する
+            x_min = max(_floor_index(min(x1, x2), x_origin, x_step, x_denom) - 1, x_start)
+            x_max = min(_floor_index(max(x1, x2), x_origin, x_step, x_denom) + 1, x_end - 1)
+            y_min = max(_floor_index(min(y1, y2), y_origin, y_step, y_denom) - 1, y_start)
+            y_max = min(_floor_index(max(y1, y2), y_origin, y_step, y_denom) + 1, y_end - 1)
+            for y in range(y_min, y_max + 1):
+                for x in range(x_min, x_max + 1):
+                    left, bottom = get_mesh_vertex(level, x, y)
+                    right, top = get_mesh_vertex(level, x + 1, y + 1)
+                    if _crosses_interior(edge, left, bottom, right, top):
+                        children_edges.setdefault((x, y), []).append(edge)
+        return children_edges
+
+    def _is_inside(self, level: int, x: int, y: int) -> bool:
+        # 内部を辺が通過しないメッシュは、中心点がポリゴンの内側かどうかで判定する
+        left, bottom = get_mesh_vertex(level, x, y)
+        right, top = get_mesh_vertex(level, x + 1, y + 1)
+        center_x = (left + right) / 2
+        crossings = self._get_crossings(level, y, (bottom + top) / 2)
+        # 中心から東向きの半直線と交差する辺の数が奇数なら内側
+        return (len(crossings) - bisect_right(crossings, center_x)) % 2 == 1
+
+    def _get_crossings(self, level: int, y: int, center_y: float) -> list:
+        # 行の中心の緯度を通る水平線と交差する辺の経度を昇順で返す
+        crossings = self.crossings[level].get(y)
+        if crossings is None:
+            crossings = []
+            for x1, y1, x2, y2 in self._get_row_edges(level).get(y, []):
+                if (y1 > center_y) != (y2 > center_y):
+                    crossings.append(x1 + (center_y - y1) * (x2 - x1) / (y2 - y1))
+            crossings.sort()
+            self.crossings[level][y] = crossings
+        return crossings
+
+    def _get_row_edges(self, level: int) -> dict:
+        # 次数ごとに、各行の緯度の範囲に重なる辺のリストを作成する
+        if self.rows[level] is None:
+            _, _, _, y_origin, y_step, y_denom = get_unit_grid(level)
+            rows = {}
+            for edge in self.edges:
+                y_min = _floor_index(min(edge[1], edge[3]), y_origin, y_step, y_denom) - 1
+                y_max = _floor_index(max(edge[1], edge[3]), y_origin, y_step, y_denom) + 1
+                for y in range(y_min, y_max + 1):
+                    rows.setdefault(y, []).append(edge)
+            self.rows[level] = rows
+        return self.rows[level]
+
+
+def _floor_index(value: float, origin: int, step: int, denom: int) -> int:
+    # 頂点座標がvalue以下となる最大の番地の近似値（誤差は±1以内）、判定対象を絞るためのみに使う
+    return math.floor((value * denom - origin) / step)
+
+
+def _crosses_interior(edge: tuple, left: float, bottom: float, right: float, top: float) -> bool:
+    # 辺が矩形の内部（境界を除く）を通過するか判定する
+    # 辺を矩形で切り取り、切り取った線分の中点が内部にあれば通過している
+    x1, y1, x2, y2 = edge
+    dx = x2 - x1
+    dy = y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - bottom), (dy, top - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return False
+    if t0 == t1:
+        return False
+    t = (t0 + t1) / 2
+    return left < x1 + t * dx < right and bottom < y1 + t * dy < top
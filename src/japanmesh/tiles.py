@@ -0,0 +1,237 @@
+import asyncio
+import io
+import math
+import re
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from cache import bounded_cache
+    from main import get_index_range, get_meshsize
+    from writer import write_geojsonl_in_range
+except ModuleNotFoundError:
+    from .cache import bounded_cache
+    from .main import get_index_range, get_meshsize
+    from .writer import write_geojsonl_in_range
+
+# タイルの一辺のピクセル数
+TILE_SIZE = 256
+# ズームレベルの上限
+MAX_ZOOM = 24
+# メッシュ次数を自動で選ぶ際の、メッシュの幅の最小ピクセル数
+MIN_MESH_PIXELS = 8
+# 1タイルに含めるメッシュ数の上限、メッシュ次数を指定した場合に細かすぎるタイルを防ぐ
+MAX_TILE_MESHES = 100000
+# タイルのキャッシュの既定の最大件数
+DEFAULT_TILE_CACHE_SIZE = 1024
+
+_TILE_PATH = re.compile(r"^/(\d+)/(\d+)/(\d+)\.geojson$")
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            500: "Internal Server Error"}
+
+
+def get_tile_extent(z: int, x: int, y: int) -> list:
+    """[summary]
+    Webメルカトルのタイル座標から、タイルの経緯度の範囲を返す
+
+    Args:
+        z (int): ズームレベル
+        x (int): タイルのx座標（西から東）
+        y (int): タイルのy座標（北から南）
+
+    Returns:
+        list: [[西端の経度, 南端の緯度], [東端の経度, 北端の緯度]]
+    """
+    _validate_tile(z, x, y)
+    n = 1 << z
+    return [
+        [x / n * 360 - 180, _get_tile_lat(y + 1, n)],
+        [(x + 1) / n * 360 - 180, _get_tile_lat(y, n)],
+    ]
+
+
+def get_tile_meshnum(z: int) -> int:
+    """[summary]
+    ズームレベルから、タイルに表示するメッシュ次数を選ぶ
+    メッシュの幅がMIN_MESH_PIXELSピクセル以上となる最も細かい次数、どの次数も満たさない場合は1次
+
+    Args:
+        z (int): ズームレベル
+
+    Returns:
+        int: メッシュ次数
+    """
+    _validate_zoom(z)
+    degree_per_pixel = 360 / ((1 << z) * TILE_SIZE)
+    meshnums = [meshnum for meshnum in range(1, 11)
+                if get_meshsize(meshnum)[0] / degree_per_pixel >= MIN_MESH_PIXELS]
+    if not meshnums:
+        return 1
+    return min(meshnums, key=lambda meshnum: get_meshsize(meshnum)[0])
+
+
+def get_tile_index_range(z: int, x: int, y: int, meshnum: int = None) -> (int, int, int, int):
+    """[summary]
+    タイルに重なるメッシュ番地の範囲を返す
+
+    Args:
+        z (int): ズームレベル
+        x (int): タイルのx座標
+        y (int): タイルのy座標
+        meshnum (int, optional): メッシュ次数、省略時はget_tile_meshnum()で選ぶ
+
+    Returns:
+        tuple: (メッシュ次数, xの開始番地, xの終了番地, yの開始番地, yの終了番地)
+            タイルが生成範囲外の場合、範囲は空となる
+    """
+    if meshnum is None:
+        meshnum = get_tile_meshnum(z)
+    x_start, x_end, y_start, y_end = get_index_range(meshnum, get_tile_extent(z, x, y))
+    return meshnum, x_start, max(x_start, x_end), y_start, max(y_start, y_end)
+
+
+def get_tile_geojson(z: int, x: int, y: int, meshnum: int = None) -> str:
+    """[summary]
+    タイルに重なる全てのメッシュをGeoJSONのFeatureCollectionの文字列として返す
+    生成した文字列はタイルごとにキャッシュする（キャッシュ名"tile"、configure_cache()で件数を変更できる）
+
+    Args:
+        z (int): ズームレベル
+        x (int): タイルのx座標
+        y (int): タイルのy座標
+        meshnum (int, optional): メッシュ次数、省略時はget_tile_meshnum()で選ぶ
+
+    Returns:
+        str: FeatureCollectionの文字列
+    """
+    # 不正なズームレベルでメッシュ次数を選ばないよう、先にタイル座標を確認する
+    _validate_tile(z, x, y)
+    if meshnum is None:
+        meshnum = get_tile_meshnum(z)
+    return _get_tile_geojson(z, x, y, meshnum)
+
+
+@bounded_cache("tile", DEFAULT_TILE_CACHE_SIZE)
+def _get_tile_geojson(z: int, x: int, y: int, meshnum: int) -> str:
+    meshnum, x_start, x_end, y_start, y_end = get_tile_index_range(z, x, y, meshnum)
+    if (x_end - x_start) * (y_end - y_start) > MAX_TILE_MESHES:
+        raise ValueError("タイルに含まれるメッシュが多すぎます、粗いメッシュ次数を指定してください")
+    f = io.StringIO()
+    write_geojsonl_in_range(meshnum, f, x_start, x_end, y_start, y_end)
+    features = f.getvalue().splitlines()
+    return '{"type":"FeatureCollection","features":[' + ",".join(features) + "]}"
+
+
+async def start_tile_server(host: str = "127.0.0.1", port: int = 8000):
+    """[summary]
+    "/<z>/<x>/<y>.geojson"へのGETリクエストにget_tile_geojson()の内容を返すHTTPサーバーを開始する
+    クエリ"?meshnum=<メッシュ次数>"でメッシュ次数を指定できる
+    タイルの生成はスレッドプールで行い、生成中も他のリクエストを受け付ける
+
+    Args:
+        host (str, optional): 待ち受けるホスト
+        port (int, optional): 待ち受けるポート、0で空いているポート
+
+    Returns:
+        asyncio.AbstractServer: 開始したサーバー
+    """
+    return await asyncio.start_server(_handle_request, host, port)
+
+
+def serve_tiles(host: str = "127.0.0.1", port: int = 8000, log=None):
+    """[summary]
+    タイルのHTTPサーバーを開始し、中断されるまで待ち受ける
+
+    Args:
+        host (str, optional): 待ち受けるホスト
+        port (int, optional): 待ち受けるポート
+        log (file-like, optional): 待ち受けるアドレスの表示先
+    """
+    async def serve():
+        server = await start_tile_server(host, port)
+        if log is not None:
+            for sock in server.sockets:
+                address = sock.getsockname()
+                print("serving tiles at http://{}:{}/{{z}}/{{x}}/{{y}}.geojson".format(
+                    address[0], address[1]), file=log, flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+async def _handle_request(reader, writer):
+    try:
+        try:
+            request_line = await reader.readline()
+            # ヘッダは使用しないため読み飛ばす
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            # 読み込み中の切断や、長すぎる行を含むリクエストには応答せずに閉じる
+            return
+        parts = request_line.decode("latin-1").split()
+        if len(parts) < 2:
+            status, body = 400, "リクエストが不正です"
+        else:
+            loop = asyncio.get_running_loop()
+            try:
+                status, body = await loop.run_in_executor(None, _get_response, parts[0], parts[1])
+            except Exception:
+                # 想定外のエラーでも接続を切らずに応答を返す
+                status, body = 500, "タイルの生成中にエラーが発生しました"
+
+        content_type = "application/geo+json" if status == 200 else "text/plain; charset=utf-8"
+        body = body.encode("utf-8")
+        header = (
+            "HTTP/1.1 {} {}\r\n".format(status, _REASONS[status])
+            + "Content-Type: " + content_type + "\r\n"
+            + "Content-Length: " + str(len(body)) + "\r\n"
+            + "Access-Control-Allow-Origin: *\r\n"
+            + "Connection: close\r\n\r\n"
+        )
+        writer.write(header.encode("latin-1") + body)
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+def _get_response(method: str, target: str) -> (int, str):
+    # リクエストからステータスコードと本文を返す
+    if method != "GET":
+        return 405, "GETのみ対応しています"
+    url = urlsplit(target)
+    match = _TILE_PATH.match(url.path)
+    if match is None:
+        return 404, "/<z>/<x>/<y>.geojsonの形式で指定してください"
+    z, x, y = (int(value) for value in match.groups())
+    try:
+        meshnum = parse_qs(url.query).get("meshnum")
+        if meshnum is not None:
+            meshnum = int(meshnum[0])
+            if not 1 <= meshnum <= 10:
+                raise ValueError("メッシュ次数を正しく入力してください")
+        return 200, get_tile_geojson(z, x, y, meshnum)
+    except ValueError as e:
+        return 400, str(e)
+
+
+def _validate_zoom(z: int):
+    if not 0 <= z <= MAX_ZOOM:
+        raise ValueError("ズームレベルは0から" + str(MAX_ZOOM) + "の間で指定してください")
+
+
+def _validate_tile(z: int, x: int, y: int):
+    _validate_zoom(z)
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError("タイル座標がズームレベルの範囲外です")
+
+
+def _get_tile_lat(y: int, n: int) -> float:
+    # タイルのy座標の北端の緯度
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
@@ -0,0 +1,253 @@
+import sys
+from contextlib import nullcontext
+
+try:
+    from compress import CompressedWriter
+    from main import get_full_meshcode, get_mesh_vertex
+    from mesh import Mesh
+except ModuleNotFoundError:
+    from .compress import CompressedWriter
+    from .main import get_full_meshcode, get_mesh_vertex
+    from .mesh import Mesh
+
+# ファイル書き込み単位の文字数の既定値
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+_FEATURE_HEAD = '{"type":"Feature","geometry":{"type":"Polygon","coordinates":[[['
+_FEATURE_TAIL = ']]]},"properties":{"code":"'
+
+
+class GeoJSONLSerializer:
+    """[summary]
+    メッシュ情報をgeojsonlの1行分の文字列に変換する
+    同じ行のメッシュは緯度を、同じ列のメッシュは経度を共有するため、
+    経緯度の文字列は値ごとに一度だけ生成して使い回す
+    1つの書き出し処理ごとにインスタンスを作成してください
+    """
+
+    def __init__(self, precision: int = None):
+        """[summary]
+        Args:
+            precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        """
+        if precision is not None and precision < 0:
+            raise ValueError("precisionは0以上で指定してください")
+        self.precision = precision
+        self._texts = {}
+
+    def format(self, value: float) -> str:
+        """[summary]
+        経度または緯度を文字列に変換する
+
+        Args:
+            value (float): 経度または緯度
+
+        Returns:
+            str: JSONの数値として有効な文字列
+        """
+        text = self._texts.get(value)
+        if text is None:
+            text = _format(value, self.precision)
+            self._texts[value] = text
+        return text
+
+    def serialize(self, mesh: dict) -> str:
+        """[summary]
+        メッシュ情報をgeojsonlの1行分の文字列に変換する
+
+        Args:
+            mesh (dict or Mesh): {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}、またはMesh
+
+        Returns:
+            str: 改行を含むFeature文字列
+        """
+        if isinstance(mesh, Mesh):
+            # Meshはポリゴンの座標のリストを作らずに範囲を求める
+            left, bottom, right, top = mesh.bounds
+        else:
+            (left, bottom), _, (right, top), _, _ = mesh["geometry"][0]
+        return self.serialize_bounds(
+            self.format(left), self.format(bottom), self.format(right), self.format(top),
+            mesh["code"])
+
+    @staticmethod
+    def serialize_bounds(left: str, bottom: str, right: str, top: str, code: str,
+                         properties: str = "") -> str:
+        """[summary]
+        文字列化済みの東西南北の端の経緯度とメッシュコードから、geojsonlの1行分の文字列を組み立てる
+
+        Args:
+            properties (str, optional): codeに続けて追加するプロパティのJSON文字列、',"level":3'など
+
+        Returns:
+            str: 改行を含むFeature文字列
+        """
+        left_bottom = left + "," + bottom
+        return _FEATURE_HEAD + left_bottom + "],[" + left + "," + top + "],[" + \
+            right + "," + top + "],[" + right + "," + bottom + "],[" + left_bottom + \
+            _FEATURE_TAIL + code + '"' + properties + '}}\n'
+
+
+def to_geojsonl_feature(mesh: dict, precision: int = None) -> str:
+    """[summary]
+    メッシュ情報をgeojsonlの1行分の文字列に変換する
+
+    Args:
+        mesh (dict): {"geometry":<メッシュのジオメトリ>, "code":<メッシュコード>}
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+
+    Returns:
+        str: 改行を含むFeature文字列
+    """
+    return GeoJSONLSerializer(precision).serialize(mesh)
+
+
+def write_geojsonl(meshes, f, chunk_size: int = DEFAULT_CHUNK_SIZE, precision: int = None,
+                   stats=None) -> int:
+    """[summary]
+    メッシュ情報のイテラブルを逐次geojsonl形式でファイルライクオブジェクトに書き出す
+    generate_meshes()のジェネレータを直接渡すことで、領域の広さによらず
+    メモリ使用量はおおよそchunk_sizeに収まる
+
+    Args:
+        meshes (iterable): generate_meshes()などが返すメッシュ情報、またはMesh
+        f (file-like): write()を持つテキストモードの書き込み先
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 生成(generate)・文字列化(serialize)・書き込み(write)の時間と進捗の記録先
+
+    Returns:
+        int: 書き出したメッシュの数
+    """
+    serializer = GeoJSONLSerializer(precision)
+    if stats is None:
+        return _write_features(map(serializer.serialize, meshes), f, chunk_size)
+    features = map(serializer.serialize, stats.iterate(meshes, "generate"))
+    return _write_features(stats.iterate(features, "serialize"), f, chunk_size, stats)
+
+
+def write_geojsonl_in_range(meshnum: int, f, x_start: int, x_end: int, y_start: int, y_end: int,
+                            chunk_size: int = DEFAULT_CHUNK_SIZE, precision: int = None,
+                            stats=None) -> int:
+    """[summary]
+    メッシュ次数および番地の範囲内の全てのメッシュを、geojsonl形式で書き出す
+    write_geojsonl(generate_meshes_in_range(...), ...)と同じ内容を書き出すが、
+    メッシュ情報の辞書を作らず、各列の経度・各行の緯度の文字列を一度だけ生成する
+
+    Args:
+        meshnum (int): メッシュ次数
+        f (file-like): write()を持つテキストモードの書き込み先
+        x_start (int): xの開始番地
+        x_end (int): xの終了番地（範囲に含まない）
+        y_start (int): yの開始番地
+        y_end (int): yの終了番地（範囲に含まない）
+        chunk_size (int, optional): 一度に書き込む文字数の目安
+        precision (int, optional): 経緯度の小数点以下の桁数、省略時は値を復元できる最短の表記
+        stats (JobStats, optional): 時間と進捗の記録先、生成と文字列化は一体のためserializeとして記録する
+
+    Returns:
+        int: 書き出したメッシュの数
+    """
+    features = _generate_features_in_range(meshnum, x_start, x_end, y_start, y_end, precision)
+    if stats is not None:
+        features = stats.iterate(features, "serialize")
+    return _write_features(features, f, chunk_size, stats)
+
+
+def _generate_features_in_range(meshnum: int, x_start: int, x_end: int,
+                                y_start: int, y_end: int, precision: int):
+    serializer = GeoJSONLSerializer(precision)
+    serialize_bounds = serializer.serialize_bounds
+    lons = [serializer.format(get_mesh_vertex(meshnum, x, 0)[0])
+            for x in range(x_start, x_end + 1)]
+    for y in range(y_start, y_end):
+        bottom = serializer.format(get_mesh_vertex(meshnum, 0, y)[1])
+        top = serializer.format(get_mesh_vertex(meshnum, 0, y + 1)[1])
+        for i, x in enumerate(range(x_start, x_end)):
+            yield serialize_bounds(lons[i], bottom, lons[i + 1], top,
+                                   get_full_meshcode(meshnum, x, y))
+
+
+def _write_features(features, f, chunk_size: int, stats=None) -> int:
+    # Feature文字列をchunk_sizeの目安ごとにまとめて書き出す
+    if chunk_size < 1:
+        raise ValueError("chunk_sizeは1以上で指定してください")
+
+    count = 0
+    buffer = []
+    buffered_size = 0
+    for feature in features:
+        buffer.append(feature)
+        buffered_size += len(feature)
+        count += 1
+        if buffered_size >= chunk_size:
+            flush_features(f, buffer, stats)
+            buffer = []
+            buffered_size = 0
+
+    if buffer:
+        flush_features(f, buffer, stats)
+    return count
+
+
+def _format(value: float, precision: int) -> str:
+    if precision is None:
+        # reprは値を復元できる最短の表記で、有限の値ならJSONの数値として有効
+        return repr(float(value))
+    return format(value, "." + str(precision) + "f")
+
+
+def flush_features(f, buffer: list, stats=None):
+    """[summary]
+    バッファにためたFeature文字列を連結して書き出す
+    statsを指定した場合は書き込み(write)の時間、チャンク数・文字数・件数を記録する
+
+    Args:
+        f (file-like): write()を持つテキストモードの書き込み先
+        buffer (list): Feature文字列のリスト
+        stats (JobStats, optional): 進捗と所要時間の記録先
+    """
+    if stats is None:
+        _write(f, "".join(buffer))
+        return
+    with stats.stage("write"):
+        text = "".join(buffer)
+        _write(f, text)
+    stats.count("chunks")
+    stats.count("characters", len(text))
+    stats.advance(len(buffer))
+
+
+def _write(f, text: str):
+    f.write(text)
+    # 標準出力などパイプ先にも書き込み済みの内容をすぐ届ける
+    if hasattr(f, "flush"):
+        f.flush()
+
+
+def open_output(path: str, compression: str = None, level: int = None, threads: int = None):
+    """[summary]
+    書き込み先を開く。"-"の場合は標準出力を返す（終了時に閉じない）
+
+    Args:
+        path (str): 書き込み先のパス、または"-"
+        compression (str, optional): 圧縮形式、"gzip"または"zstd"、省略時は圧縮しない
+        level (int, optional): 圧縮レベル、CompressedWriterを参照
+        threads (int, optional): 圧縮するスレッド数、省略時はCPU数
+
+    Returns:
+        コンテキストマネージャ: テキストモードの書き込み先
+    """
+    if compression is not None:
+        if path == "-":
+            return CompressedWriter(sys.stdout.buffer, compression, level, threads,
+                                    close_file=False)
+        f = open(path, mode="wb")
+        try:
+            return CompressedWriter(f, compression, level, threads)
+        except BaseException:
+            f.close()
+            raise
+    if path == "-":
+        return nullcontext(sys.stdout)
+    return open(path, mode="w")
@@ -0,0 +1,120 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+import numpy as np
+from japanmesh.aggregate import (
+    MeshAggregator,
+    aggregate_points,
+    read_csv_chunks,
+    write_aggregate_csv,
+)
+from japanmesh.meshcode import encode_meshcode
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "japanmesh", "main.py")
+
+
+class TestAggregate(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.lon = rng.uniform(139.7, 139.8, 1000)
+        self.lat = rng.uniform(35.6, 35.7, 1000)
+        self.value = rng.uniform(0, 10, 1000)
+
+    def get_expected(self, meshnum: int) -> dict:
+        # 1地点ずつencode_meshcode()で求めた集計結果
+        expected = {}
+        for lon, lat, value in zip(self.lon, self.lat, self.value):
+            code = encode_meshcode(meshnum, [lon, lat])
+            count, total = expected.get(code, (0, 0.0))
+            expected[code] = (count + 1, total + value)
+        return expected
+
+    def test_mesh_aggregator(self):
+        aggregator = MeshAggregator(5, ["value"])
+        # 分割して追加しても一度に集計した結果と同じになる
+        for start in range(0, 1000, 300):
+            stop = start + 300
+            aggregator.add(self.lon[start:stop], self.lat[start:stop],
+                           {"value": self.value[start:stop]})
+        # 生成範囲外・非数の地点は集計しない
+        aggregator.add(np.array([0.0, np.nan]), np.array([0.0, 35.0]),
+                       {"value": np.array([1.0, 1.0])})
+        self.assertEqual(aggregator.skipped, 2)
+
+        result = aggregator.get_result()
+        expected = self.get_expected(5)
+        self.assertEqual(list(result["code"].astype(str)), sorted(expected))
+        for code, count, total in zip(result["code"], result["count"], result["value"]):
+            self.assertEqual(count, expected[str(code)][0])
+            self.assertAlmostEqual(total, expected[str(code)][1])
+        self.assertEqual(int(result["count"].sum()), 1000)
+
+        # 既存のメッシュへの加算と、前後・間への新しいメッシュの挿入
+        aggregator = MeshAggregator(1)
+        aggregator.add(np.array([139.5, 141.5]), np.array([35.5, 35.5]))
+        aggregator.add(np.array([138.5, 140.5, 141.5, 142.5]), np.array([35.5] * 4))
+        aggregator.add(np.array([]), np.array([]))
+        result = aggregator.get_result()
+        self.assertEqual(list(result["code"]), [5338, 5339, 5340, 5341, 5342])
+        self.assertEqual(list(result["count"]), [1, 1, 1, 2, 1])
+
+    def test_aggregate_points(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "points.csv")
+            with open(path, mode="w") as f:
+                f.write("id,lat,lon,value\n")
+                for i in range(1000):
+                    f.write("{},{},{},{}\n".format(
+                        i, float(self.lat[i]), float(self.lon[i]), float(self.value[i])))
+                f.write("1000,invalid,,1\n")
+
+            chunks = list(read_csv_chunks(path, ["lon", "lat"], chunk_rows=400))
+            self.assertEqual([len(chunk["lon"]) for chunk in chunks], [400, 400, 201])
+            self.assertTrue(np.isnan(chunks[-1]["lat"][-1]))
+
+            result = aggregate_points(7, path, value_columns=["value"], chunk_rows=128)
+            expected = self.get_expected(7)
+            self.assertEqual(list(result["code"].astype(str)), sorted(expected))
+            self.assertEqual(list(result["count"]), [expected[code][0] for code in sorted(expected)])
+
+            with self.assertRaises(ValueError):
+                list(read_csv_chunks(path, ["x", "y"]))
+
+        f = io.StringIO()
+        write_aggregate_csv(result, f)
+        lines = f.getvalue().splitlines()
+        self.assertEqual(lines[0], "code,count,value")
+        self.assertEqual(len(lines), len(expected) + 1)
+        self.assertTrue(lines[1].startswith(sorted(expected)[0] + ","))
+
+    def test_aggregate_command(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "points.csv")
+            with open(path, mode="w") as f:
+                f.write("lon,lat\n139.7,35.6\n0,0\n139.7,invalid\n")
+            output = subprocess.run(
+                [sys.executable, MAIN_PATH, "aggregate", "1", path, "-o", "-"],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+                check=True)
+        self.assertEqual(output.stdout, "code,count\n5339,1\n")
+        # 集計しなかった地点の数を表示する
+        self.assertIn("skipped 2 points", output.stderr)
+
+    def test_read_csv_chunks(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "points.csv")
+            # 1つ目の範囲は全て数値、2つ目は読めない値・列の足りない行・空行、3つ目以降は引用符を含む
+            with open(path, mode="w") as f:
+                f.write("lon,lat,name\n")
+                f.write("139.1,35.1,a\n139.2,35.2,b\n")
+                f.write("139.3,x,c\n139.4\n\n")
+                f.write('139.5,35.5,"d\ne"\n"139.6",35.6,f\n')
+
+            chunks = list(read_csv_chunks(path, ["lon", "lat"], chunk_rows=2))
+            lon = np.concatenate([chunk["lon"] for chunk in chunks])
+            lat = np.concatenate([chunk["lat"] for chunk in chunks])
+            np.testing.assert_array_equal(lon, [139.1, 139.2, 139.3, 139.4, 139.5, 139.6])
+            np.testing.assert_array_equal(lat, [35.1, 35.2, np.nan, np.nan, 35.5, 35.6])
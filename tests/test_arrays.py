@@ -0,0 +1,84 @@
+from unittest import TestCase
+import numpy as np
+from japanmesh.main import get_index_range, get_mesh, get_meshes
+from japanmesh.arrays import (
+    decode_meshcodes,
+    encode_meshcodes,
+    generate_mesh_arrays,
+    get_mesh_arrays,
+    get_meshcode_array,
+)
+from japanmesh.meshcode import encode_meshcode
+
+
+class TestArrays(TestCase):
+    def test_get_meshcode_array(self):
+        # 全ての次数でget_mesh()と同じメッシュコードとなる
+        for meshnum in range(1, 11):
+            _, x_count, _, y_count = get_index_range(meshnum)
+            x = np.array([0, 1, 7, x_count // 3, x_count // 2, x_count - 1])
+            y = np.array([0, 1, 9, y_count // 5, y_count // 2, y_count - 1])
+            codes = get_meshcode_array(meshnum, x, y)
+            for i in range(len(x)):
+                self.assertEqual(str(codes[i]), get_mesh(meshnum, int(x[i]), int(y[i]))["code"])
+
+    def test_get_mesh_arrays(self):
+        extent = [[139.7, 35.6], [139.8, 35.7]]
+        for meshnum in [1, 3, 5, 7]:
+            arrays = get_mesh_arrays(meshnum, extent)
+            meshes = get_meshes(meshnum, extent)
+            self.assertEqual(len(arrays["code"]), len(meshes))
+            for i, mesh in enumerate(meshes):
+                ring = mesh["geometry"][0]
+                self.assertEqual(str(arrays["code"][i]), mesh["code"])
+                self.assertEqual(arrays["left"][i], ring[0][0])
+                self.assertEqual(arrays["bottom"][i], ring[0][1])
+                self.assertEqual(arrays["right"][i], ring[2][0])
+                self.assertEqual(arrays["top"][i], ring[2][1])
+
+        self.assertEqual(len(get_mesh_arrays(1)["code"]), 1248)
+
+    def test_generate_mesh_arrays(self):
+        extent = [[139.7, 35.6], [139.8, 35.7]]
+        arrays = get_mesh_arrays(7, extent)
+        # ブロックを連結すると一括で生成した場合と一致する
+        blocks = list(generate_mesh_arrays(7, extent, block_size=7))
+        self.assertTrue(all(len(block["code"]) <= 7 for block in blocks))
+        for key in arrays:
+            np.testing.assert_array_equal(
+                np.concatenate([block[key] for block in blocks]), arrays[key])
+
+        with self.assertRaises(ValueError):
+            list(generate_mesh_arrays(7, extent, block_size=0))
+
+    def test_encode_meshcodes(self):
+        # 境界上の地点や範囲外の地点を含め、encode_meshcode()と同じ結果となる
+        lon = np.array([139.7671, 123.0, 122.0, 153.99999, 135.125, 100.0, np.nan])
+        lat = np.array([35.6812, 20.0, 20 + 2 / 3, 45.99999, 34.5 + 1 / 240, 35.0, 35.0])
+        for meshnum in range(1, 11):
+            codes = encode_meshcodes(meshnum, lon, lat)
+            for i in range(len(lon)):
+                try:
+                    expected = int(encode_meshcode(meshnum, [lon[i], lat[i]]))
+                except ValueError:
+                    expected = 0
+                self.assertEqual(codes[i], expected)
+
+    def test_decode_meshcodes(self):
+        for meshnum in range(1, 11):
+            arrays = get_mesh_arrays(meshnum, [[139.7, 35.6], [139.701, 35.601]])
+            x, y = decode_meshcodes(meshnum, arrays["code"])
+            np.testing.assert_array_equal(x, arrays["x"])
+            np.testing.assert_array_equal(y, arrays["y"])
+            # 文字列でも復元できる
+            x, y = decode_meshcodes(meshnum, arrays["code"].astype(str))
+            np.testing.assert_array_equal(x, arrays["x"])
+
+        x, y = decode_meshcodes(3, [53394611, 53398611, 5339461, 99999999])
+        np.testing.assert_array_equal(x, [1421, -1, -1, -1])
+        np.testing.assert_array_equal(y, [1881, -1, -1, -1])
+
+        # 数字以外を含む文字列は例外とならず不正なコードとなる
+        x, y = decode_meshcodes(3, ["53394611", "abc", "", "5339461a", "1" * 30])
+        np.testing.assert_array_equal(x, [1421, -1, -1, -1, -1])
+        np.testing.assert_array_equal(y, [1881, -1, -1, -1, -1])
@@ -0,0 +1,40 @@
+from unittest import TestCase
+from japanmesh.cache import clear_caches, configure_cache, get_cache_info, DEFAULT_CACHE_SIZE
+from japanmesh.main import get_meshes
+
+
+class TestCache(TestCase):
+    def tearDown(self):
+        configure_cache("parent_meshcode", DEFAULT_CACHE_SIZE)
+
+    def test_get_cache_info(self):
+        clear_caches()
+        meshes = get_meshes(7, [[139.7, 35.6], [139.8, 35.7]])
+        info = get_cache_info()["parent_meshcode"]
+        # 上位メッシュのコードのみ保持するため、件数はメッシュ数より少ない
+        self.assertGreater(info["size"], 0)
+        self.assertLess(info["size"], len(meshes))
+        self.assertGreater(info["hits"], info["misses"])
+
+        clear_caches()
+        self.assertEqual(get_cache_info()["parent_meshcode"],
+                         {"hits": 0, "misses": 0, "size": 0, "maxsize": DEFAULT_CACHE_SIZE})
+
+    def test_configure_cache(self):
+        expected = [mesh["code"] for mesh in get_meshes(9, [[139.7, 35.6], [139.71, 35.61]])]
+
+        # 最大件数を超えて保持しない、キャッシュの有無で結果は変わらない
+        configure_cache("parent_meshcode", 8)
+        meshes = get_meshes(9, [[139.7, 35.6], [139.71, 35.61]])
+        self.assertEqual([mesh["code"] for mesh in meshes], expected)
+        self.assertEqual(get_cache_info()["parent_meshcode"]["size"], 8)
+
+        configure_cache("parent_meshcode", 0)
+        meshes = get_meshes(9, [[139.7, 35.6], [139.71, 35.61]])
+        self.assertEqual([mesh["code"] for mesh in meshes], expected)
+        self.assertEqual(get_cache_info()["parent_meshcode"]["size"], 0)
+
+        with self.assertRaises(KeyError):
+            configure_cache("unknown", 8)
+        with self.assertRaises(ValueError):
+            configure_cache("parent_meshcode", -1)
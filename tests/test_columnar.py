@@ -0,0 +1,61 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+from japanmesh.main import get_meshes
+from japanmesh.columnar import MeshBinaryReader, write_mesh_binary
+
+
+class TestColumnar(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "mesh.jpmesh")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_mesh_binary(self):
+        extent = [[139.7, 35.6], [139.8, 35.7]]
+        count = write_mesh_binary(6, self.path, extent, block_size=100)
+        meshes = get_meshes(6, extent)
+        self.assertEqual(count, len(meshes))
+
+        with MeshBinaryReader(self.path) as reader:
+            self.assertEqual(len(reader), count)
+            self.assertEqual(reader.meshnum, 6)
+            # 列はファイルを直接参照する配列で、generate_meshes()と同じ順序
+            self.assertIsInstance(reader.codes, np.memmap)
+            self.assertEqual(list(reader.codes.astype(str)), [mesh["code"] for mesh in meshes])
+            self.assertTrue(np.all(reader.levels == 6))
+
+            # ジオメトリはヘッダの格子の定義から復元する
+            for row in [0, 1, count // 2, count - 1]:
+                self.assertEqual(reader.get_mesh(row), meshes[row])
+            geometry = reader.get_geometry(10, 20)
+            self.assertEqual(list(geometry["left"]),
+                             [mesh["geometry"][0][0][0] for mesh in meshes[10:20]])
+            self.assertEqual(list(geometry["top"]),
+                             [mesh["geometry"][0][2][1] for mesh in meshes[10:20]])
+
+            rows = reader.read_rows(5, 8)
+            self.assertEqual(list(rows["code"]), list(reader.codes[5:8]))
+
+    def test_find_rows(self):
+        write_mesh_binary(3, self.path, [[139.7, 35.6], [139.8, 35.7]])
+        with MeshBinaryReader(self.path) as reader:
+            rows = np.arange(len(reader))
+            self.assertEqual(list(reader.find_rows(reader.codes)), list(rows))
+            self.assertEqual(list(reader.find_rows(reader.codes.astype(str))), list(rows))
+
+            # 範囲外や不正なメッシュコードは-1
+            self.assertEqual(reader.find_row(reader.codes[3]), 3)
+            self.assertEqual(reader.codes[reader.find_row("53394611")], 53394611)
+            self.assertEqual(list(reader.find_rows(["1", "64414277", "53390099"])), [-1, -1, -1])
+            self.assertEqual(list(reader.find_rows(["53394611x", "abc"])), [-1, -1])
+            self.assertEqual(reader.find_row("abc"), -1)
+
+    def test_invalid_file(self):
+        with open(self.path, mode="wb") as f:
+            f.write(b"{}" * 1000)
+        with self.assertRaises(ValueError):
+            MeshBinaryReader(self.path)
@@ -0,0 +1,81 @@
+import gzip
+import io
+import os
+import tempfile
+from unittest import TestCase, skipUnless
+from japanmesh.compress import CompressedWriter, get_compressor
+from japanmesh.writer import open_output, write_geojsonl_in_range
+
+try:
+    import zstandard
+except ModuleNotFoundError:
+    zstandard = None
+
+
+class TestCompress(TestCase):
+    def test_compressed_writer(self):
+        text = io.StringIO()
+        write_geojsonl_in_range(5, text, 3000, 3040, 3000, 3040)
+
+        f = io.BytesIO()
+        with CompressedWriter(f, "gzip", threads=2, block_size=10000, close_file=False) as writer:
+            write_geojsonl_in_range(5, writer, 3000, 3040, 3000, 3040, chunk_size=3000)
+
+        # ブロックごとのgzipのメンバーを連結した1つのデータとして展開できる
+        self.assertEqual(gzip.decompress(f.getvalue()).decode("utf-8"), text.getvalue())
+        self.assertGreater(f.getvalue().count(b"\x1f\x8b\x08"), 1)
+        self.assertEqual(writer.uncompressed_size, len(text.getvalue()))
+        self.assertEqual(writer.compressed_size, len(f.getvalue()))
+        self.assertLess(writer.compressed_size, writer.uncompressed_size / 5)
+
+    def test_empty(self):
+        f = io.BytesIO()
+        CompressedWriter(f, close_file=False).close()
+        self.assertGreater(len(f.getvalue()), 0)
+        self.assertEqual(gzip.decompress(f.getvalue()), b"")
+
+    def test_abort(self):
+        # 例外で中断した場合は、残りのブロックを書き出さずに終了する
+        f = io.BytesIO()
+        with self.assertRaises(RuntimeError):
+            with CompressedWriter(f, threads=1, block_size=100, close_file=False) as writer:
+                writer.write("a" * 50)
+                raise RuntimeError
+        self.assertTrue(writer.closed)
+        self.assertEqual(f.getvalue(), b"")
+
+        f = io.BytesIO()
+        with self.assertRaises(RuntimeError):
+            with CompressedWriter(f, threads=1, block_size=10) as writer:
+                writer.write("a" * 50)
+                writer.write("b" * 50)
+                raise RuntimeError
+        self.assertTrue(f.closed)
+
+    def test_open_output(self):
+        with tempfile.TemporaryDirectory() as target_dir:
+            path = os.path.join(target_dir, "mesh_3.geojsonl.gz")
+            with open_output(path, "gzip", level=1, threads=1) as f:
+                f.write("abc\n")
+                f.write("def\n")
+            with gzip.open(path, mode="rt") as f:
+                self.assertEqual(f.read(), "abc\ndef\n")
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            get_compressor("bzip2")
+        with self.assertRaises(ValueError):
+            get_compressor("gzip", 10)
+        with self.assertRaises(ValueError):
+            CompressedWriter(io.BytesIO(), threads=0)
+
+    @skipUnless(zstandard, "zstandardが必要です")
+    def test_zstd(self):
+        f = io.BytesIO()
+        with CompressedWriter(f, "zstd", block_size=100, close_file=False) as writer:
+            for i in range(100):
+                writer.write("line " + str(i) + "\n")
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(f.getvalue()), read_across_frames=True)
+        self.assertEqual(reader.read().decode("utf-8"),
+                         "".join("line " + str(i) + "\n" for i in range(100)))
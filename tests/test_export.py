@@ -0,0 +1,95 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from japanmesh.export import export_partitions, get_index_path, get_manifest_path
+from japanmesh.instrument import JobStats
+from japanmesh.parallel import write_geojsonl_shards
+
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "japanmesh",
+                         "main.py")
+
+
+class TestExport(TestCase):
+    extent = [[139.9, 35.6], [140.1, 35.7]]
+
+    def test_export_partitions(self):
+        with tempfile.TemporaryDirectory() as target_dir, \
+                tempfile.TemporaryDirectory() as expected_dir:
+            index = export_partitions(3, target_dir, self.extent, processes=2)
+            self.assertEqual([partition["code"] for partition in index["partitions"]],
+                             ["5339", "5340"])
+            self.assertEqual([partition["cells"] for partition in index["partitions"]], [96, 96])
+            self.assertEqual(index["cells"], 192)
+
+            # 分割ごとのファイルはwrite_geojsonl_shards()と同じ内容
+            for path, _ in write_geojsonl_shards(3, expected_dir, self.extent, processes=2):
+                with open(path) as expected, \
+                        open(os.path.join(target_dir, os.path.basename(path))) as f:
+                    self.assertEqual(f.read(), expected.read())
+
+            for partition in index["partitions"]:
+                path = os.path.join(target_dir, partition["path"])
+                self.assertEqual(os.path.getsize(path), partition["bytes"])
+            with open(get_index_path(target_dir, 3)) as f:
+                self.assertEqual(json.load(f), index)
+
+    def test_resume(self):
+        with tempfile.TemporaryDirectory() as target_dir:
+            index = export_partitions(3, target_dir, self.extent, processes=2)
+
+            # 中断を模して片方の分割のファイルを消すと、その分割のみ書き出し直す
+            removed = os.path.join(target_dir, index["partitions"][1]["path"])
+            os.remove(removed)
+            kept = os.path.join(target_dir, index["partitions"][0]["path"])
+            mtime = os.path.getmtime(kept)
+            stats = JobStats()
+            self.assertEqual(export_partitions(3, target_dir, self.extent, processes=2,
+                                               stats=stats), index)
+            self.assertEqual(stats.counters, {"skipped_shards": 1, "shards": 1})
+            self.assertEqual(stats.done, 192)
+            self.assertTrue(os.path.exists(removed))
+            self.assertEqual(os.path.getmtime(kept), mtime)
+
+            # 書きかけでサイズが異なるファイルも書き出し直す
+            with open(kept, mode="a") as f:
+                f.write("{")
+            stats = JobStats()
+            export_partitions(3, target_dir, self.extent, processes=2, stats=stats)
+            self.assertEqual(stats.counters, {"skipped_shards": 1, "shards": 1})
+            self.assertEqual(os.path.getsize(kept), index["partitions"][0]["bytes"])
+
+            # 条件の異なる書き出しは混ぜない
+            # 書きかけの最終行は切り詰め、続けて追記した記録を読み込める
+            manifest_path = get_manifest_path(target_dir, 3)
+            with open(manifest_path, mode="a") as f:
+                f.write('{"code": "53')
+            os.remove(removed)
+            export_partitions(3, target_dir, self.extent, processes=2)
+            stats = JobStats()
+            export_partitions(3, target_dir, self.extent, processes=2, stats=stats)
+            self.assertEqual(stats.counters, {"skipped_shards": 2})
+            with open(manifest_path) as f:
+                for line in f:
+                    json.loads(line)
+
+            with self.assertRaises(ValueError):
+                export_partitions(3, target_dir, self.extent, processes=2, precision=3)
+
+    def test_resume_command(self):
+        # 保存先(-d)を省略するとカレントディレクトリに書き出す
+        with tempfile.TemporaryDirectory() as target_dir:
+            command = [sys.executable, MAIN_PATH, "3", "-e", "139.9,35.6", "140.1,35.7",
+                       "--resume", "-j", "1"]
+            subprocess.run(command, cwd=target_dir, check=True, stdout=subprocess.DEVNULL)
+            self.assertEqual(sorted(os.listdir(target_dir)), [
+                "mesh_3_5339.geojsonl",
+                "mesh_3_5340.geojsonl",
+                "mesh_3_index.json",
+                "mesh_3_manifest.jsonl",
+            ])
+            with open(get_index_path(target_dir, 3)) as f:
+                self.assertEqual(json.load(f)["cells"], 192)
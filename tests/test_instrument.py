@@ -0,0 +1,60 @@
+import io
+from unittest import TestCase
+from japanmesh.main import generate_meshes, get_index_range
+from japanmesh.writer import write_geojsonl, write_geojsonl_in_range
+from japanmesh.instrument import JobStats, format_progress, run_profiled
+
+
+class TestInstrument(TestCase):
+    def test_write_geojsonl_stats(self):
+        notified = []
+        stats = JobStats(1248, callback=lambda stats: notified.append(stats.done), interval=0)
+        f = io.StringIO()
+        count = write_geojsonl(generate_meshes(1), f, chunk_size=100, stats=stats)
+        stats.finish()
+
+        # 段階ごとの時間と、書き出したメッシュ数・文字数を記録する
+        summary = stats.to_dict()
+        self.assertEqual(summary["done"], count)
+        self.assertEqual(set(summary["stages"]), {"generate", "serialize", "write"})
+        self.assertEqual(summary["counters"]["characters"], len(f.getvalue()))
+        self.assertEqual(summary["counters"]["chunks"], count)
+        self.assertLessEqual(sum(summary["stages"].values()), summary["elapsed"])
+        self.assertEqual(notified[-1], 1248)
+        self.assertTrue(format_progress(stats).startswith("100.0% (1,248/1,248) "))
+
+        # 統計の有無で書き出す内容は変わらない
+        expected = io.StringIO()
+        write_geojsonl(generate_meshes(1), expected)
+        self.assertEqual(f.getvalue(), expected.getvalue())
+
+    def test_write_geojsonl_in_range_stats(self):
+        index_range = get_index_range(3, [[139.7, 35.6], [139.8, 35.7]])
+        stats = JobStats()
+        count = write_geojsonl_in_range(3, io.StringIO(), *index_range, stats=stats)
+        stats.finish()
+        self.assertEqual(stats.done, count)
+        self.assertIsNone(stats.eta)
+        self.assertEqual(set(stats.stages), {"serialize", "write"})
+
+    def test_stage(self):
+        stats = JobStats()
+        with stats.stage("outer"):
+            with stats.stage("inner"):
+                pass
+        stats.count("items", 3)
+        stats.finish()
+        self.assertEqual(set(stats.stages), {"outer", "inner"})
+        self.assertEqual(stats.counters, {"items": 3})
+
+    def test_run_profiled(self):
+        log = io.StringIO()
+        self.assertEqual(run_profiled(lambda: sum(range(10)), "cprofile", log=log), 45)
+        self.assertIn("function calls", log.getvalue())
+
+        stats = JobStats()
+        run_profiled(lambda: [0] * 100000, "tracemalloc", stats=stats, log=io.StringIO())
+        self.assertGreater(stats.counters["tracemalloc_peak"], 0)
+
+        with self.assertRaises(ValueError):
+            run_profiled(lambda: None, "unknown")
@@ -0,0 +1,90 @@
+from unittest import TestCase
+import numpy as np
+from japanmesh.arrays import get_mesh_arrays
+from japanmesh.meshcode import get_ancestor_meshcodes, get_neighbor_meshcodes
+from japanmesh.intcode import (
+    INVALID_INTCODE,
+    from_intcode,
+    get_ancestor_intcode,
+    get_children_intcodes,
+    get_intcode_level,
+    get_neighbor_intcodes,
+    get_parent_intcode,
+    intcode_to_meshcode,
+    intcodes_to_meshcodes,
+    meshcode_to_intcode,
+    meshcodes_to_intcodes,
+    to_intcode,
+)
+
+
+class TestIntcode(TestCase):
+    def test_conversion(self):
+        self.assertEqual(to_intcode(3, 1421, 1881), (3 << 56) | (1881 << 28) | 1421)
+        self.assertEqual(from_intcode(to_intcode(3, 1421, 1881)), (3, 1421, 1881))
+        self.assertEqual(meshcode_to_intcode("53394611"), to_intcode(3, 1421, 1881))
+        self.assertEqual(intcode_to_meshcode(to_intcode(3, 1421, 1881)), "53394611")
+        self.assertEqual(get_intcode_level(meshcode_to_intcode("5339461132", 5)), 5)
+        self.assertEqual(get_intcode_level(meshcode_to_intcode("5339461132", 7)), 7)
+
+        with self.assertRaises(ValueError):
+            intcode_to_meshcode(to_intcode(11, 0, 0))
+
+    def test_conversion_array(self):
+        for meshnum in range(1, 11):
+            arrays = get_mesh_arrays(meshnum, [[139.7, 35.6], [139.701, 35.601]])
+            intcodes = meshcodes_to_intcodes(meshnum, arrays["code"])
+            self.assertEqual(intcodes.dtype, np.uint64)
+            levels, x, y = from_intcode(intcodes)
+            np.testing.assert_array_equal(levels, meshnum)
+            np.testing.assert_array_equal(x, arrays["x"])
+            np.testing.assert_array_equal(y, arrays["y"])
+            np.testing.assert_array_equal(intcodes_to_meshcodes(intcodes), arrays["code"].astype(str))
+
+        # 次数が混在していてもよい
+        intcodes = np.array([meshcode_to_intcode("5339"), meshcode_to_intcode("533946113299", 9)],
+                            dtype=np.uint64)
+        np.testing.assert_array_equal(intcodes_to_meshcodes(intcodes), ["5339", "533946113299"])
+
+    def test_hierarchy(self):
+        intcode = meshcode_to_intcode("533946113299", 9)
+        ancestors = [intcode_to_meshcode(get_ancestor_intcode(intcode, meshnum))
+                     for meshnum in [1, 2, 3, 7]]
+        self.assertEqual(ancestors, get_ancestor_meshcodes("533946113299", 9))
+        self.assertEqual(intcode_to_meshcode(get_parent_intcode(intcode)), "5339461132")
+        self.assertEqual(get_parent_intcode(meshcode_to_intcode("5339")), meshcode_to_intcode("5339"))
+        with self.assertRaises(ValueError):
+            get_ancestor_intcode(intcode, 5)
+
+        children = get_children_intcodes(meshcode_to_intcode("53394611"), 4)
+        self.assertEqual([intcode_to_meshcode(child) for child in children],
+                         ["533946111", "533946112", "533946113", "533946114"])
+
+        neighbors = get_neighbor_intcodes(meshcode_to_intcode("53394611"))
+        self.assertEqual([intcode_to_meshcode(neighbor) for neighbor in neighbors],
+                         get_neighbor_meshcodes("53394611"))
+        neighbors = get_neighbor_intcodes(meshcode_to_intcode("3022"))
+        self.assertEqual(neighbors.count(INVALID_INTCODE), 5)
+
+    def test_hierarchy_array(self):
+        intcodes = np.array([meshcode_to_intcode("533946113299", 9),
+                             meshcode_to_intcode("5339461132", 5),
+                             meshcode_to_intcode("3022")], dtype=np.uint64)
+        np.testing.assert_array_equal(
+            get_parent_intcode(intcodes),
+            [meshcode_to_intcode("5339461132", 7), meshcode_to_intcode("533946113"),
+             meshcode_to_intcode("3022")])
+        # 祖先でない次数はINVALID_INTCODE
+        np.testing.assert_array_equal(
+            get_ancestor_intcode(intcodes, 3),
+            [meshcode_to_intcode("53394611"), meshcode_to_intcode("53394611"), INVALID_INTCODE])
+
+        children = get_children_intcodes(intcodes[:1].repeat(3), 10)
+        self.assertEqual(children.shape, (3, 4))
+        self.assertEqual(intcode_to_meshcode(children[0, 3]), "53394611329911")
+        with self.assertRaises(ValueError):
+            get_children_intcodes(intcodes, 10)
+
+        neighbors = get_neighbor_intcodes(intcodes)
+        self.assertEqual(neighbors.shape, (3, 8))
+        self.assertEqual(np.count_nonzero(neighbors == INVALID_INTCODE), 5)
@@ -19,6 +19,31 @@ class TestMain(TestCase):
         self.assertEqual(get_end_offset(1, [153.0, 45.33333333333334]), (1, 0))
         self.assertEqual(get_end_offset(1, [153.0, 45.33333333333333]), (1, 1))
 
+    def test_get_offset_exact(self):
+        # 細かい次数でも上位の次数と同じ境界で判定される
+        self.assertEqual(get_start_offset(10, [123.0, 20.66666666666667]), (16000, 16000))
+        self.assertEqual(get_start_offset(10, [123.0, 20.66666666666666]), (16000, 15999))
+        self.assertEqual(get_end_offset(10, [153.0, 45.33333333333333]), (16000, 16000))
+        self.assertEqual(get_end_offset(10, [153.0, 45.33333333333334]), (16000, 15999))
+        # 範囲外の領域ではメッシュを生成しない
+        self.assertEqual(get_meshes(1, [[100.0, 10.0], [101.0, 11.0]]), [])
+
+    def test_get_mesh_index(self):
+        self.assertEqual(get_mesh_index(1, [122.0, 20.0]), (0, 0))
+        self.assertEqual(get_mesh_index(1, [122.99999999999999, 20.66666666666666]), (0, 0))
+        self.assertEqual(get_mesh_index(1, [123.0, 20.66666666666667]), (1, 1))
+        self.assertEqual(get_mesh_index(3, [139.7671, 35.6812]), (1421, 1881))  # 東京
+
+    def test_get_mesh_vertex(self):
+        # 同じ頂点はどの次数から求めても同じ値になる
+        self.assertEqual(get_mesh_vertex(1, 1, 1), (123.0, 20 + 2 / 3))
+        self.assertEqual(get_mesh_vertex(3, 10, 10), get_mesh_vertex(2, 1, 1))
+        for meshnum in range(2, 11):
+            _, _, unitcount = get_base_cellcount(meshnum)
+            self.assertEqual(get_mesh_vertex(meshnum, 17 * unitcount, 23 * unitcount),
+                             get_mesh_vertex(1, 17, 23))
+        self.assertEqual(get_mesh_vertex(9, 3, 7), get_mesh_vertex(10, 6, 14))
+
     def test_get_mesh(self):
         mesh = get_mesh(1, 0, 0)
         # mesheにはメッシュコードとポリゴンのジオメトリが格納されている
@@ -0,0 +1,44 @@
+import io
+import sys
+from unittest import TestCase
+from japanmesh.main import generate_meshes, get_mesh, get_meshes
+from japanmesh.mesh import Mesh, generate_mesh_objects, to_mesh_dicts
+from japanmesh.writer import write_geojsonl
+
+
+class TestMesh(TestCase):
+    def test_mesh(self):
+        mesh = Mesh(9, 2000, 3000)
+        expected = get_mesh(9, 2000, 3000)
+        # get_mesh()と同じ値を参照時に計算する
+        self.assertEqual(mesh.code, expected["code"])
+        self.assertEqual(mesh.geometry, expected["geometry"])
+        self.assertEqual(mesh.to_dict(), expected)
+        self.assertEqual(mesh["code"], expected["code"])
+        self.assertEqual(mesh["geometry"], expected["geometry"])
+        with self.assertRaises(KeyError):
+            mesh["properties"]
+
+        left, bottom, right, top = mesh.bounds
+        self.assertEqual(mesh.ring[0], [left, bottom])
+        self.assertEqual(mesh.ring[2], [right, top])
+        self.assertEqual(mesh.centroid, ((left + right) / 2, (bottom + top) / 2))
+
+        # 次数と番地のみを保持する
+        self.assertFalse(hasattr(mesh, "__dict__"))
+        self.assertLess(sys.getsizeof(mesh), 100)
+        self.assertEqual(mesh, Mesh(9, 2000, 3000))
+        self.assertEqual(len({mesh, Mesh(9, 2000, 3000), Mesh(9, 2001, 3000)}), 2)
+        self.assertEqual(Mesh.from_meshcode(mesh.code, 9), mesh)
+
+    def test_generate_mesh_objects(self):
+        extent = [[139.7, 35.6], [139.8, 35.7]]
+        meshes = list(generate_mesh_objects(5, extent))
+        self.assertEqual(list(to_mesh_dicts(meshes)), get_meshes(5, extent))
+
+        # Meshのままgeojsonlとして書き出せる
+        f = io.StringIO()
+        expected = io.StringIO()
+        write_geojsonl(generate_mesh_objects(1), f)
+        write_geojsonl(generate_meshes(1), expected)
+        self.assertEqual(f.getvalue(), expected.getvalue())
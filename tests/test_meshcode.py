@@ -0,0 +1,84 @@
+from unittest import TestCase
+from japanmesh.main import get_mesh, get_mesh_index
+from japanmesh.meshcode import (
+    decode_meshcode,
+    encode_meshcode,
+    generate_children_meshes,
+    get_ancestor_meshcodes,
+    get_mesh_by_meshcode,
+    get_neighbor_meshcodes,
+)
+
+
+class TestMeshcode(TestCase):
+    def test_encode_meshcode(self):
+        self.assertEqual(encode_meshcode(1, [139.7671, 35.6812]), "5339")
+        self.assertEqual(encode_meshcode(3, [139.7671, 35.6812]), "53394611")
+        self.assertEqual(encode_meshcode(5, [139.7671, 35.6812]), "5339461132")
+        self.assertEqual(encode_meshcode(7, [139.7671, 35.6812]), "5339461173")
+        # メッシュの境界上の地点は右側・上側のメッシュに含まれる
+        self.assertEqual(encode_meshcode(1, [123.0, 20.0]), "3023")
+        self.assertEqual(encode_meshcode(1, [123.0, 20 + 2 / 3]), "3123")
+
+        with self.assertRaises(ValueError):
+            encode_meshcode(1, [100.0, 35.0])
+
+    def test_decode_meshcode(self):
+        # 全ての次数でget_mesh()のメッシュコードから番地を復元できる
+        for meshnum in range(1, 11):
+            x, y = get_mesh_index(meshnum, [139.7671, 35.6812])
+            code = get_mesh(meshnum, x, y)["code"]
+            self.assertEqual(decode_meshcode(code, meshnum), (meshnum, x, y))
+            self.assertEqual(get_mesh_by_meshcode(code, meshnum), get_mesh(meshnum, x, y))
+
+        self.assertEqual(decode_meshcode("53394611")[0], 3)
+        # 5次と7次はコードの値から判別できる場合のみ次数を省略できる
+        self.assertEqual(decode_meshcode("5339461153")[0], 7)
+        with self.assertRaises(ValueError):
+            decode_meshcode("5339461132")
+        self.assertEqual(decode_meshcode("5339461142", 5)[0], 5)
+
+        for code in ["", "533a", "53394", "53398611", "5339861100", "9999"]:
+            with self.assertRaises(ValueError):
+                decode_meshcode(code)
+        with self.assertRaises(ValueError):
+            decode_meshcode("53394611", 7)
+
+    def test_generate_children_meshes(self):
+        codes = [mesh["code"] for mesh in generate_children_meshes("53394611", 4)]
+        self.assertEqual(codes, ["533946111", "533946112", "533946113", "533946114"])
+
+        # 10桁のコードは生成する次数の祖先として解釈する（9次の祖先は7次）
+        meshes = list(generate_children_meshes("5339461132", 9))
+        self.assertEqual(len(meshes), 100)
+        self.assertEqual(meshes[0]["code"], "533946113200")
+        self.assertEqual(meshes[-1]["code"], "533946113299")
+
+        # 隣接する上位メッシュの境界で重複せず、重複・包含する上位メッシュは一度だけ扱う
+        meshes = list(generate_children_meshes(
+            ["53394611", "53394612", "53394611", "5339461201"], 7))
+        codes = [mesh["code"] for mesh in meshes]
+        self.assertEqual(len(codes), 200)
+        self.assertEqual(len(set(codes)), 200)
+        self.assertEqual(meshes[0], get_mesh_by_meshcode("5339461100", 7))
+
+        with self.assertRaises(ValueError):
+            list(generate_children_meshes("533946111", 7))
+
+    def test_get_ancestor_meshcodes(self):
+        self.assertEqual(get_ancestor_meshcodes("533946113299", 9),
+                         ["5339", "533946", "53394611", "5339461132"])
+        self.assertEqual(get_ancestor_meshcodes("5339461132", 5),
+                         ["5339", "533946", "53394611", "533946113"])
+        self.assertEqual(get_ancestor_meshcodes("5339"), [])
+
+    def test_get_neighbor_meshcodes(self):
+        self.assertEqual(get_neighbor_meshcodes("53394611"), [
+            "53394600", "53394601", "53394602",
+            "53394610", "53394612",
+            "53394620", "53394621", "53394622",
+        ])
+        # 上位メッシュをまたぐ
+        self.assertEqual(get_neighbor_meshcodes("5339")[:3], ["5238", "5239", "5240"])
+        # 生成範囲の端
+        self.assertEqual(get_neighbor_meshcodes("3022"), ["3023", "3122", "3123"])
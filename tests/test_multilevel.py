@@ -0,0 +1,77 @@
+import io
+import json
+from unittest import TestCase
+from japanmesh.main import get_index_range, get_meshes
+from japanmesh.writer import write_geojsonl_in_range
+from japanmesh.multilevel import (
+    generate_multilevel_meshes,
+    get_common_meshnum,
+    write_geojsonl_multilevel,
+)
+
+
+class TestMultilevel(TestCase):
+    extent = [[139.71, 35.61], [139.83, 35.72]]
+
+    def test_get_common_meshnum(self):
+        self.assertEqual(get_common_meshnum([3, 4, 5, 7]), 3)
+        self.assertEqual(get_common_meshnum([5, 6]), 5)
+        self.assertEqual(get_common_meshnum([9, 10]), 9)
+        self.assertEqual(get_common_meshnum([1, 10]), 1)
+        self.assertEqual(get_common_meshnum([7]), 7)
+        with self.assertRaises(ValueError):
+            get_common_meshnum([])
+
+    def test_generate_multilevel_meshes(self):
+        meshes = {}
+        for meshnum, mesh in generate_multilevel_meshes([3, 4, 5, 7], self.extent):
+            meshes.setdefault(meshnum, []).append(mesh)
+
+        # 各次数のメッシュの集合はget_meshes()と同じ
+        for meshnum in [3, 4, 5, 7]:
+            expected = sorted(get_meshes(meshnum, self.extent), key=lambda mesh: mesh["code"])
+            self.assertEqual(sorted(meshes[meshnum], key=lambda mesh: mesh["code"]), expected)
+
+    def test_write_geojsonl_multilevel(self):
+        outputs = {meshnum: io.StringIO() for meshnum in [9, 10]}
+        extent = [[139.766, 35.680], [139.768, 35.682]]
+        counts = write_geojsonl_multilevel([9, 10], outputs, extent, chunk_size=100)
+
+        for meshnum, f in outputs.items():
+            expected = io.StringIO()
+            write_geojsonl_in_range(meshnum, expected, *get_index_range(meshnum, extent))
+            lines = f.getvalue().splitlines()
+            self.assertEqual(counts[meshnum], len(lines))
+            self.assertEqual(sorted(lines), sorted(expected.getvalue().splitlines()))
+
+        # 1つの書き込み先には次数を付けて書き出す
+        f = io.StringIO()
+        counts = write_geojsonl_multilevel([3, 4], f, self.extent)
+        features = [json.loads(line) for line in f.getvalue().splitlines()]
+        self.assertEqual(len(features), counts[3] + counts[4])
+        for feature in features:
+            level = feature["properties"]["level"]
+            self.assertEqual(len(feature["properties"]["code"]), {3: 8, 4: 9}[level])
+
+        with self.assertRaises(ValueError):
+            write_geojsonl_multilevel([3, 4], {3: io.StringIO()}, self.extent)
+
+    def test_distant_levels(self):
+        # 共通の祖先が粗くても、狭い領域はすぐに書き出せる
+        extent = [[139.70, 35.60], [139.701, 35.601]]
+        for meshnums in ([1, 8], [1, 10], [2, 6, 9]):
+            outputs = {meshnum: io.StringIO() for meshnum in meshnums}
+            counts = write_geojsonl_multilevel(meshnums, outputs, extent, chunk_size=100)
+            for meshnum, f in outputs.items():
+                expected = io.StringIO()
+                write_geojsonl_in_range(meshnum, expected, *get_index_range(meshnum, extent))
+                self.assertEqual(counts[meshnum], len(f.getvalue().splitlines()))
+                self.assertEqual(sorted(f.getvalue().splitlines()),
+                                 sorted(expected.getvalue().splitlines()))
+
+        # 上位のメッシュの境界をまたぐ行も正しいコードとなる
+        extent = [[139.99, 35.66], [140.01, 35.67]]
+        meshes = {}
+        for meshnum, mesh in generate_multilevel_meshes([1, 8], extent):
+            meshes.setdefault(meshnum, []).append(mesh["code"])
+        self.assertEqual(sorted(meshes[8]), sorted(mesh["code"] for mesh in get_meshes(8, extent)))
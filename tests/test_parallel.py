@@ -0,0 +1,59 @@
+import io
+import os
+import tempfile
+from unittest import TestCase
+from japanmesh.main import generate_meshes, generate_meshes_in_range
+from japanmesh.parallel import (
+    get_shards,
+    write_geojsonl_parallel,
+    write_geojsonl_shards,
+)
+from japanmesh.writer import write_geojsonl
+
+
+class TestParallel(TestCase):
+    extent = [[139.9, 35.6], [140.1, 35.7]]
+
+    def test_get_shards(self):
+        shards = get_shards(3, self.extent, 1)
+        # 1次メッシュ5339と5340にまたがる
+        self.assertEqual([code for code, _ in shards], ["5339", "5340"])
+        self.assertEqual(shards[0][1], (1432, 1440, 1872, 1884))
+        self.assertEqual(shards[1][1], (1440, 1448, 1872, 1884))
+
+        shards = get_shards(5, self.extent, 3)
+        self.assertEqual(shards[0][0], "53393722")
+        count = sum((x_end - x_start) * (y_end - y_start)
+                    for _, (x_start, x_end, y_start, y_end) in shards)
+        self.assertEqual(count, len(list(generate_meshes(5, self.extent))))
+
+        with self.assertRaises(ValueError):
+            get_shards(5, self.extent, 7)
+
+    def test_write_geojsonl_parallel(self):
+        f = io.StringIO()
+        count = write_geojsonl_parallel(5, f, self.extent, processes=2, shard_meshnum=2)
+
+        # 分割ごとに逐次生成した結果を連結したものと一致する
+        expected = io.StringIO()
+        for _, index_range in get_shards(5, self.extent, 2):
+            write_geojsonl(generate_meshes_in_range(5, *index_range), expected)
+        self.assertEqual(f.getvalue(), expected.getvalue())
+        self.assertEqual(count, len(list(generate_meshes(5, self.extent))))
+
+        # 一時ファイルは指定したディレクトリに置かれ、書き出し後に削除される
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            f = io.StringIO()
+            write_geojsonl_parallel(5, f, self.extent, processes=2, shard_meshnum=2,
+                                    tmp_dir=tmp_dir)
+            self.assertEqual(f.getvalue(), expected.getvalue())
+            self.assertEqual(os.listdir(tmp_dir), [])
+
+    def test_write_geojsonl_shards(self):
+        with tempfile.TemporaryDirectory() as target_dir:
+            results = write_geojsonl_shards(3, target_dir, self.extent, processes=2)
+            self.assertEqual([os.path.basename(path) for path, _ in results],
+                             ["mesh_3_5339.geojsonl", "mesh_3_5340.geojsonl"])
+            self.assertEqual([count for _, count in results], [96, 96])
+            self.assertEqual(sorted(os.listdir(target_dir)),
+                             ["mesh_3_5339.geojsonl", "mesh_3_5340.geojsonl"])
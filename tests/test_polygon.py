@@ -0,0 +1,77 @@
+from unittest import TestCase
+from japanmesh.main import generate_meshes, get_index_range, get_mesh
+from japanmesh.meshcode import encode_meshcode
+from japanmesh.polygon import generate_meshes_in_polygon, get_polygon_rings
+
+
+def _rectangle(left, bottom, right, top):
+    return [[left, bottom], [right, bottom], [right, top], [left, top], [left, bottom]]
+
+
+class TestPolygon(TestCase):
+    def test_get_polygon_rings(self):
+        polygon = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1]]]}
+        # 閉じていないリングは始点を付加する
+        self.assertEqual(get_polygon_rings(polygon), [[(0, 0), (1, 0), (1, 1), (0, 0)]])
+        feature_collection = {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "geometry": polygon},
+            {"type": "Feature", "geometry": {"type": "MultiPolygon", "coordinates": [
+                polygon["coordinates"], polygon["coordinates"]]}},
+        ]}
+        self.assertEqual(len(get_polygon_rings(feature_collection)), 3)
+
+        with self.assertRaises(ValueError):
+            get_polygon_rings({"type": "Point", "coordinates": [0, 0]})
+
+    def test_rectangle(self):
+        # 矩形のポリゴンは同じ領域を指定したgenerate_meshes()と同じメッシュとなる
+        for extent in [[[139.7, 35.6], [139.8, 35.7]], [[139.75, 35.625], [139.875, 35.75]]]:
+            polygon = {"type": "Polygon", "coordinates": [_rectangle(*extent[0], *extent[1])]}
+            for meshnum in [1, 3, 4, 7, 8]:
+                expected = sorted(mesh["code"] for mesh in generate_meshes(meshnum, extent))
+                codes = sorted(mesh["code"] for mesh in generate_meshes_in_polygon(meshnum, polygon))
+                self.assertEqual(codes, expected)
+
+    def test_triangle_with_hole(self):
+        polygon = {"type": "MultiPolygon", "coordinates": [
+            [[[139.7, 35.6], [139.8, 35.62], [139.72, 35.71], [139.7, 35.6]],
+             _rectangle(139.73, 35.63, 139.75, 35.65)],
+            [[[139.9, 35.6], [139.95, 35.6], [139.95, 35.61], [139.9, 35.6]]],
+        ]}
+        for meshnum in [3, 5, 7]:
+            codes = [mesh["code"] for mesh in generate_meshes_in_polygon(meshnum, polygon)]
+            self.assertEqual(len(codes), len(set(codes)))
+            self.assertEqual(sorted(codes), _brute_force(meshnum, polygon))
+
+        # 穴の内側のメッシュは含まない
+        codes = {mesh["code"] for mesh in generate_meshes_in_polygon(7, polygon)}
+        self.assertNotIn(encode_meshcode(7, [139.74, 35.64]), codes)
+        self.assertIn(encode_meshcode(7, [139.72, 35.62]), codes)
+
+
+def _brute_force(meshnum, polygon):
+    # 領域内の全てのメッシュについて、辺が内部を通過するか中心点が内側にあるかを判定する
+    from japanmesh.polygon import _crosses_interior
+
+    rings = get_polygon_rings(polygon)
+    edges = [(ring[i][0], ring[i][1], ring[i + 1][0], ring[i + 1][1])
+             for ring in rings for i in range(len(ring) - 1)]
+    lons = [lonlat[0] for ring in rings for lonlat in ring]
+    lats = [lonlat[1] for ring in rings for lonlat in ring]
+    x_start, x_end, y_start, y_end = get_index_range(
+        meshnum, [[min(lons), min(lats)], [max(lons), max(lats)]])
+
+    codes = []
+    for y in range(y_start, y_end):
+        for x in range(x_start, x_end):
+            mesh = get_mesh(meshnum, x, y)
+            (left, bottom), _, (right, top), _, _ = mesh["geometry"][0]
+            center_x, center_y = (left + right) / 2, (bottom + top) / 2
+            inside = False
+            for x1, y1, x2, y2 in edges:
+                if (y1 > center_y) != (y2 > center_y) and \
+                        x1 + (center_y - y1) * (x2 - x1) / (y2 - y1) > center_x:
+                    inside = not inside
+            if inside or any(_crosses_interior(edge, left, bottom, right, top) for edge in edges):
+                codes.append(mesh["code"])
+    return sorted(codes)
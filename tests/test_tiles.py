@@ -0,0 +1,126 @@
+import asyncio
+import json
+from unittest import TestCase, mock
+from japanmesh.cache import clear_caches, get_cache_info
+from japanmesh.main import get_meshes, get_meshsize
+from japanmesh.tiles import (
+    get_tile_extent,
+    get_tile_geojson,
+    get_tile_meshnum,
+    start_tile_server,
+)
+
+
+class TestTiles(TestCase):
+    def test_get_tile_extent(self):
+        self.assertEqual(get_tile_extent(0, 0, 0)[0][0], -180)
+        self.assertAlmostEqual(get_tile_extent(0, 0, 0)[1][1], 85.0511287798066)
+        # 東京駅を含むタイル
+        (left, bottom), (right, top) = get_tile_extent(14, 14552, 6451)
+        self.assertTrue(left < 139.7671 < right and bottom < 35.6812 < top)
+        with self.assertRaises(ValueError):
+            get_tile_extent(1, 2, 0)
+        with self.assertRaises(ValueError):
+            get_tile_extent(3000, 0, 0)
+
+    def test_get_tile_meshnum(self):
+        self.assertEqual(get_tile_meshnum(0), 1)
+        self.assertEqual(get_tile_meshnum(10), 3)
+        self.assertEqual(get_tile_meshnum(18), 10)
+        # ズームレベルが大きいほど細かい次数となる
+        widths = [get_meshsize(get_tile_meshnum(z))[0] for z in range(0, 20)]
+        self.assertEqual(widths, sorted(widths, reverse=True))
+        with self.assertRaises(ValueError):
+            get_tile_meshnum(3000)
+
+    def test_get_tile_geojson(self):
+        clear_caches()
+        collection = json.loads(get_tile_geojson(14, 14552, 6451))
+        extent = get_tile_extent(14, 14552, 6451)
+        meshes = get_meshes(7, extent)
+        self.assertEqual(collection["type"], "FeatureCollection")
+        self.assertEqual([feature["properties"]["code"] for feature in collection["features"]],
+                         [mesh["code"] for mesh in meshes])
+
+        # 2回目はキャッシュから返す
+        get_tile_geojson(14, 14552, 6451)
+        self.assertEqual(get_cache_info()["tile"]["hits"], 1)
+
+        # 生成範囲外のタイルは空
+        self.assertEqual(json.loads(get_tile_geojson(3, 0, 0))["features"], [])
+        with self.assertRaises(ValueError):
+            get_tile_geojson(5, 27, 12, meshnum=10)
+        with self.assertRaises(ValueError):
+            get_tile_geojson(3000, 0, 0)
+
+    def test_tile_server(self):
+        async def request(port: int, path: str) -> (bytes, bytes):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(("GET " + path + " HTTP/1.1\r\nHost: localhost\r\n\r\n").encode())
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b"\r\n\r\n")
+            return head.split(b"\r\n")[0], body
+
+        async def run():
+            server = await start_tile_server("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return [
+                    await request(port, "/14/14552/6451.geojson?meshnum=3"),
+                    await request(port, "/14/14552/6451.png"),
+                    await request(port, "/5/27/12.geojson?meshnum=10"),
+                    await request(port, "/3000/0/0.geojson"),
+                ]
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        (status, body), (not_found, _), (bad_request, _), (bad_zoom, _) = asyncio.run(run())
+        self.assertEqual(status, b"HTTP/1.1 200 OK")
+        self.assertEqual(body.decode(), get_tile_geojson(14, 14552, 6451, 3))
+        self.assertEqual(not_found, b"HTTP/1.1 404 Not Found")
+        self.assertEqual(bad_request, b"HTTP/1.1 400 Bad Request")
+        self.assertEqual(bad_zoom, b"HTTP/1.1 400 Bad Request")
+
+        # 想定外のエラーでも接続を切らずに500を返す
+        async def run_error():
+            server = await start_tile_server("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                with mock.patch("japanmesh.tiles._get_response", side_effect=RuntimeError):
+                    return await request(port, "/14/14552/6451.geojson")
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        error, _ = asyncio.run(run_error())
+        self.assertEqual(error, b"HTTP/1.1 500 Internal Server Error")
+
+        # 長すぎる行を含むリクエストは、例外を残さずに接続を閉じる
+        async def run_overlong():
+            errors = []
+            asyncio.get_running_loop().set_exception_handler(
+                lambda loop, context: errors.append(context))
+            server = await start_tile_server("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /" + b"0" * (1 << 17) + b" HTTP/1.1\r\n\r\n")
+                try:
+                    response = await reader.read()
+                except ConnectionResetError:
+                    # 未読のデータを残して閉じた場合はリセットとなる
+                    response = b""
+                writer.close()
+                # 後続のリクエストには応答できる
+                status, _ = await request(port, "/14/14552/6451.png")
+            finally:
+                server.close()
+                await server.wait_closed()
+            return response, status, errors
+
+        response, status, errors = asyncio.run(run_overlong())
+        self.assertEqual(response, b"")
+        self.assertEqual(status, b"HTTP/1.1 404 Not Found")
+        self.assertEqual(errors, [])
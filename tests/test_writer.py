@@ -0,0 +1,64 @@
+import io
+import json
+from unittest import TestCase
+from japanmesh.main import generate_meshes, generate_meshes_in_range, get_index_range, get_meshes
+from japanmesh.writer import to_geojsonl_feature, write_geojsonl, write_geojsonl_in_range
+
+
+class TestWriter(TestCase):
+    def test_write_geojsonl(self):
+        f = io.StringIO()
+        count = write_geojsonl(generate_meshes(1), f)
+        self.assertEqual(count, 1248)
+
+        # 一度に連結した場合と同じ内容が書き出される
+        expected = "".join(to_geojsonl_feature(mesh) for mesh in get_meshes(1))
+        self.assertEqual(f.getvalue(), expected)
+
+    def test_write_geojsonl_chunk_size(self):
+        class CountingIO(io.StringIO):
+            writes = 0
+
+            def write(self, s):
+                self.writes += 1
+                return super().write(s)
+
+        # 書き込み単位を小さくすると複数回に分けて書き出される
+        f = CountingIO()
+        write_geojsonl(generate_meshes(1), f, chunk_size=1)
+        self.assertEqual(f.writes, 1248)
+
+        with self.assertRaises(ValueError):
+            write_geojsonl(generate_meshes(1), io.StringIO(), chunk_size=0)
+
+    def test_to_geojsonl_feature(self):
+        mesh = get_meshes(9, [[139.7671, 35.6812], [139.7671, 35.6812]])[0]
+        feature = json.loads(to_geojsonl_feature(mesh))
+
+        # 厳密なJSONとして読み込め、メッシュコードは文字列のまま
+        self.assertEqual(feature["type"], "Feature")
+        self.assertEqual(feature["properties"]["code"], mesh["code"])
+        self.assertEqual(feature["geometry"]["coordinates"], mesh["geometry"])
+
+        # 桁数を指定すると小数点以下を丸める
+        feature = json.loads(to_geojsonl_feature(mesh, precision=3))
+        left, bottom = feature["geometry"]["coordinates"][0][0]
+        self.assertEqual(left, round(mesh["geometry"][0][0][0], 3))
+        self.assertEqual(bottom, round(mesh["geometry"][0][0][1], 3))
+        self.assertEqual(to_geojsonl_feature(mesh, precision=0).count("."), 0)
+
+        with self.assertRaises(ValueError):
+            to_geojsonl_feature(mesh, precision=-1)
+
+    def test_write_geojsonl_in_range(self):
+        index_range = get_index_range(6, [[139.7, 35.6], [139.8, 35.7]])
+        for precision in (None, 6):
+            expected = io.StringIO()
+            write_geojsonl(generate_meshes_in_range(6, *index_range), expected,
+                           precision=precision)
+
+            # 辞書を経由した場合と同じ内容が書き出される
+            f = io.StringIO()
+            count = write_geojsonl_in_range(6, f, *index_range, precision=precision)
+            self.assertEqual(count, len(expected.getvalue().splitlines()))
+            self.assertEqual(f.getvalue(), expected.getvalue())